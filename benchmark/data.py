@@ -0,0 +1,83 @@
+import random
+from itertools import accumulate
+from typing import Iterator, List, Optional
+from src.task_master.single_task import from_ordinal, today_ordinal
+
+__version__ = 0.1
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CONST
+##
+# PASSWORD: Password of every synthetic user.
+##
+# 2. FUNCTION
+##
+# owner_names: Synthetic owner names.
+# task_lines: SCSV lines of synthetic tasks.
+# user_lines: SCSV lines of synthetic users.
+# write_lines: Writes lines as a data file.
+########################################################
+
+# Password of every synthetic user.
+PASSWORD = 'benchmark'
+
+# Days around today synthetic dates are spread over.
+_DATE_SPREAD_ = 60
+
+def owner_names(number: int) -> List[str]:
+    '''
+       Returns 'number' owner names, first one being the busiest.
+    '''
+
+    return [f'user{i}' for i in range(number)]
+
+def task_lines(rows: int, owners: List[str], skew: float = 1.,
+               completed: float = .3, seed: int = 0) -> Iterator[str]:
+    '''
+       Yields 'rows' SCSV task lines.
+
+       Owners follow a Zipf like distribution: the i-th owner gets tasks
+       in proportion to 1/(i+1)**skew, so 0 spreads them evenly.
+       A 'completed' fraction of tasks is marked as done.
+    '''
+
+    generator = random.Random(seed)
+    weights = list(accumulate(1/(i+1)**skew for i in range(len(owners))))
+    today = today_ordinal()
+    for i, owner in enumerate(generator.choices(owners, cum_weights=weights,
+                                                k=rows)):
+        assigned = today - generator.randrange(_DATE_SPREAD_)
+        due = assigned + generator.randrange(_DATE_SPREAD_)
+        done = 'Yes' if generator.random() < completed else 'No'
+        yield ';'.join([owner, f'Task {i}', f'Synthetic task {i}',
+                        from_ordinal(due), from_ordinal(assigned), done])
+
+def user_lines(owners: List[str], rows: Optional[int] = None,
+               password_hash: str = '') -> Iterator[str]:
+    '''
+       Yields SCSV user lines for 'owners' padded up to 'rows' users.
+
+       Every user shares 'password_hash' so hashing runs only once.
+    '''
+
+    rows = max(rows or 0, len(owners))
+    for i in range(rows):
+        name = owners[i] if i < len(owners) else f'extra{i}'
+        yield f'{name};{password_hash}'
+
+def write_lines(path: str, lines: Iterator[str]) -> int:
+    '''
+       Writes lines as a data file without trailing newline.
+
+       Returns number of lines written.
+    '''
+
+    count = 0
+    with open(path, 'w') as f:
+        for line in lines:
+            f.write(line if not count else '\n' + line)
+            count += 1
+    return count
@@ -0,0 +1,292 @@
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from src.file_handler import FileHandler
+from src.task_master import local_model
+from src import user_manager
+from benchmark import data
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None #type: ignore
+
+__version__ = 0.1
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CONST
+##
+# SIZES: Number of rows by size name.
+# BENCHMARKS: Benchmark set up functions by name.
+##
+# 2. CLASS
+##
+# Context: Synthetic data files and objects shared by benchmarks.
+##
+# 3. FUNCTION
+##
+# measure: Wall time, process peak RSS and allocations of a benchmark.
+# run: Runs benchmarks for each size.
+# compare: Lists wall time regressions between two results.
+########################################################
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+# Type of a benchmark: sets up and returns the call to be timed.
+_BENCHMARK_TYPE = Callable[['Context'], Callable[[], Any]]
+
+class Context():
+    '''
+       Synthetic data files in a temporary directory.
+
+       Model and UserManager are created on first use and shared.
+       'dirty' tasks are changed before each timed save.
+    '''
+
+    def __init__(self, rows: int, owners: int = 100, skew: float = 1.,
+                 completed: float = .3, seed: int = 0, dirty: int = 10) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        path = lambda name: os.path.join(self._dir.name, name)
+        self.task_file = path('TASK')
+        self.user_file = path('USER')
+        self.reports = (path('USER_REPORT'), path('TASK_REPORT'))
+        self.owners = data.owner_names(owners)
+
+        data.write_lines(self.task_file, data.task_lines(
+            rows, self.owners, skew, completed, seed))
+        data.write_lines(self.user_file, data.user_lines(
+            self.owners, rows, user_manager.default_hasher.hash(data.PASSWORD)))
+        self._model: Optional[local_model.Model] = None
+        self._users: Optional[user_manager.UserManager] = None
+        self.dirty = dirty
+        # Saves set up so far, each changes tasks to another due date.
+        self.saves = 0
+
+    def release(self) -> None:
+        '''
+           Closes handlers of the data files so they are read again.
+        '''
+
+        for handler in list(FileHandler.handlers.values()):
+            if handler._file.startswith(self._dir.name): handler.close()
+
+    def new_model(self) -> local_model.Model:
+        self.release()
+        return local_model.Model(self.task_file, *self.reports)
+
+    @property
+    def model(self) -> local_model.Model:
+        if self._model is None: self._model = self.new_model()
+        return self._model
+
+    @property
+    def users(self) -> user_manager.UserManager:
+        if self._users is None:
+            self._users = user_manager.UserManager(filename=self.user_file)
+        return self._users
+
+    def close(self) -> None:
+        self.release()
+        self._dir.cleanup()
+
+##############################################
+#                                            #
+#             BENCHMARKS                     #
+#                                            #
+##############################################
+
+def model_init(context: Context) -> Callable[[], Any]:
+    context.release()
+    return lambda: local_model.Model(context.task_file, *context.reports)
+
+def list_tasks(context: Context) -> Callable[[], Any]:
+    tasks = context.model.tasks
+    # Busiest owner.
+    return lambda: tasks.list_tasks(context.owners[0])
+
+def get_stats(context: Context) -> Callable[[], Any]:
+    return context.model.tasks.get_stats
+
+def write_report(context: Context) -> Callable[[], Any]:
+    model = context.model
+    return lambda: model.write_report(context.owners)
+
+def save_tasks(context: Context) -> Callable[[], Any]:
+    model = context.model
+    # Unchanged tasks are not saved: change some spread over the file,
+    # skipping completed tasks which cannot change.
+    step = max(1, len(model.tasks) // max(1, 4 * context.dirty))
+    pending = [i for i in range(0, len(model.tasks), step)
+               if not model.is_task_completed(i)][:context.dirty]
+    context.saves += 1
+    due = data.from_ordinal(data.today_ordinal() + context.saves)
+    for i in pending: model.edit_date(i, due)
+    return model.save_tasks
+
+def log_in(context: Context) -> Callable[[], Any]:
+    users = context.users
+    return lambda: users.log_in(context.owners[0], data.PASSWORD)
+
+BENCHMARKS: Dict[str, _BENCHMARK_TYPE] = {
+    'Model.__init__': model_init,
+    'Tasks.list_tasks': list_tasks,
+    'Tasks.get_stats': get_stats,
+    'Model.write_report': write_report,
+    'Model.save_tasks': save_tasks,
+    'UserManager.log_in': log_in,
+}
+
+##############################################
+#                                            #
+#             MEASURING                      #
+#                                            #
+##############################################
+
+def _peak_rss() -> Optional[int]:
+    '''
+       Peak resident set size of the process in KiB, if available.
+
+       Peak of every benchmark run so far, it never decreases.
+    '''
+
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def measure(benchmark: _BENCHMARK_TYPE, context: Context,
+            repeat: int = 3, allocations: bool = True) -> Dict[str, Any]:
+    '''
+       Returns best wall time of 'repeat' runs, process peak RSS after
+       them and, if 'allocations', peak and retained bytes of one
+       traced run.
+
+       Peak RSS is cumulative over the benchmarks run before in the
+       process: only allocations are measured per benchmark.
+    '''
+
+    times = []
+    for _ in range(repeat):
+        call = benchmark(context)
+        gc.collect()
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    result: Dict[str, Any] = {'wall': min(times),
+                              'process_peak_rss_kib': _peak_rss()}
+
+    if allocations:
+        call = benchmark(context)
+        gc.collect()
+        tracemalloc.start()
+        call()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.update({'alloc_peak_bytes': peak, 'alloc_net_bytes': current})
+    return result
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run(sizes: List[str], names: Optional[List[str]] = None,
+        repeat: int = 3, allocations: bool = True,
+        **data_options) -> Dict[str, Any]:
+    '''
+       Runs benchmarks in 'names' (all if None) for each size name.
+    '''
+
+    results: Dict[str, Any] = {
+        'meta': {
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'options': data_options,
+        },
+        'results': {},
+    }
+    for size in sizes:
+        context = Context(SIZES[size], **data_options)
+        try:
+            for name in names or BENCHMARKS:
+                result = measure(BENCHMARKS[name], context, repeat, allocations)
+                results['results'].setdefault(size, {})[name] = result
+                print(f'{size:>5} {name:<20} {result["wall"]:10.4f} s')
+        finally:
+            context.close()
+    return results
+
+def compare(old: Dict[str, Any], new: Dict[str, Any],
+            threshold: float = .2) -> List[str]:
+    '''
+       Returns a line per benchmark whose wall time grew over 'threshold'.
+    '''
+
+    regressions = []
+    for size, benchmarks in new['results'].items():
+        for name, result in benchmarks.items():
+            before = old['results'].get(size, {}).get(name)
+            if before is None or not before['wall']: continue
+            ratio = result['wall'] / before['wall']
+            if ratio > 1 + threshold:
+                regressions.append(f'{size} {name}: {before["wall"]:.4f} s -> ' + \
+                                   f'{result["wall"]:.4f} s ({ratio:.2f}x)')
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description = 'Times task model hot paths on synthetic data files')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES),
+                        default=['1k'], help='data file sizes')
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS),
+                        help='benchmarks to run, all by default')
+    parser.add_argument('--owners', type=int, default=100,
+                        help='number of task owners')
+    parser.add_argument('--skew', type=float, default=1.,
+                        help='owner skew, 0 spreads tasks evenly')
+    parser.add_argument('--completed', type=float, default=.3,
+                        help='fraction of completed tasks')
+    parser.add_argument('--dirty', type=int, default=10,
+                        help='tasks changed before each timed save')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark, best wall time is kept')
+    parser.add_argument('--no-allocations', dest='allocations',
+                        action='store_false', help='skip traced run')
+    parser.add_argument('--output', type=str, help='JSON file for results')
+    parser.add_argument('--baseline', type=str,
+                        help='JSON results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=.2,
+                        help='wall time growth counted as regression')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.benchmarks, args.repeat, args.allocations,
+                  owners=args.owners, skew=args.skew, completed=args.completed,
+                  dirty=args.dirty)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for line in regressions: print(f'REGRESSION {line}')
+        sys.exit(1 if regressions else 0)
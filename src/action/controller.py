@@ -1,4 +1,5 @@
 from src import protocols
+from src.instrument import instrumented
 
 ESCAPE_ESTATE = 'main menu'
 
@@ -22,6 +23,7 @@ class Controller:
     def bind_UI(*args, **kwargs):
         pass
     
+    @instrumented()
     def run(self):
         '''
             Execute simple command.
@@ -0,0 +1,237 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import (Any, Awaitable, Callable, Dict, Hashable, List, Optional,
+                    Tuple)
+from src import config, plugin, protocols
+from src.user_manager import UserManager, hash_password
+
+__version__ = 0.1
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CLASS
+##
+# Coalescer: Shares one run among concurrent identical reads.
+# AsyncModel: async_model_protocol over a model.
+# AsyncUserManager: async_user_protocol over a user manager.
+##
+# 2. FUNCTION
+##
+# kdf_executor: Shared executor for password hashing.
+########################################################
+
+# Shared by every AsyncUserManager, created on first use.
+_kdf_executor: Optional[Executor] = None
+
+def kdf_executor() -> Executor:
+    '''
+       Returns executor of config.ASYNC_KDF_WORKERS threads for
+       password hashing and verification.
+    '''
+
+    global _kdf_executor
+    if _kdf_executor is None:
+        _kdf_executor = ThreadPoolExecutor(config.ASYNC_KDF_WORKERS,
+                                           thread_name_prefix='kdf')
+    return _kdf_executor
+
+class Coalescer():
+    '''
+       Shares one run among concurrent identical reads.
+
+       A read whose key is already running awaits that run instead
+       of starting another, so they all get the same result object.
+       'forget' makes later reads start afresh, as after a write.
+    '''
+
+    def __init__(self) -> None:
+        self._running: Dict[Hashable, 'asyncio.Future[Any]'] = dict()
+
+    async def run(self, key: Hashable, start: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._running.get(key)
+        if future is None:
+            future = asyncio.ensure_future(start())
+            self._running[key] = future
+            future.add_done_callback(partial(self._done, key))
+        # Cancelling one waiter does not cancel the shared run.
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: 'asyncio.Future[Any]') -> None:
+        if self._running.get(key) is future: del self._running[key]
+
+    def forget(self) -> None:
+        self._running.clear()
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+##############################################
+#                                            #
+#             MODEL                          #
+#                                            #
+##############################################
+
+class AsyncModel():
+    '''
+       Asyncio facade of a model.
+
+       Calls run one at a time on the model's own thread, so file
+       I/O never blocks the event loop and the model needs no locks.
+       Concurrent identical reads share one call. A write makes
+       reads issued after it start a new call.
+    '''
+
+    def __init__(self, model: protocols.model_protocol,
+                 executor: Optional[Executor] = None) -> None:
+        self.model = model
+        self._executor = executor or ThreadPoolExecutor(1, thread_name_prefix='model')
+        self._reads = Coalescer()
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> 'AsyncModel':
+        '''
+           Loads a config.TASK_MODEL on the model's thread.
+        '''
+
+        executor = ThreadPoolExecutor(1, thread_name_prefix='model')
+        model = await asyncio.get_running_loop().run_in_executor(
+            executor, partial(plugin.get_class(config.TASK_MODEL), *args, **kwargs))
+        return cls(model, executor)
+
+    async def _call(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(func, *args))
+
+    async def _read(self, func: Callable, *args) -> Any:
+        return await self._reads.run((func.__name__, args),
+                                     lambda: self._call(func, *args))
+
+    async def _write(self, func: Callable, *args) -> Any:
+        self._reads.forget()
+        return await self._call(func, *args)
+
+    def close(self) -> None:
+        '''
+           Waits for queued calls and stops the model's thread.
+        '''
+
+        self._executor.shutdown(wait=True)
+
+# READS
+
+    async def get_all_tasks(self, user: Optional[str] = None
+                            ) -> Tuple[List[str], List[int]]:
+        return await self._read(self.model.get_all_tasks, user)
+
+    async def get_task(self, index: int) -> Any:
+        return await self._read(self.model.get_task, index)
+
+    async def is_task_completed(self, task_id: int) -> bool:
+        return await self._read(self.model.is_task_completed, task_id)
+
+# WRITES
+
+    async def add_task(self, data: List[str]) -> bool:
+        return await self._write(self.model.add_task, data)
+
+    async def mark_as_completed(self, task_id: int) -> None:
+        return await self._write(self.model.mark_as_completed, task_id)
+
+    async def edit_user(self, task_id: int, owner: str) -> bool:
+        return await self._write(self.model.edit_user, task_id, owner)
+
+    async def edit_date(self, task_id: int, date: str) -> bool:
+        return await self._write(self.model.edit_date, task_id, date)
+
+    async def save_tasks(self):
+        return await self._write(self.model.save_tasks)
+
+    async def read_report(self, userlist: List[str]) -> str:
+        # Writes report files before reading them.
+        return await self._write(self.model.read_report, userlist)
+
+    async def write_report(self, userlist: List[str]) -> None:
+        return await self._write(self.model.write_report, userlist)
+
+##############################################
+#                                            #
+#             USERS                          #
+#                                            #
+##############################################
+
+class AsyncUserManager():
+    '''
+       Asyncio facade of a user manager.
+
+       Password hashing and verification run on the shared KDF
+       executor, user file reads and writes one at a time on the
+       manager's own thread. Concurrent identical reads share one call.
+       The logged user is kept by the facade, so logins verifying
+       at the same time do not overwrite each other.
+    '''
+
+    def __init__(self, users: Optional[UserManager] = None,
+                 executor: Optional[Executor] = None,
+                 kdf: Optional[Executor] = None) -> None:
+        self.users_manager = users or plugin.get_class(config.USER_MANAGER)()
+        self._executor = executor or ThreadPoolExecutor(1, thread_name_prefix='users')
+        self._kdf = kdf or kdf_executor()
+        self._reads = Coalescer()
+        self._user: Optional[str] = None
+
+    async def _read(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await self._reads.run(key, lambda:
+            loop.run_in_executor(self._executor, call))
+
+    async def _call(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(func, *args))
+
+    async def _hash(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._kdf, partial(func, *args))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def user_exists(self, user: str) -> bool:
+        return await self._read(('user_exists', user),
+                                partial(self.users_manager.user_exists, user))
+
+    async def add_user(self, user: str, pwd: str) -> bool:
+        if user == '' or pwd == '': return False
+        if await self._call(self.users_manager.user_exists, user): return False
+        hashed = await self._hash(hash_password, pwd)
+        self._reads.forget()
+        return await self._call(self.users_manager.add_hashed, user, hashed)
+
+    async def log_in(self, user: str, pwd: str) -> bool:
+        '''
+           Logs in if matching username and password.
+        '''
+
+        self._user = None
+        stored = await self._call(self.users_manager.stored_hash, user)
+        if not await self._hash(self.users_manager.check_password,
+                                user, stored, pwd):
+            return False
+        self._user = user
+        return True
+
+    @property
+    def user_logged(self) -> Optional[str]:
+        return self._user
+
+    async def is_admin(self) -> bool:
+        admins = await self._read('admins', lambda: self.users_manager.admins)
+        return self._user in admins
+
+    async def users(self) -> List[str]:
+        return await self._read('users', lambda: list(self.users_manager.users))
+
+    async def count(self) -> int:
+        return await self._read('count', lambda: len(self.users_manager))
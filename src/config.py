@@ -1,5 +1,4 @@
 import logging
-import logging.handlers
 
 ######################
 # SYSYEM FILES PATHS #
@@ -34,6 +33,11 @@ _TASK_REPORT_FILE_ = 'reports/TASK_REPORT'
 _ENV_PATH_ = '.env'
 
 
+# Path to SQLite database:
+# - Used by src.file_handler.SQLiteFileHandler and the SQLite task model.
+_SQLITE_DB_ = 'etc/.DB'
+
+
 # Path to dummy file for test purposes:
 # - Used as default value for file path.
 _DUMMY_FILE_ = "dummy.txt"
@@ -43,6 +47,127 @@ _DUMMY_FILE_ = "dummy.txt"
 _LOG_FILE_ = 'etc/.LOG'
 
 
+#####################
+# DATA FILE JOURNAL #
+#####################
+
+# Suffix appended to a data file path to name its change journal:
+# - Used by src.file_handler.JournalFileHandler.
+_JOURNAL_SUFFIX_ = '.journal'
+
+# Suffix appended to the journal path to name the journal of a snapshot
+# being written:
+# - Holds the checksum of the new snapshot, so an interrupted snapshot
+#   write is finished or dropped on the next load.
+_PENDING_SUFFIX_ = '.pending'
+
+# Journal size in bytes that triggers a background compaction:
+# - Journal is folded into a fresh snapshot of the data file.
+JOURNAL_COMPACT_SIZE = 1_000_000
+
+
+#####################
+# PARTIAL TASK LOAD #
+#####################
+
+# Suffix appended to the task file path to name its owner index:
+# - Byte ranges of the rows of each owner, see src.task_master.owner_index.
+_OWNER_INDEX_SUFFIX_ = '.owners'
+
+# App loads only tasks of the logged user, all tasks when first needed:
+# - Used by src.task_manager with src.task_master.local_model.Model.
+PARTIAL_LOAD = False
+
+
+####################
+# DATA FILE WRITES #
+####################
+
+# Files are written to a temporary file renamed over the target.
+# Durability of the rename, from fastest to safest:
+# - 'none': survives a crash of the app, not of the system,
+# - 'fsync-file': file data flushed to disk before the rename,
+# - 'fsync-dir': directory also flushed so the rename itself persists.
+WRITE_DURABILITY = 'fsync-file'
+
+
+###################
+# DATA FILE LOCKS #
+###################
+
+# Suffix appended to a data file path to name its lock file:
+# - Sessions sharing a data file take advisory locks on it,
+#   shared for loads and exclusive for dumps.
+_LOCK_SUFFIX_ = '.lock'
+
+# Seconds waited for a lock after which the wait is logged:
+# - Waits are also recorded by src.instrument when enabled.
+LOCK_WAIT_WARNING = 0.1
+
+
+########################
+# LOGIN VERIFY CACHE   #
+########################
+
+# Recent successful password verifications kept to skip the slow hash:
+# - Number of entries, 0 disables the cache.
+VERIFY_CACHE_SIZE = 0
+# - Seconds an entry is valid.
+VERIFY_CACHE_TTL = 300.
+
+
+####################
+# BULK USER IMPORT #
+####################
+
+# Processes hashing passwords of imported users, 0 for one per core:
+# - Used by src.user_manager.UserManager.add_users.
+HASH_WORKERS = 0
+# Passwords hashed per task sent to a process.
+HASH_CHUNK_SIZE = 16
+
+
+###################
+# INSTRUMENTATION #
+###################
+
+# Seconds from importing src.task_manager to the first prompt:
+# - Checked by 'python -m src.task_manager --startup-profile', failing over budget.
+STARTUP_BUDGET = 0.5
+
+# Record latency of states, controllers and file handlers:
+# - Summary written to stderr at exit, see src.instrument.
+INSTRUMENTATION = False
+
+
+###################
+# HTTP API SERVER #
+###################
+
+# Address the JSON API of src.server listens on.
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+# Threads serving connections, each keep-alive connection holds one.
+SERVER_WORKERS = 8
+# Seconds an idle keep-alive connection is kept open.
+SERVER_KEEP_ALIVE = 5.
+# Seconds a login session token is valid.
+SERVER_SESSION_TTL = 3600.
+# Responses to reads kept until the next write.
+SERVER_CACHE_SIZE = 1024
+# Largest request body read, in bytes.
+SERVER_MAX_BODY = 1 << 20
+
+
+##################
+# ASYNCIO FACADE #
+##################
+
+# Threads hashing and verifying passwords for src.async_model:
+# - Model and user file calls each run on a single thread.
+ASYNC_KDF_WORKERS = 4
+
+
 #######################
 # LOGGING ROOT CONFIG #
 #######################
@@ -53,13 +178,34 @@ _LOG_FILE_ = 'etc/.LOG'
 #                     format='%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s',
 #                     datefmt='%H:%M:%S',
 #                     level=logging.INFO)
-logging.getLogger('').setLevel(logging.NOTSET)
-rotatingHandler = logging.handlers.RotatingFileHandler(
-    filename=_LOG_FILE_, maxBytes=10_000, backupCount=5)
-rotatingHandler.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-rotatingHandler.setFormatter(formatter)
-logging.getLogger('').addHandler(rotatingHandler)
+
+# Where records are written, a file path or 'stderr':
+# - Records are queued and written by a thread, see src.logs.
+LOG_SINK = _LOG_FILE_
+# Size in bytes a log file is rotated at and rotated files kept.
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUP_COUNT = 5
+# Format of records, 'text' or 'json' with one object per line.
+LOG_FORMAT = 'text'
+# Records below level are dropped before being built.
+LOG_LEVEL = logging.INFO
+
+_logging_set = False
+
+def setup_logging() -> None:
+    '''
+       Logs records of the root logger through a queue to the
+       configured sink, see src.logs.
+
+       Called by entry points, not at import, so importing modules
+       does not open the log file. Later calls do nothing.
+    '''
+
+    global _logging_set
+    if _logging_set: return
+    _logging_set = True
+    from src import logs
+    logs.setup()
 
 
 ######################
@@ -72,6 +218,12 @@ PRESENTATION_INTERFACE='src.presentation_prompt.Presentation'
 INSERTION_INTERFACE='src.insert_prompt.Insert'
 
 PASSWORD_HASHER='passlib.hash.pbkdf2_sha256'
+# Append only alternative: 'src.file_handler.JournalFileHandler'
+# Database alternative: 'src.file_handler.SQLiteFileHandler'
 FILE_HANDLER='src.file_handler.SCSVFileHandler'
 REPORT_HANDLER='src.file_handler.ReportFileHandler'
-USER_MANAGER='src.user_manager.UserManager'
\ No newline at end of file
+USER_MANAGER='src.user_manager.UserManager'
+# Database alternative: 'src.task_master.sqlite_model.Model'
+TASK_MODEL='src.task_master.local_model.Model'
+# Column store alternative: 'src.task_master.columnar_tasks.ColumnarTasks'
+TASK_STORE='src.task_master.tasks.Tasks'
\ No newline at end of file
@@ -1,8 +1,30 @@
+import io
 import os
+import shutil
+import zlib
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Iterable, List, Mapping, Optional, Protocol, TextIO
-from src.config import _DUMMY_FILE_
+from contextlib import contextmanager
+from itertools import islice
+from typing import (TYPE_CHECKING, Any, BinaryIO, Iterable, Iterator,
+                    List, Mapping, Optional, Protocol, TextIO, Tuple)
+from src.config import (_DUMMY_FILE_, _JOURNAL_SUFFIX_, _LOCK_SUFFIX_,
+                        _PENDING_SUFFIX_, _SQLITE_DB_, JOURNAL_COMPACT_SIZE, LOCK_WAIT_WARNING,
+                        WRITE_DURABILITY)
+from src.instrument import instrumented, is_enabled, timed
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: locks through msvcrt, always exclusive.
+    fcntl = None #type: ignore
+    import msvcrt
+
+if TYPE_CHECKING:
+    # Imported on first connection, only database handlers need it.
+    import sqlite3
 
 __version__ = 0.1
 
@@ -11,6 +33,136 @@ logger = logging.getLogger(__name__)
 
 DATA_TYPE = Mapping[str, str]
 
+# Bytes read at a time when checking the bytes before the last
+# read offset, to tell an append from a rewrite of the file.
+_CHECK_CHUNK_ = 1 << 20
+
+# Lines joined into each string passed to writelines.
+_WRITE_CHUNK_ = 4096
+
+# Durability levels of file writes, see config.WRITE_DURABILITY.
+DURABILITY_NONE = 'none'
+DURABILITY_FILE = 'fsync-file'
+DURABILITY_DIR = 'fsync-dir'
+
+##############################################
+#                                            #
+#             DURABLE WRITES                 #
+#                                            #
+##############################################
+
+def _fsync_dir(path:str) -> None:
+    '''
+       Flushes directory entry of 'path' to disk.
+    '''
+
+    # Directories cannot be opened on Windows, renames are journaled there.
+    if os.name == 'nt': return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def sync(file, durability:str = WRITE_DURABILITY) -> None:
+    '''
+       Flushes an open file to disk unless durability is 'none'.
+    '''
+
+    if durability == DURABILITY_NONE: return
+    file.flush()
+    os.fsync(file.fileno())
+
+@contextmanager
+def atomic_write(path:str, mode:str = 'w',
+                 durability:str = WRITE_DURABILITY) -> Iterator[Any]:
+    '''
+       Opens a temporary file in the directory of 'path' that replaces
+       'path' once the block succeeds, so readers and crashes see either
+       the old or the new content. The replaced file's permissions are
+       kept. The temporary file is removed if the block raises.
+    '''
+
+    if durability not in (DURABILITY_NONE, DURABILITY_FILE, DURABILITY_DIR):
+        raise ValueError(f'Unknown durability {durability}')
+    temp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp, mode) as f:
+            yield f
+            sync(f, durability)
+        # Keep permissions of the file being replaced.
+        try:
+            shutil.copymode(path, temp)
+        except FileNotFoundError:
+            pass
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    if durability == DURABILITY_DIR: _fsync_dir(path)
+
+def _checksum(file:BinaryIO, end:int) -> Tuple[int, bytes]:
+    '''
+       Returns checksum of the first 'end' bytes of binary 'file'
+       and the last of those bytes, leaving the file at 'end'.
+    '''
+
+    file.seek(0)
+    checksum, last, left = zlib.crc32(b''), b'', end
+    while left > 0:
+        data = file.read(min(left, _CHECK_CHUNK_))
+        if not data: break
+        checksum = zlib.crc32(data, checksum)
+        last, left = data[-1:], left - len(data)
+    return checksum, last
+
+def _chunks(lines:Iterable[str], separator:str = '\n',
+            start:str = '') -> Iterator[str]:
+    '''
+       Joins lines with 'separator' into strings of _WRITE_CHUNK_ lines.
+
+       First line is preceded by 'start', the others by 'separator'.
+    '''
+
+    iterator = iter(lines)
+    while True:
+        chunk = list(islice(iterator, _WRITE_CHUNK_))
+        if not chunk: return
+        yield start + separator.join(chunk)
+        start = separator
+
+##############################################
+#                                            #
+#             FILE LOCKS                     #
+#                                            #
+##############################################
+
+def _lock(file, exclusive:bool) -> None:
+    '''
+       Blocks until the advisory lock of open 'file' is held.
+    '''
+
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return
+    # Retries for about 10 seconds before raising OSError.
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock(file) -> None:
+    '''
+       Releases the advisory lock of open 'file'.
+    '''
+
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
 ##############################################
 #                                            #
 #             PROTOCOL & BASE                #
@@ -55,6 +207,16 @@ class FileHandler(ABC):
        stored is implementation dependent.
        Implements simple buffer for loading only if file's
        timestamp changed from last read.
+       Incremental handlers parse only the bytes appended since
+       the last read when the bytes before that offset did not change.
+       Dumps write a temporary file renamed over the file, with the
+       durability set in config.WRITE_DURABILITY.
+       Sessions sharing the file take an advisory lock on a lock file
+       next to it, shared while loading and exclusive while dumping.
+       'version' of the file is kept at each load and dump, so writes
+       by other sessions can be detected with 'stale'.
+       'generation' changes whenever the buffer is read or written, so
+       data derived from the buffer can be kept until it does.
        Static class variable 'handlers' stores existing instances
        of the class.
     '''
@@ -62,6 +224,11 @@ class FileHandler(ABC):
     
     # Existing file handlers.
     handlers = dict()
+
+    # Appended bytes can be parsed on their own.
+    _incremental = False
+    # Each row is a line of the file, readable on its own by byte range.
+    line_rows = False
     
     def __new__(cls, filename:str = _DUMMY_FILE_,
                 *args, **kwargs):
@@ -106,6 +273,23 @@ class FileHandler(ABC):
         # - timestamp for reading only if file changed.
         self._buffer: List[DATA_TYPE] = list()
         self._timestamp: Optional[float] = None
+        # - offset, checksum of the bytes before it and inode of the
+        #   file read for incremental reads.
+        self._offset: int = 0
+        self._checksum: Optional[int] = None
+        self._inode: Optional[int] = None
+        # - count of loads and dumps that changed buffer or file.
+        self._generation: int = 0
+        # - file version at last load or dump.
+        self._version: Optional[Tuple] = None
+        # - lock file while the lock is held and total seconds waited for it.
+        self._lock_file: Optional[BinaryIO] = None
+        self._lock_exclusive = False
+        self._lock_wait = 0.
+        self._thread_lock = threading.RLock()
+
+        # Next calls for this filename reuse the existing state.
+        self._initialized = True
 
         # If file exists, return.
         if os.path.exists(self._file): return
@@ -123,8 +307,6 @@ class FileHandler(ABC):
                     self.close()
                     raise e
 
-        self._initialized = True
-
     def time_stamp_alt(self):
         '''
            Checks if timestamp changed since last load.
@@ -133,26 +315,113 @@ class FileHandler(ABC):
         old_timestamp, self._timestamp = self._timestamp, os.stat(self._file).st_mtime
         return old_timestamp is None or self._timestamp != old_timestamp
     
+    @instrumented()
     def dump(self) -> None:
         '''
            dump available input in file.
         '''
 
         if not self._buffer: return
-        with open(self._file, 'w') as f:
-            logger.info(f'File {self._file} open for writing by {self.__class__}')
-            self._implementation_dump(f)
+        with self.locked():
+            with atomic_write(self._file) as f:
+                logger.info('File %s open for writing by %s', self._file, self.__class__)
+                self._implementation_dump(f)
+                offset = f.tell()
+            self._generation += 1
+            self._version = self._current_version()
+            # Buffer now matches the whole file.
+            if self._incremental: self._mark_offset(offset)
+
+    def dump_rows(self, indices:Iterable[int]) -> None:
+        '''
+           dump after changes to buffer rows in 'indices' and rows appended.
 
+           Handlers able to write single rows override it, the others
+           dump the whole buffer.
+        '''
+
+        self.dump()
+
+    @instrumented()
     def load(self) -> None:
         '''
            load file if changed since last load.
+
+           Incremental handlers only parse appended bytes if possible.
         '''
         
-        if self.time_stamp_alt():
+        # Unchanged since last load or dump, checked without the lock.
+        if self._timestamp is not None and self._version is not None and \
+           self._current_version() == self._version: return
+        with self.locked(exclusive=False):
+            if not self.time_stamp_alt(): return
+            self._version = self._current_version()
+            if self._incremental and self._tail_load(): return
             with open(self._file, 'r') as f:
-                logger.info(f'File {self._file} open for reading by {self.__class__}')
+                logger.info('File %s open for reading by %s', self._file, self.__class__)
                 self._buffer.clear()
                 self._buffer.extend(self._implementation_load(f))
+                if self._incremental: self._mark_offset(f.tell(), f.buffer)
+            self._generation += 1
+
+    def reload(self) -> None:
+        '''
+           load whole file even if unchanged since last load.
+        '''
+
+        self._timestamp = None
+        self._checksum = None
+        self._inode = None
+        self.load()
+
+    def _mark_offset(self, offset:int, file = None) -> None:
+        '''
+           Keeps offset read, checksum of the bytes before it and inode.
+
+           Reads from binary 'file' if given, so it is the same file read.
+        '''
+
+        if file is None:
+            with open(self._file, 'rb') as f:
+                self._mark_offset(offset, f)
+            return
+        self._offset = offset
+        self._checksum, _ = _checksum(file, offset)
+        self._inode = os.fstat(file.fileno()).st_ino
+
+    def _tail_load(self) -> bool:
+        '''
+           Parses only bytes appended since last read into buffer.
+
+           Returns False if file was replaced, truncated or rewritten.
+        '''
+
+        if self._checksum is None: return False
+        with open(self._file, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # Replaced file: atomic writes always change the inode.
+            if stat.st_ino != self._inode: return False
+            # Truncated file.
+            if stat.st_size < self._offset: return False
+            checksum, last = _checksum(f, self._offset)
+            # Rewritten in place, anywhere before the offset.
+            if checksum != self._checksum: return False
+            tail = f.read()
+
+        if not tail: return True
+        text = tail.decode()
+        # Data files have no trailing newline: appended rows start with one.
+        if self._offset and last != b'\n':
+            if not text.startswith('\n'): return False
+            text = text[1:]
+
+        logger.info('File %s tail of %s bytes read by %s',
+                    self._file, len(tail), self.__class__)
+        self._buffer.extend(self._implementation_load(io.StringIO(text)))
+        self._generation += 1
+        self._offset += len(tail)
+        self._checksum = zlib.crc32(tail, self._checksum)
+        return True
     
     @abstractmethod
     def _implementation_dump(self, textfile:TextIO) -> None:
@@ -171,6 +440,92 @@ class FileHandler(ABC):
     @property
     def buffer(self):
         return self._buffer
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+##############################################
+#                                            #
+#             LOCKS AND VERSIONS             #
+#                                            #
+##############################################
+
+    @contextmanager
+    def locked(self, exclusive:bool = True) -> Iterator[None]:
+        '''
+           Holds the advisory lock of the file, exclusive for writing
+           or shared for reading.
+
+           Nested calls keep the lock held, upgrading it if exclusive.
+           Waits longer than config.LOCK_WAIT_WARNING seconds are logged.
+        '''
+
+        # Windows locks are always exclusive.
+        exclusive = exclusive or fcntl is None
+        with self._thread_lock:
+            if self._lock_file is not None:
+                if exclusive and not self._lock_exclusive:
+                    self._acquire(self._lock_file, exclusive)
+                yield
+                return
+            file = open(self._file + _LOCK_SUFFIX_, 'a+b')
+            try:
+                self._acquire(file, exclusive)
+            except BaseException:
+                file.close()
+                raise
+            self._lock_file = file
+            try:
+                yield
+            finally:
+                self._lock_file = None
+                _unlock(file)
+                file.close()
+
+    def _acquire(self, file, exclusive:bool) -> None:
+        '''
+           Takes lock of open lock file measuring the wait.
+        '''
+
+        start = time.perf_counter()
+        if is_enabled():
+            with timed(f'lock wait {os.path.basename(self._file)}'):
+                _lock(file, exclusive)
+        else:
+            _lock(file, exclusive)
+        wait = time.perf_counter() - start
+        self._lock_exclusive = exclusive
+        self._lock_wait += wait
+        if wait > LOCK_WAIT_WARNING:
+            kind = 'exclusive' if exclusive else 'shared'
+            logger.warning('Waited %.3f s for %s lock of %s', wait, kind, self._file)
+
+    def _current_version(self) -> Tuple:
+        '''
+           Identifies file content: a dump replaces the file, so its
+           inode, size and modification time change.
+        '''
+
+        stat = os.stat(self._file)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def stale(self) -> bool:
+        '''
+           Checks if file was written by another session since last
+           load or dump.
+        '''
+
+        return self._version is not None and \
+            self._current_version() != self._version
+
+    @property
+    def lock_wait(self) -> float:
+        '''
+           Total seconds waited for the lock of the file.
+        '''
+
+        return self._lock_wait
     
 ##############################################
 #                                            #
@@ -185,8 +540,13 @@ class SCSVFileHandler(FileHandler):
 
         - Initialize with filename and default content,
         - load and dump lists of DATA_TYPE,
-        - if '_labels' is not defined, apply numeric labels.
+        - if '_labels' is not defined, apply numeric labels,
+        - rows appended to file are read without a full reload.
     '''
+
+    _incremental = True
+    line_rows = True
+
     def __init__(self, *args, **kwargs):
         super(SCSVFileHandler, self).__init__(*args, **kwargs)
         
@@ -203,38 +563,683 @@ class SCSVFileHandler(FileHandler):
             pad_size = 0
         return ';'.join(line + ['']*pad_size)
 
+    def _parse_line(self, line:str) -> DATA_TYPE:
+        '''
+           Parse a line in SCSV format with handler's label order.
+        '''
+
+        return self._parse_values(line.rstrip('\n').split(';'))
+
+    def _parse_values(self, values:List[str]) -> DATA_TYPE:
+        '''
+           Map a list of values to handler's labels.
+        '''
+
+        # Use set labels if defined:
+        # - Entries will be limited by number of labels.
+        if len(self._labels):
+            return {k:v for k,v in zip(self._labels, values)}
+        # Else use numeric labels:
+        # - Entries will not be limited.
+        return {str(i):v for i,v in enumerate(values)}
+
     def _implementation_dump(self, file:TextIO) -> None:
         '''
            Implementation of dump for SCSV file.
         '''
 
         if not len(self.buffer): return
-        file.write(self._build_line(self._buffer[0]))
-        for line in self._buffer[1:]:
-            file.write('\n'+self._build_line(line))
+        file.writelines(_chunks(map(self._build_line, self._buffer)))
     
     def _implementation_load(self, file:TextIO) -> List[DATA_TYPE]:
         '''
            Implementation of load for SCSV file.
         '''
 
-        # Use set labels if defined:
-        # - Entries will be limited by number of labels.
-        if len(self._labels):
-            return  list(map(
-                lambda line: {k:v for k,v in \
-                              zip(self._labels, line.rstrip('\n').split(';'))},
-                file.readlines()
-                ))
-        # Else use numeric labels:
-        # - Entries will not be limited.
-        return list(map(
-            lambda line: {str(i):v for i,v in enumerate(line.rstrip('\n').split(';'))},
-            file.readlines()
-            ))
+        return list(map(self._parse_line, file.readlines()))
+
+
+# Journal record operation codes.
+JOURNAL_INSERT = 'I'
+JOURNAL_UPDATE = 'U'
+JOURNAL_CHANGE = 'C'
+
+class JournalFileHandler(SCSVFileHandler):
+    '''
+       Class that deals with a semicolon separated values file
+       kept as a snapshot plus an append only journal of changes.
+
+        - load replays the journal on top of the snapshot,
+        - dump appends records only for rows that changed since
+          the last load or dump,
+        - once the journal passes 'compact_size' bytes, a background
+          thread folds it into a fresh snapshot.
+
+       Each journal record is a line with an operation code,
+       the row index and the data:
+        - I;index;values...  : row inserted at index,
+        - U;index;values...  : whole row replaced,
+        - C;index;label;value: single field changed (e.g. completion).
+
+       A new snapshot and its journal are first written together to a
+       pending journal, holding the snapshot checksum, so a crash
+       between replacing both never replays records already in the
+       snapshot.
+    '''
+
+    # Rows changed in the journal are not where the snapshot has them.
+    line_rows = False
+
+    def __init__(self, filename:str = _DUMMY_FILE_, *args,
+                 compact_size:int = JOURNAL_COMPACT_SIZE, **kwargs):
+        first_init = not self._initialized
+        super(JournalFileHandler, self).__init__(filename, *args, **kwargs)
+
+        # Skip initialization for existing file handlers.
+        if not first_init: return
+
+        self._journal = filename + _JOURNAL_SUFFIX_
+        self._pending = self._journal + _PENDING_SUFFIX_
+        self._compact_size = compact_size
+        # Lines as persisted in snapshot plus journal.
+        self._persisted: List[str] = list()
+        # Journal bytes replayed into buffer.
+        self._journal_offset = 0
+        # Guards persisted state against the compaction thread.
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        # Counts snapshots written, stale compactions are dropped.
+        self._snapshots = 0
+
+    def close(self):
+        '''
+           Waits for a running compaction before closing.
+        '''
+
+        if self._compactor is not None: self._compactor.join()
+        super(JournalFileHandler, self).close()
+
+    def _snapshot_stamp(self) -> float:
+        '''
+           Timestamp of snapshot file.
+        '''
+
+        return os.stat(self._file).st_mtime
+
+    def _current_version(self) -> Tuple:
+        '''
+           Snapshot version and journal size: other sessions append
+           to the journal without replacing the snapshot.
+        '''
+
+        size = os.path.getsize(self._journal) \
+            if os.path.exists(self._journal) else 0
+        return (super(JournalFileHandler, self)._current_version(), size)
+
+    def _read_journal(self, start:int = 0, end:Optional[int] = None):
+        '''
+           Returns complete records between offsets and the offset after them.
+        '''
+
+        if not os.path.exists(self._journal): return [], start
+        with open(self._journal, 'rb') as f:
+            f.seek(start)
+            data = f.read() if end is None else f.read(end - start)
+        # A last record without line ending is a torn write.
+        data = data[:data.rfind(b'\n')+1]
+        return data.decode().splitlines(keepends=True), start + len(data)
+
+##############################################
+#                                            #
+#             JOURNAL RECORDS                #
+#                                            #
+##############################################
+
+    def _replay(self, rows:List[DATA_TYPE], records:Iterable[str],
+                persisted:Optional[List[str]] = None) -> None:
+        '''
+           Applies journal records to rows in place.
+
+           If 'persisted' lines are given, they follow the replayed rows.
+        '''
+
+        for record in records:
+            op, index, *values = record.rstrip('\n').split(';')
+            try:
+                i = int(index)
+                if op == JOURNAL_INSERT:
+                    rows.insert(i, self._parse_values(values))
+                    if persisted is not None:
+                        persisted.insert(i, self._build_line(rows[i]))
+                    continue
+                if op == JOURNAL_UPDATE:
+                    rows[i] = self._parse_values(values)
+                elif op == JOURNAL_CHANGE:
+                    rows[i][values[0]] = values[1] #type: ignore
+                else:
+                    raise ValueError(f'Unknown operation {op}')
+                if persisted is not None:
+                    persisted[i] = self._build_line(rows[i])
+            except (ValueError, IndexError) as e:
+                logger.warning('Skipped journal record %r: %s', record, e)
+
+    def _change_record(self, index:int, old:str, new:str) -> str:
+        '''
+           Builds the smallest record turning line 'old' into 'new'.
+        '''
+
+        old_values, new_values = old.split(';'), new.split(';')
+        changed = [i for i, (a, b) in enumerate(zip(old_values, new_values))
+                   if a != b]
+        if len(old_values) == len(new_values) and len(changed) == 1:
+            pos = changed[0]
+            label = self._labels[pos] if len(self._labels) else str(pos)
+            return ';'.join([JOURNAL_CHANGE, str(index),
+                             label, new_values[pos]])
+        return ';'.join([JOURNAL_UPDATE, str(index), new])
+
+    def _records(self, indices:Optional[Iterable[int]] = None) -> Iterator[str]:
+        '''
+           Yields records for rows changed since last persisted
+           and updates persisted lines.
+
+           Only rows in sorted 'indices' are compared if given.
+        '''
+
+        for i in range(len(self._buffer)) if indices is None else indices:
+            row = self._buffer[i]
+            line = self._build_line(row)
+            if i >= len(self._persisted):
+                self._persisted.append(line)
+                yield ';'.join([JOURNAL_INSERT, str(i), line])
+            elif line != self._persisted[i]:
+                yield self._change_record(i, self._persisted[i], line)
+                self._persisted[i] = line
+
+##############################################
+#                                            #
+#             LOAD AND DUMP                  #
+#                                            #
+##############################################
+
+    @instrumented()
+    def load(self) -> None:
+        '''
+           load snapshot and replay journal if either changed since last load.
+        '''
+
+        with self._lock, self.locked(exclusive=False):
+            self._version = self._current_version()
+            if self._tail_load(): return
+            if os.path.exists(self._pending):
+                with self.locked():
+                    self._recover()
+                self._version = self._current_version()
+            self._timestamp = self._snapshot_stamp()
+            with open(self._file, 'r') as f:
+                logger.info('File %s open for reading by %s', self._file, self.__class__)
+                rows = self._implementation_load(f)
+            records, self._journal_offset = self._read_journal()
+            self._replay(rows, records)
+            self._buffer.clear()
+            self._buffer.extend(rows)
+            self._persisted = [self._build_line(row) for row in rows]
+            self._generation += 1
+
+    def _tail_load(self) -> bool:
+        '''
+           Replays only journal records appended since last read.
+
+           Returns False if snapshot changed or journal was truncated.
+        '''
+
+        if self._timestamp is None: return False
+        if self._snapshot_stamp() != self._timestamp: return False
+        size = os.path.getsize(self._journal) \
+            if os.path.exists(self._journal) else 0
+        if size < self._journal_offset: return False
+        if size == self._journal_offset: return True
+        records, self._journal_offset = self._read_journal(self._journal_offset)
+        logger.info('File %s tail of %s records read by %s',
+                    self._journal, len(records), self.__class__)
+        self._replay(self._buffer, records, self._persisted)
+        self._generation += 1
+        return True
+
+    @instrumented()
+    def dump(self) -> None:
+        '''
+           Appends changed rows to journal.
+
+           Removed rows cannot be journaled, a new snapshot is written instead.
+        '''
+
+        self._dump_records()
+
+    @instrumented()
+    def dump_rows(self, indices:Iterable[int]) -> None:
+        '''
+           Appends records of rows in 'indices' and of rows appended.
+        '''
+
+        with self._lock:
+            appended = range(len(self._persisted), len(self._buffer))
+            self._dump_records(sorted(
+                {i for i in indices if i < len(self._persisted)}.union(appended)))
+
+    def _dump_records(self, indices:Optional[List[int]] = None) -> None:
+        '''
+           Appends records of rows in sorted 'indices' (all if None).
+        '''
+
+        if not self._buffer: return
+        with self._lock, self.locked():
+            if len(self._buffer) < len(self._persisted):
+                self._write_snapshot([self._build_line(row) for row in self._buffer])
+                self._persisted = [self._build_line(row) for row in self._buffer]
+                self._generation += 1
+                self._version = self._current_version()
+                return
+            self._merge_tail(indices)
+            records = ''.join(record + '\n' for record in self._records(indices))
+            if not records: return
+            with open(self._journal, 'ab') as f:
+                logger.info('File %s open for appending by %s', self._journal, self.__class__)
+                f.write(records.encode())
+                sync(f)
+                size = f.tell()
+            self._journal_offset = size
+            self._generation += 1
+            self._version = self._current_version()
+        if size > self._compact_size: self.compact(wait=False)
+
+    def _merge_tail(self, indices:Optional[List[int]] = None) -> None:
+        '''
+           Replays records other sessions appended since last read,
+           before appending after them.
+
+           Fields of rows in 'indices' (all if None) changed here and
+           not dumped yet keep their value.
+        '''
+
+        if self._timestamp is None or self._snapshot_stamp() != self._timestamp: return
+        size = os.path.getsize(self._journal) \
+            if os.path.exists(self._journal) else 0
+        if size <= self._journal_offset: return
+        records, self._journal_offset = self._read_journal(self._journal_offset)
+        if not records: return
+        # Changed rows and their persisted values, replayed instead.
+        pending = [(i, self._buffer[i], self._parse_line(self._persisted[i]))
+                   for i in (range(len(self._persisted)) if indices is None else
+                             [i for i in indices if i < len(self._persisted)])
+                   if self._build_line(self._buffer[i]) != self._persisted[i]]
+        for i, _, base in pending: self._buffer[i] = dict(base)
+        logger.info('File %s tail of %s records merged by %s',
+                    self._journal, len(records), self.__class__)
+        self._replay(self._buffer, records, self._persisted)
+        for i, row, base in pending:
+            for label, value in self._buffer[i].items():
+                if row.get(label) == base.get(label): row[label] = value #type: ignore
+            self._buffer[i] = row
+        self._generation += 1
+
+    def _write_snapshot(self, lines:List[str], keep_from:Optional[int] = None) -> None:
+        '''
+           Replaces snapshot with 'lines' and truncates journal.
+
+           If 'keep_from' is set, journal keeps records after that offset.
+        '''
+
+        # Writes of other sessions since last load stay detectable.
+        current = self._version == self._current_version()
+        tail = b''
+        if keep_from is not None and os.path.exists(self._journal):
+            with open(self._journal, 'rb') as f:
+                f.seek(keep_from)
+                tail = f.read()
+        chunks = [chunk.encode() for chunk in _chunks(lines)]
+        checksum = zlib.crc32(b'')
+        for chunk in chunks: checksum = zlib.crc32(chunk, checksum)
+        # Snapshot and journal are replaced one after the other: until
+        # both are, the pending journal ties the journal to the snapshot.
+        with atomic_write(self._pending, 'wb') as f:
+            f.write(b'%d\n' % checksum + tail)
+        with atomic_write(self._file, 'wb') as f:
+            f.writelines(chunks)
+        with atomic_write(self._journal, 'wb') as f:
+            f.write(tail)
+        os.remove(self._pending)
+        self._snapshots += 1
+        self._timestamp = self._snapshot_stamp()
+        self._journal_offset = len(tail)
+        if current: self._version = self._current_version()
+
+    def _recover(self) -> None:
+        '''
+           Finishes or drops a snapshot write interrupted by a crash.
+
+           The pending journal replaces the journal if the snapshot
+           was already replaced, otherwise it is dropped.
+        '''
+
+        with open(self._pending, 'rb') as f:
+            header, _, tail = f.read().partition(b'\n')
+        with open(self._file, 'rb') as f:
+            checksum, _ = _checksum(f, os.fstat(f.fileno()).st_size)
+        if header == b'%d' % checksum:
+            logger.warning('Snapshot %s written without its journal, journal replaced',
+                           self._file)
+            with atomic_write(self._journal, 'wb') as f:
+                f.write(tail)
+        os.remove(self._pending)
+
+##############################################
+#                                            #
+#             COMPACTION                     #
+#                                            #
+##############################################
+
+    def compact(self, wait:bool = True) -> None:
+        '''
+           Folds journal into a fresh snapshot in a background thread.
+
+           Only one compaction runs at a time. If 'wait', blocks until done.
+        '''
+
+        with self._lock:
+            thread = self._compactor
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self._compact, daemon=True,
+                                          name=f'compact {self._journal}')
+                self._compactor = thread
+                thread.start()
+        if wait: thread.join()
+
+    def _compact(self) -> None:
+        '''
+           Rebuilds snapshot from disk up to current journal size.
+
+           Dumps appended meanwhile are kept in the journal.
+        '''
+
+        with self._lock:
+            if not os.path.exists(self._journal): return
+            mark = os.path.getsize(self._journal)
+            snapshots = self._snapshots
+        if not mark: return
+        with open(self._file, 'r') as f:
+            stat = os.fstat(f.fileno())
+            snapshot = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            rows = self._implementation_load(f)
+        with open(self._journal, 'rb') as f:
+            journal = os.fstat(f.fileno()).st_ino
+            data = f.read(mark)
+        # A last record without line ending is a torn write.
+        data = data[:data.rfind(b'\n')+1]
+        records, mark = data.decode().splitlines(keepends=True), len(data)
+        self._replay(rows, records)
+        lines = [self._build_line(row) for row in rows]
+        with self._lock, self.locked():
+            # Snapshot rewritten meanwhile, by this or another session:
+            # records up to 'mark' may be gone with records after them.
+            # Next dump over the threshold compacts again.
+            if snapshots != self._snapshots or \
+               not self._compactable(snapshot, journal, mark):
+                logger.info('Compaction of %s dropped, rewritten meanwhile',
+                            self._journal)
+                return
+            self._write_snapshot(lines, keep_from=mark)
+        logger.info('Compacted %s records of %s', len(records), self._journal)
+
+    def _compactable(self, snapshot:Tuple, journal:int, mark:int) -> bool:
+        '''
+           Checks snapshot is still the 'snapshot' version read and the
+           journal the same file, only appended to past 'mark'.
+        '''
+
+        if super(JournalFileHandler, self)._current_version() != snapshot:
+            return False
+        if not os.path.exists(self._journal): return False
+        stat = os.stat(self._journal)
+        return stat.st_ino == journal and stat.st_size >= mark
         
 
 
+def connect(database:str = _SQLITE_DB_) -> 'sqlite3.Connection':
+    '''
+       Opens a SQLite connection in WAL mode, usable from any thread.
+    '''
+
+    import sqlite3
+    connection = sqlite3.connect(database, check_same_thread=False)
+    # Readers do not block the writer nor the writer the readers.
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+class SQLiteFileHandler(FileHandler):
+    '''
+       Class that keeps the rows of a data file in a SQLite table.
+
+        - one table per data file, named after the file,
+        - one text column per label, column '0' if there are no labels,
+        - load reads the table only if another connection committed,
+        - dump writes only rows changed since last load or dump,
+        - import_scsv copies an existing SCSV data file into the table,
+          a new table starts with the rows of its data file.
+       Data file itself is never created nor written.
+    '''
+
+    def __init__(self, filename:str = _DUMMY_FILE_, labels:List[str] = [],
+                 default_content:str = '', database:str = _SQLITE_DB_,
+                 *args, **kwargs):
+        '''
+           Initialize:
+           - name of data file, which names the table,
+           - labels as columns,
+           - database path.
+        '''
+
+        # Skip initialization for existing file handlers.
+        if self._initialized: return
+
+        self._file = filename
+        self._labels = labels
+        self._default_content = default_content
+        self._buffer: List[DATA_TYPE] = list()
+        self._timestamp: Optional[int] = None
+        self._generation: int = 0
+        self._lock_wait = 0.
+        self._initialized = True
+
+        self._columns = list(labels) or ['0']
+        self.table = ''.join(c for c in os.path.basename(filename).lower()
+                             if c.isalnum() or c == '_') or 'data'
+        # Row ids and values as in table for each buffer row.
+        self._ids: List[int] = list()
+        self._persisted: List[Tuple[str, ...]] = list()
+        self._lock = threading.RLock()
+
+        self.connection = connect(database)
+        created = self.connection.execute(
+            'SELECT NOT EXISTS (SELECT 1 FROM sqlite_master '
+            'WHERE type = \'table\' AND name = ?)', (self.table,)).fetchone()[0]
+        columns = ', '.join(f'"{c}" TEXT' for c in self._columns)
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.table}" '
+                f'(id INTEGER PRIMARY KEY, {columns})')
+        self.index(self._columns[0])
+
+        # Prepared statements.
+        names = ', '.join(f'"{c}"' for c in self._columns)
+        self._select = f'SELECT id, {names} FROM "{self.table}" ORDER BY id'
+        self._insert = f'INSERT INTO "{self.table}" ({names}) ' + \
+            f'VALUES ({", ".join("?"*len(self._columns))})'
+        self._update = f'UPDATE "{self.table}" SET ' + \
+            ', '.join(f'"{c}" = ?' for c in self._columns) + ' WHERE id = ?'
+        self._delete = f'DELETE FROM "{self.table}" WHERE id = ?'
+
+        # Seed new table so admins and users of the data files can log in.
+        if created: self.import_scsv()
+
+    def index(self, *columns:str) -> None:
+        '''
+           Creates an index for each column if missing.
+        '''
+
+        with self.connection:
+            for column in columns:
+                self.connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{self.table}_{column}" '
+                    f'ON "{self.table}" ("{column}")')
+
+    def close(self):
+        '''
+           Closes database connection, removes handler and clears the buffer.
+        '''
+
+        super(SQLiteFileHandler, self).close()
+        self.connection.close()
+
+    def time_stamp_alt(self):
+        '''
+           Checks if another connection committed since last load.
+        '''
+
+        old_timestamp, self._timestamp = self._timestamp, \
+            self.connection.execute('PRAGMA data_version').fetchone()[0]
+        return old_timestamp is None or self._timestamp != old_timestamp
+
+    @contextmanager
+    def locked(self, exclusive:bool = True) -> Iterator[None]:
+        '''
+           SQLite locks the database itself, only threads are serialized.
+        '''
+
+        with self._lock:
+            yield
+
+    def stale(self) -> bool:
+        '''
+           Checks if another connection committed since last load.
+        '''
+
+        return self._timestamp is not None and self._timestamp != \
+            self.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def _values(self, row:DATA_TYPE) -> Tuple[str, ...]:
+        '''
+           Row values in column order.
+        '''
+
+        return tuple(row.get(c, '') for c in self._columns)
+
+    @instrumented()
+    def load(self) -> None:
+        '''
+           load table if changed since last load.
+        '''
+
+        with self._lock:
+            if not self.time_stamp_alt(): return
+            logger.info('Table %s read by %s', self.table, self.__class__)
+            rows = self.connection.execute(self._select).fetchall()
+            self._ids = [row[0] for row in rows]
+            self._persisted = [row[1:] for row in rows]
+            self._buffer.clear()
+            self._buffer.extend(dict(zip(self._columns, values))
+                                for values in self._persisted)
+            self._generation += 1
+
+    @instrumented()
+    def dump(self) -> None:
+        '''
+           Writes changed, removed and new rows in a single transaction.
+        '''
+
+        if not self._buffer: return
+        with self._lock, self.connection:
+            values = [self._values(row) for row in self._buffer]
+            kept = len(self._ids)
+            self.connection.executemany(self._update,
+                [(*new, id) for id, old, new in
+                 zip(self._ids, self._persisted, values) if new != old])
+            self.connection.executemany(self._delete,
+                [(id,) for id in self._ids[len(values):]])
+            del self._ids[len(values):]
+            for new in values[kept:]:
+                self._ids.append(
+                    self.connection.execute(self._insert, new).lastrowid)
+            self._persisted = values
+            self._generation += 1
+            logger.info('Table %s written by %s', self.table, self.__class__)
+
+    @instrumented()
+    def dump_rows(self, indices:Iterable[int]) -> None:
+        '''
+           Writes rows in 'indices' that changed and rows appended.
+
+           Removed rows need the full dump.
+        '''
+
+        if len(self._buffer) < len(self._ids): return self.dump()
+        with self._lock, self.connection:
+            updates = []
+            for i in sorted(set(indices)):
+                if i >= len(self._ids): break
+                new = self._values(self._buffer[i])
+                if new != self._persisted[i]:
+                    updates.append((*new, self._ids[i]))
+                    self._persisted[i] = new
+            self.connection.executemany(self._update, updates)
+            for row in self._buffer[len(self._ids):]:
+                new = self._values(row)
+                self._ids.append(
+                    self.connection.execute(self._insert, new).lastrowid)
+                self._persisted.append(new)
+            self._generation += 1
+            logger.info('Table %s rows written by %s', self.table, self.__class__)
+
+    def import_scsv(self, path:Optional[str] = None, replace:bool = False) -> int:
+        '''
+           Copies rows of a SCSV file into an empty table.
+
+           Defaults to the handler's data file. Without labels every value
+           is a row. If 'replace', existing rows are deleted first.
+           Returns the number of rows imported.
+        '''
+
+        path = path or self._file
+        if not os.path.exists(path): return 0
+        with open(path, 'r') as f:
+            lines = [line.rstrip('\n').split(';') for line in f]
+        if len(self._labels):
+            size = len(self._labels)
+            values = [tuple((line + ['']*size)[:size]) for line in lines]
+        else:
+            values = [(value,) for line in lines for value in line if value]
+
+        with self._lock, self.connection:
+            if replace:
+                self.connection.execute(f'DELETE FROM "{self.table}"')
+            elif self.connection.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM "{self.table}")').fetchone()[0]:
+                logger.warning('Table %s not empty: %s not imported', self.table, path)
+                return 0
+            self.connection.executemany(self._insert, values)
+        # Force reading imported rows.
+        self._timestamp = None
+        logger.info('Imported %s rows from %s into %s', len(values), path, self.table)
+        return len(values)
+
+    def _implementation_dump(self, textfile:TextIO) -> None:
+        raise NotImplementedError
+
+    def _implementation_load(self, textfile:TextIO) -> List[DATA_TYPE]:
+        raise NotImplementedError
+
+
 class ReportFileHandler(FileHandler):
     '''
        Class that deals with a report file.
@@ -266,16 +1271,12 @@ class ReportFileHandler(FileHandler):
            for each list of data dictionaries, between to spacing lines.
         '''
 
-        # If has pre header write in file.
-        if len(self._pre_header): file.write(self._pre_header + '\n')
-        # Write header and line spacing.
-        file.write(self.header+self.space_line)
-                        
-        # For each line of data write in report format.
-        for line in self.buffer:
-            file.write('\n'+'\t'.join(self._build_line(line)))
-        # Write a line spacing.
-        file.write(self.space_line)
+        # Pre header (if set), header and line spacing.
+        head = self._pre_header + '\n' if len(self._pre_header) else ''
+        head += self.header+self.space_line
+        # A line in report format for each line of data and a line spacing.
+        lines = ('\t'.join(self._build_line(line)) for line in self.buffer)
+        file.writelines([head, *_chunks(lines, start='\n'), self.space_line])
     
     def _implementation_load(self, file:TextIO) -> List[DATA_TYPE]:
         """
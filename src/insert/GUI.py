@@ -100,14 +100,14 @@ class View(tk.Tk):
         # Pack the widgets
         self.button.grid(row=i+1, column=0, columnspan=2, rowspan=1, pady=2)        
         cancel_button.grid(row=i+2, column=0, columnspan=2, rowspan=1)
-        logger.info(f'{self.__class__} UI created')
+        logger.info('%s UI created', self.__class__)
 
     def bind_provider(self, call: protocols.ControllerInsert) -> None:
         '''
            Binds the function to the method
         '''
         
-        logger.info(f'{self.__class__} binded to login method {call.__name__}')
+        logger.info('%s binded to login method %s', self.__class__, call.__name__)
         self.controller_service = call
 
 
@@ -1,6 +1,7 @@
 import logging
 from typing import Optional, Type
 from src import protocols
+from src.instrument import instrumented
 from src.task_master import single_task
 
 __version__ = 0.1
@@ -60,7 +61,7 @@ class Controller():
             Binds the to the UI class.
         '''
 
-        logger.info(f'{self.__class__} binded to class {view.__name__}')
+        logger.info('%s binded to class %s', self.__class__, view.__name__)
         self.view = view
 
     def bind_provider(self, provider: protocols.model_protocol) -> None:
@@ -68,10 +69,11 @@ class Controller():
             Binds to the provider.
         '''
 
-        logger.info(f'{self.__class__} binded to class {provider.__class__}')
+        logger.info('%s binded to class %s', self.__class__, provider.__class__)
         self.provider = provider
     
     # Controller in the middle
+    @instrumented()
     def controller_service(self, user_input: list) -> bool:
         '''
            Controller connects the view and the model
@@ -121,12 +123,13 @@ class Controller():
     #                                        #
     ##########################################
 
+    @instrumented()
     def run(self):
         '''
             Runs the options menu.
         '''
         
-        logger.info(f'{self.__class__} running.')
+        logger.info('%s running.', self.__class__)
 
         # Raise error if UI not binded.
         if self.view is None:
@@ -165,7 +168,7 @@ class Controller():
         # Reset id at the end for next state.
         self.id = -1
         self.next = ESCAPE_STATE
-        logger.info(f'{self.__class__} closing.')
+        logger.info('%s closing.', self.__class__)
 
 if  __name__ == "__main__":
     print(f'{__file__}: This module cannot be run directly.')
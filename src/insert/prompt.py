@@ -47,11 +47,11 @@ class View():
            Binds the service provider.
         '''
         
-        logger.info(f'{self.__class__} binded to login method {call.__name__}')
+        logger.info('%s binded to login method %s', self.__class__, call.__name__)
         self.controller_service = call
 
     def noActions(self, *args, **kwargs) -> bool:
-        logger.info(f'{self.__class__} tried to run but no method binded')
+        logger.info('%s tried to run but no method binded', self.__class__)
         print("No method binded")
         return False
 
@@ -63,10 +63,10 @@ class View():
             new_value.append(input('\nEnter '+entry+'\n>'))
         try:
             if self.controller_service(new_value):
-                logger.info(f'{self.prompt} successful for user {new_value}')
+                logger.info('%s successful for user %s', self.prompt, new_value)
                 input(self.success_msg)
             else:
-                logger.info(f'{self.prompt} failed for user {new_value}')
+                logger.info('%s failed for user %s', self.prompt, new_value)
                 input(self.failure_msg)
         except protocols.ControllerError as e:
             input(e.args[0])
@@ -0,0 +1,224 @@
+import atexit
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from src import config
+
+__version__ = 0.1
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CLASS
+##
+# Histogram: Latency histogram with logarithmic buckets.
+##
+# 2. FUNCTION
+##
+# enable: Starts recording, optionally reporting at exit.
+# disable: Stops recording.
+# timed: Context manager recording latency of a block.
+# instrumented: Decorator recording latency of calls.
+# histograms: Copy of recorded histograms by name.
+# summary: Lines with count and p50/p95/p99 per name.
+# report: Writes summary to a file.
+# reset: Clears recorded histograms.
+# import_times: Runs a statement reporting the modules it imports.
+# import_summary: Lines with the slowest imports.
+########################################################
+
+# Bucket i holds latencies up to _BASE_*_GROWTH_**i seconds.
+_BASE_ = 1e-6
+_STEPS_PER_DOUBLING_ = 4
+_GROWTH_ = 2 ** (1/_STEPS_PER_DOUBLING_)
+# Buckets up to about 18 minutes, slower calls share the last one.
+_BUCKETS_ = 30 * _STEPS_PER_DOUBLING_
+
+class Histogram():
+    '''
+       Latency histogram with logarithmic buckets.
+
+       Keeps fixed memory per name: bucket counts, total and maximum.
+       Percentiles are the upper bound of the bucket they fall in.
+    '''
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (_BUCKETS_ + 1)
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, seconds: float) -> None:
+        bucket = 0 if seconds <= _BASE_ else min(_BUCKETS_, math.ceil(
+            math.log2(seconds/_BASE_) * _STEPS_PER_DOUBLING_))
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        '''
+           Returns latency below which 'fraction' of calls fall.
+        '''
+
+        if not self.count: return 0.
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket, number in enumerate(self.counts):
+            seen += number
+            if seen >= rank:
+                return min(_BASE_ * _GROWTH_ ** bucket, self.max)
+        return self.max
+
+# Recording state shared by every module.
+_enabled = False
+_histograms: Dict[str, Histogram] = dict()
+_lock = threading.Lock()
+_at_exit = False
+
+def enable(report_at_exit: bool = False) -> None:
+    '''
+       Starts recording, and writes a summary to stderr at exit if asked.
+    '''
+
+    global _enabled, _at_exit
+    _enabled = True
+    if report_at_exit and not _at_exit:
+        atexit.register(report)
+        _at_exit = True
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+def is_enabled() -> bool:
+    return _enabled
+
+def _record(name: str, seconds: float) -> None:
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None: histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+@contextmanager
+def _timer(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+@contextmanager
+def _nothing() -> Iterator[None]:
+    yield
+
+def timed(name: str):
+    '''
+       Context manager recording latency of its block under 'name'.
+    '''
+
+    return _timer(name) if _enabled else _nothing()
+
+def instrumented(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    '''
+       Decorator recording latency of each call.
+
+       Defaults 'name' to the function's module and qualified name.
+       When disabled a call costs one flag check.
+    '''
+
+    def decorator(func: Callable) -> Callable:
+        label = name or f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled: return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def histograms() -> Dict[str, Histogram]:
+    with _lock:
+        return dict(_histograms)
+
+def summary() -> List[str]:
+    '''
+       Returns a line per name with call count, total and p50/p95/p99.
+
+       Names are sorted by total time spent.
+    '''
+
+    lines = [f'{"name":<50} {"count":>7} {"total(s)":>10} ' + \
+             f'{"p50(ms)":>9} {"p95(ms)":>9} {"p99(ms)":>9}']
+    for name, histogram in sorted(histograms().items(),
+                                  key=lambda item: -item[1].total):
+        p50, p95, p99 = (1000 * histogram.percentile(f)
+                         for f in (.5, .95, .99))
+        lines.append(f'{name:<50} {histogram.count:>7} ' + \
+                     f'{histogram.total:>10.3f} {p50:>9.3f} ' + \
+                     f'{p95:>9.3f} {p99:>9.3f}')
+    return lines
+
+def report(file: Optional[TextIO] = None) -> None:
+    '''
+       Writes summary to 'file', stderr by default.
+    '''
+
+    if not _histograms: return
+    print('\n'.join(summary()), file=file or sys.stderr)
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+
+# Module, microseconds importing it alone and including its imports.
+ImportTime = Tuple[str, int, int]
+
+def import_times(statement: str) -> Tuple[float, List[ImportTime]]:
+    '''
+       Runs 'statement' in a new interpreter with '-X importtime'.
+
+       Returns seconds the statement took and the modules imported,
+       in the order they finished importing. Imports racing with
+       another thread may be left out.
+    '''
+
+    # Only used when profiling, kept off the startup path.
+    import subprocess
+
+    code = 'import time\n_start = time.perf_counter()\n' + statement + \
+        '\nprint(time.perf_counter() - _start)'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True)
+    imports: List[ImportTime] = list()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line: continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(own), int(cumulative)))
+    return float(result.stdout.split()[-1]), imports
+
+def import_summary(imports: List[ImportTime], limit: int = 20) -> List[str]:
+    '''
+       Returns a line per module for the 'limit' slowest imports.
+
+       Modules are sorted by time spent importing them alone.
+    '''
+
+    lines = [f'{"module":<50} {"self(ms)":>9} {"cumulative(ms)":>15}']
+    for name, own, cumulative in sorted(imports, key=lambda item: -item[1])[:limit]:
+        lines.append(f'{name:<50} {own/1000:>9.3f} {cumulative/1000:>15.3f}')
+    return lines
+
+
+if config.INSTRUMENTATION: enable(report_at_exit=True)
@@ -0,0 +1,126 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional, Union
+from src import config
+
+__version__ = 0.1
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CLASS
+##
+# JSONFormatter: Formats records as one JSON object per line.
+# LazyQueueHandler: Queues records without formatting them.
+##
+# 2. FUNCTION
+##
+# setup: Logs through a queue to a sink written by a thread.
+# stop: Flushes queued records and detaches the sink.
+########################################################
+
+# Sink that writes records to the standard error.
+_STDERR_SINK_ = 'stderr'
+_TEXT_FORMAT_ = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Listener writing queued records and the handler feeding it.
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+class JSONFormatter(logging.Formatter):
+    '''
+       Formats records as one JSON object per line.
+    '''
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {'time': self.formatTime(record, self.datefmt),
+                 'name': record.name,
+                 'level': record.levelname,
+                 'message': record.getMessage()}
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    '''
+       Queues records without formatting them.
+
+       The base handler merges the arguments into the message in the
+       calling thread. Here the listener thread does it, so logging
+       costs the caller only building the record and a queue put.
+       Arguments are kept by reference: log values, not objects the
+       caller changes right after.
+    '''
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup(sink: Union[str, logging.Handler, None] = None,
+          level: Optional[int] = None,
+          max_bytes: Optional[int] = None,
+          backup_count: Optional[int] = None,
+          fmt: Optional[str] = None) -> logging.handlers.QueueListener:
+    '''
+       Logs records of the root logger through a queue to a sink
+       written by a listener thread, replacing any previous setup.
+
+       'sink' is a file path, rotated at 'max_bytes' keeping
+       'backup_count' files, 'stderr' or a handler. 'fmt' is
+       'text' or 'json'. Arguments default to the config values.
+    '''
+
+    global _listener, _handler
+    stop()
+    sink = config.LOG_SINK if sink is None else sink
+    level = config.LOG_LEVEL if level is None else level
+    fmt = config.LOG_FORMAT if fmt is None else fmt
+
+    if isinstance(sink, logging.Handler):
+        handler = sink
+    elif sink == _STDERR_SINK_:
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            filename=sink,
+            maxBytes=config.LOG_MAX_BYTES if max_bytes is None else max_bytes,
+            backupCount=config.LOG_BACKUP_COUNT if backup_count is None else backup_count)
+    if fmt == 'json':
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(_TEXT_FORMAT_))
+
+    records: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, handler,
+                                               respect_handler_level=True)
+    _handler = LazyQueueHandler(records) #type: ignore
+    root = logging.getLogger('')
+    # Records below level are dropped before being built.
+    root.setLevel(level)
+    root.addHandler(_handler)
+    _listener.start()
+    # Registered once however many times set up.
+    atexit.unregister(stop)
+    atexit.register(stop)
+    return _listener
+
+def stop() -> None:
+    '''
+       Writes queued records, stops the listener thread and
+       detaches and closes the sink. Does nothing if not set up.
+    '''
+
+    global _listener, _handler
+    if _listener is None: return
+    logging.getLogger('').removeHandler(_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = _handler = None
@@ -2,13 +2,9 @@ import os
 import sys
 from typing import Protocol, List
 from importlib import import_module
-from dotenv import load_dotenv
 
 from src import config
 
-# Load environmental variables from .ENV file.
-load_dotenv(config._ENV_PATH_)
-
 # Append current 'src' directory to path.
 sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 
@@ -60,6 +56,21 @@ def get_class(path: str):
 
 
 
+# Whether the .ENV file was loaded.
+_env_loaded = False
+
+def load_env() -> None:
+    '''
+       Loads environmental variables from .ENV file on first call.
+    '''
+
+    global _env_loaded
+    if _env_loaded: return
+    _env_loaded = True
+    from dotenv import load_dotenv
+    load_dotenv(config._ENV_PATH_)
+
+
 class pluginType(Protocol):
     '''
        Modules to be loaded require a register method
@@ -72,6 +83,7 @@ def load_plugins(plugin_names: List[str]) -> None:
     '''
        Loads plugin modules into memory and register it.
     '''
+    load_env()
     for plugin in plugin_names:
         module = import_module(plugin)
         module.register()
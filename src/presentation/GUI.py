@@ -38,14 +38,14 @@ class View(tk.Tk):
         self.listbox.grid(row=1)      
         self.cancel_button.grid(row=2, rowspan=2)
 
-        logger.info(f'{self.__class__} UI created')
+        logger.info('%s UI created', self.__class__)
 
     def bind_provider(self, call: protocols.ControllerPresent) -> None:
         '''
            Binds the present function and runs it.
         '''
 
-        logger.info(f'{self.__class__} binded to method {call.__name__}')
+        logger.info('%s binded to method %s', self.__class__, call.__name__)
         self.controller_present = call
         # Present content
         for line in self.controller_present().split('\n'):
@@ -1,6 +1,7 @@
 import logging
 from typing import List, Optional, Type
 from src import protocols
+from src.instrument import instrumented
 
 __version__ = 0.1
 
@@ -54,10 +55,11 @@ class Controller():
             Binds the to the UI class.
         '''
 
-        logger.info(f'{self.__class__} binded to class {view.__name__}')
+        logger.info('%s binded to class %s', self.__class__, view.__name__)
         self.view = view
     
     # Controller in the middle
+    @instrumented()
     def controller_service(self, *args, **kwargs) -> str:
         '''
            Controller connects the view and the model
@@ -80,12 +82,13 @@ class Controller():
     #                                        #
     ##########################################
 
+    @instrumented()
     def run(self):
         '''
             Runs the options menu.
         '''
         
-        logger.info(f'{self.__class__} running.')
+        logger.info('%s running.', self.__class__)
 
         # Raise error if UI not binded.
         if self.view is None:
@@ -102,7 +105,7 @@ class Controller():
 
         # Reset id at the end for next state.
         self.id = -1
-        logger.info(f'{self.__class__} closing.')
+        logger.info('%s closing.', self.__class__)
 
 if  __name__ == "__main__":
     print(f'{__file__}: This module cannot be run directly.')
\ No newline at end of file
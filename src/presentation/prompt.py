@@ -37,12 +37,11 @@ class View():
            Binds the service provider.
         '''
 
-        logger.info(f'{self.__class__} binded to\
-                     selection method {call.__name__}')
+        logger.info('%s binded to selection method %s', self.__class__, call.__name__)
         self.controller_service = call
      
     def noActions(self, *args, **kwargs) -> str:
-        logger.info(f'{self.__class__} tried to run but no method binded')
+        logger.info('%s tried to run but no method binded', self.__class__)
         print("No method binded")
         return ''
     
@@ -51,7 +50,7 @@ class View():
            Prints options and returns user input.
         '''
 
-        logger.info(f'{self.__class__} running.')
+        logger.info('%s running.', self.__class__)
         # Refreshes screen.
         self.refresh_screen()
         
@@ -59,7 +58,7 @@ class View():
         print()
         input(self.controller_service() + '\n\n' + self.prompt)
 
-        logger.info(f'{self.__class__} closing.')
+        logger.info('%s closing.', self.__class__)
         
 if __name__  == '__main__':
     menu = View()
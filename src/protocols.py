@@ -58,6 +58,46 @@ class model_protocol(Protocol):
     def write_report(self, userlist: List[str]) -> None:
         ...
 
+class async_user_protocol(Protocol):
+    async def user_exists(self, user:str) -> bool:
+        ...
+    async def add_user(self, user:str, pwd:str) -> bool:
+        ...
+    async def log_in(self, user:str, pwd:str) -> bool:
+        ...
+    @property
+    def user_logged(self) -> Optional[str]:
+        ...
+    async def is_admin(self) -> bool:
+        ...
+    async def users(self) -> List[str]:
+        ...
+    async def count(self) -> int:
+        ...
+
+class async_model_protocol(Protocol):
+    async def get_all_tasks(self,
+                            user: Optional[str] = None) -> Tuple[List[str], List[int]]:
+        ...
+    async def get_task(self, index: int) -> Any:
+        ...
+    async def add_task(self, data: List[str]) -> bool:
+        ...
+    async def mark_as_completed(self, task_id:int) -> None:
+        ...
+    async def is_task_completed(self, task_id:int) -> bool:
+        ...
+    async def edit_user(self, task_id:int, owner:str) -> bool:
+        ...
+    async def edit_date(self, task_id:int, date:str) -> bool:
+        ...
+    async def save_tasks(self):
+        ...
+    async def read_report(self, userlist: List[str]) -> str:
+        ...
+    async def write_report(self, userlist: List[str]) -> None:
+        ...
+
 State = Callable[[user_protocol, model_protocol, int, str], Any]
 
 Actions = List[Mapping[str, Any]]
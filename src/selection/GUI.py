@@ -110,19 +110,18 @@ class View(tk.Tk):
         self.listbox.pack(fill = 'both')
         self.button.pack(side='left', fill='y')
         cancel_button.pack(side='right')
-        logger.info(f'{self.__class__} UI created')
+        logger.info('%s UI created', self.__class__)
 
     def bind_provider(self, call: protocols.ControllerSelect) -> None:
         '''
            Binds the function to the method
         '''
 
-        logger.info(f'{self.__class__} binded to\
-                     selection method {call.__name__}')
+        logger.info('%s binded to selection method %s', self.__class__, call.__name__)
         self.controller_service = call
 
     def noActions(self, *args, **kwargs) -> None:
-        logger.info(f'{self.__class__} tried to run but no method binded')
+        logger.info('%s tried to run but no method binded', self.__class__)
         messagebox.showerror(message="No method binded")
 
 
@@ -1,6 +1,7 @@
 import logging
 from typing import List, Optional, Type
 from src import protocols
+from src.instrument import instrumented
 
 __version__ = 0.1
 
@@ -59,7 +60,7 @@ class Controller():
                     f'{i+1:0{number_of_digits}} - '.ljust(number_of_digits+3) \
                         + self.options[i]
         else:   
-            self.options = options.copy()
+            self.options = list(options)
         
         super().__init__()
     
@@ -74,7 +75,7 @@ class Controller():
             Binds the to the UI class.
         '''
 
-        logger.info(f'{self.__class__} binded to class {view.__name__}')
+        logger.info('%s binded to class %s', self.__class__, view.__name__)
         self.view = view
 
     ##########################################
@@ -83,6 +84,7 @@ class Controller():
     #                                        #
     ##########################################
         
+    @instrumented()
     def select(self, index: int):
         '''
             Sets the action at index for next stage.
@@ -109,12 +111,13 @@ class Controller():
     #                                        #
     ##########################################
 
+    @instrumented()
     def run(self):
         '''
             Runs the options menu.
         '''
         
-        logger.info(f'{self.__class__} running.')
+        logger.info('%s running.', self.__class__)
 
         # Raise error if UI not binded.
         if self.view is None:
@@ -131,7 +134,7 @@ class Controller():
         view.bind_provider(self.select)
         # Run view.
         view.mainloop()
-        logger.info(f'{self.__class__} closing.')
+        logger.info('%s closing.', self.__class__)
 
 if  __name__ == "__main__":
     print(f'{__file__}: This module cannot be run directly.')
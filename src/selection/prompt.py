@@ -27,7 +27,7 @@ class View():
         self.controller_service = self.noActions
 
         logger.info(
-            f'{self.__class__} presented user with {len(self.options)} options'
+            '%s presented user with %s options', self.__class__, len(self.options)
             )
 
     def refresh_screen(self):
@@ -44,12 +44,11 @@ class View():
            Binds the function to the method
         '''
 
-        logger.info(f'{self.__class__} binded to\
-                     selection method {call.__name__}')
+        logger.info('%s binded to selection method %s', self.__class__, call.__name__)
         self.controller_service = call
      
     def noActions(self, *args, **kwargs) -> None:
-        logger.info(f'{self.__class__} tried to run but no method binded')
+        logger.info('%s tried to run but no method binded', self.__class__)
         print("No method binded")
     
     def mainloop(self):
@@ -57,7 +56,7 @@ class View():
            Prints options and returns user input.
         '''
 
-        logger.info(f'{self.__class__} running.')
+        logger.info('%s running.', self.__class__)
         # Refreshes screen.
         self.refresh_screen()
         
@@ -84,7 +83,7 @@ class View():
             index = -1
         # Calls controller to select option.
         self.controller_service(index)
-        logger.info(f'{self.__class__} closing.')
+        logger.info('%s closing.', self.__class__)
         
 if __name__  == '__main__':
     options = [f'Option {i}' for i in range(1,11)]
@@ -0,0 +1,499 @@
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from src import config, plugin, protocols, user_manager
+from src.task_master.single_task import DATETIME_STRING_FORMAT, taskError
+
+__version__ = 0.1
+
+# Set up logger.
+logger = logging.getLogger(__name__)
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CLASS
+##
+# APIError: Error answered with its HTTP status.
+# Sessions: Login session tokens with expiry.
+# ReadCache: Bounded cache of read responses by write generation.
+# Service: JSON operations over one shared model and user manager.
+# RequestHandler: Routes HTTP requests to the service.
+# Server: HTTP server handing connections to a worker pool.
+##
+# 2. FUNCTION
+##
+# serve: Loads model and users and serves until interrupted.
+########################################################
+
+# Response body.
+PAYLOAD = Dict[str, Any]
+# Task fields given when adding a task, in model order. Tasks are
+# assigned today and not completed.
+TASK_FIELDS = ['owner', 'title', 'description', 'due_date']
+# Characters splitting fields or rows of the task file.
+_FIELD_BREAKS_ = re.compile(r'[;\r\n]')
+
+def _task_field(body: PAYLOAD, field: str) -> str:
+    '''
+       Returns task 'field' of request body, raising if it would
+       break the row it is written to.
+    '''
+
+    value = str(body.get(field, '')).strip()
+    if _FIELD_BREAKS_.search(value):
+        raise APIError(HTTPStatus.BAD_REQUEST,
+                       f'Field {field} cannot hold ";" or line breaks')
+    return value
+
+class APIError(ValueError):
+    '''
+       Error answered with its HTTP status and message.
+    '''
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super(APIError, self).__init__(message)
+        self.status = status
+
+class Sessions():
+    '''
+       Login session tokens with the user and admin flag they grant.
+
+       Tokens expire 'ttl' seconds after login and are dropped at the
+       next login or lookup after that.
+    '''
+
+    def __init__(self, ttl: float = config.SERVER_SESSION_TTL) -> None:
+        self._ttl = ttl
+        # Sessions in the order they expire.
+        self._sessions: 'OrderedDict[str, Tuple[str, bool, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, user: str, admin: bool) -> str:
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            self._sessions[token] = (user, admin, now + self._ttl)
+        return token
+
+    def _purge(self, now: float) -> None:
+        '''
+           Drops expired sessions, oldest first: all share the same ttl,
+           so they expire in the order they were created.
+        '''
+
+        while self._sessions:
+            token, session = next(iter(self._sessions.items()))
+            if session[2] >= now: break
+            del self._sessions[token]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def get(self, token: str) -> Tuple[str, bool]:
+        '''
+           Returns user and admin flag of a valid token.
+        '''
+
+        with self._lock:
+            self._purge(time.monotonic())
+            session = self._sessions.get(token)
+        if session is None:
+            raise APIError(HTTPStatus.UNAUTHORIZED, 'Invalid or expired session')
+        return session[0], session[1]
+
+    def drop(self, token: str) -> None:
+        with self._lock:
+            self._sessions.pop(token, None)
+
+class ReadCache():
+    '''
+       Bounded cache of read responses.
+
+       Entries keep the write generation they were built at and are
+       only returned for that generation, least recently used first out.
+    '''
+
+    def __init__(self, size: int = config.SERVER_CACHE_SIZE) -> None:
+        self._size = size
+        self._entries: 'OrderedDict[Hashable, Tuple[int, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation: return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, generation: int, value: Any) -> None:
+        if self._size <= 0: return
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+##############################################
+#                                            #
+#             SERVICE                        #
+#                                            #
+##############################################
+
+class Service():
+    '''
+       JSON operations over one model and user manager shared by
+       every client.
+
+       Model calls run one at a time. Reads are cached until the next
+       write, and every write is saved to file before answering.
+       Logins run apart from model calls, as hashing is slow.
+    '''
+
+    def __init__(self, user: user_manager.UserManager,
+                 model: protocols.model_protocol,
+                 sessions: Optional[Sessions] = None,
+                 cache: Optional[ReadCache] = None) -> None:
+        self.user = user
+        self.model = model
+        self.sessions = sessions or Sessions()
+        self.cache = cache or ReadCache()
+        self._lock = threading.RLock()
+        self._user_lock = threading.Lock()
+        # Count of writes, reads cached at an older one are stale.
+        self._generation = 0
+
+    def _read(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        '''
+           Returns cached result of 'build' or builds it.
+        '''
+
+        value = self.cache.get(key, self._generation)
+        if value is None:
+            with self._lock:
+                generation = self._generation
+                value = build()
+            self.cache.put(key, generation, value)
+        return value
+
+    def _write(self, call: Callable[[], Any]) -> Any:
+        '''
+           Runs model change and saves it.
+        '''
+
+        with self._lock:
+            try:
+                return call()
+            finally:
+                self._generation += 1
+                self.model.save_tasks()
+
+    def _owned(self, user: str) -> frozenset:
+        return self._read(('owned', user),
+                          lambda: frozenset(self.model.get_all_tasks(user)[1]))
+
+    def _check_owner(self, session: Tuple[str, bool], task_id: int) -> None:
+        '''
+           Raises unless task exists and session may change it.
+        '''
+
+        self.get_task(session, task_id)
+        user, admin = session
+        if not admin and task_id not in self._owned(user):
+            raise APIError(HTTPStatus.FORBIDDEN, 'Task owned by another user')
+
+# SESSIONS
+
+    def login(self, body: PAYLOAD) -> PAYLOAD:
+        '''
+           Opens a session if password matches.
+
+           Only reading the user files holds the user lock: password
+           checks of many logins run at once and no user is logged in
+           the shared manager.
+        '''
+
+        user, password = str(body.get('user', '')), str(body.get('password', ''))
+        with self._user_lock:
+            stored = self.user.stored_hash(user)
+            admin = user in self.user.admins
+        if not self.user.check_password(user, stored, password):
+            raise APIError(HTTPStatus.UNAUTHORIZED, 'Login failed')
+        logger.info('Session opened for %s', user)
+        return {'token': self.sessions.create(user, admin),
+                'user': user, 'admin': admin}
+
+    def logout(self, token: str) -> PAYLOAD:
+        self.sessions.drop(token)
+        return {}
+
+# TASKS
+
+    def list_tasks(self, session: Tuple[str, bool],
+                   owner: Optional[str] = None) -> PAYLOAD:
+        '''
+           Tasks of 'owner', the session's user by default or all if '*'.
+        '''
+
+        owner = owner or session[0]
+        def build() -> PAYLOAD:
+            out, index = self.model.get_all_tasks(None if owner == '*' else owner)
+            return {'tasks': [{'id': i, 'summary': text}
+                              for i, text in zip(index, out)]}
+        return self._read(('tasks', owner), build)
+
+    def get_task(self, session: Tuple[str, bool], task_id: int) -> PAYLOAD:
+        def build() -> PAYLOAD:
+            try:
+                text = str(self.model.get_task(task_id))
+            except IndexError:
+                raise APIError(HTTPStatus.NOT_FOUND, f'No task {task_id}')
+            return {'id': task_id, 'text': text,
+                    'completed': self.model.is_task_completed(task_id)}
+        return self._read(('task', task_id), build)
+
+    def add_task(self, session: Tuple[str, bool], body: PAYLOAD) -> PAYLOAD:
+        data = [_task_field(body, field) for field in TASK_FIELDS]
+        if not data[0] or not data[1]:
+            raise APIError(HTTPStatus.BAD_REQUEST, 'Owner and title are required')
+        if not session[1] and data[0] != session[0]:
+            raise APIError(HTTPStatus.FORBIDDEN, 'Only admins add tasks for others')
+        data += [datetime.today().strftime(DATETIME_STRING_FORMAT), 'No']
+        if not self._write(lambda: self.model.add_task(data)):
+            raise APIError(HTTPStatus.BAD_REQUEST, 'Invalid task')
+        return {'added': True}
+
+    def edit_task(self, session: Tuple[str, bool], task_id: int,
+                  body: PAYLOAD) -> PAYLOAD:
+        '''
+           Changes owner and/or due date of a task.
+        '''
+
+        edits = [(self.model.edit_user, _task_field(body, 'owner'))
+                 if 'owner' in body else None,
+                 (self.model.edit_date, _task_field(body, 'due_date'))
+                 if 'due_date' in body else None]
+        edits = [edit for edit in edits if edit is not None]
+        if not edits:
+            raise APIError(HTTPStatus.BAD_REQUEST, 'Nothing to edit')
+
+        def call() -> None:
+            for edit, value in edits:
+                if not edit(task_id, value):
+                    raise APIError(HTTPStatus.BAD_REQUEST, 'Edit failed')
+        # Owner cannot change between the check and the edit.
+        with self._lock:
+            self._check_owner(session, task_id)
+            self._write(call)
+        return self.get_task(session, task_id)
+
+    def complete_task(self, session: Tuple[str, bool], task_id: int) -> PAYLOAD:
+        with self._lock:
+            self._check_owner(session, task_id)
+            self._write(lambda: self.model.mark_as_completed(task_id))
+        return self.get_task(session, task_id)
+
+# STATISTICS
+
+    def stats(self, session: Tuple[str, bool]) -> PAYLOAD:
+        if not session[1]:
+            raise APIError(HTTPStatus.FORBIDDEN, 'Statistics are for admins')
+        get_task_stats = getattr(self.model, 'get_task_stats', None)
+        if get_task_stats is None:
+            raise APIError(HTTPStatus.NOT_IMPLEMENTED, 'Model has no statistics')
+        with self._user_lock:
+            users = list(self.user.users)
+
+        def build() -> PAYLOAD:
+            stats = get_task_stats(users)
+            return {'users': stats.users_stats, 'tasks': stats.tasks_stats}
+        # Users added meanwhile change the key.
+        return self._read(('stats', len(users)), build)
+
+##############################################
+#                                            #
+#             HTTP                           #
+#                                            #
+##############################################
+
+# Routes as (method, path pattern, handler name, needs session).
+ROUTES: List[Tuple[str, 're.Pattern[str]', str, bool]] = [
+    ('POST', re.compile(r'/login'), 'login', False),
+    ('POST', re.compile(r'/logout'), 'logout', True),
+    ('GET', re.compile(r'/tasks'), 'list_tasks', True),
+    ('POST', re.compile(r'/tasks'), 'add_task', True),
+    ('GET', re.compile(r'/tasks/(\d+)'), 'get_task', True),
+    ('PATCH', re.compile(r'/tasks/(\d+)'), 'edit_task', True),
+    ('POST', re.compile(r'/tasks/(\d+)/complete'), 'complete_task', True),
+    ('GET', re.compile(r'/stats'), 'stats', True),
+]
+
+class RequestHandler(BaseHTTPRequestHandler):
+    '''
+       Routes JSON requests to the server's Service.
+
+       Speaks HTTP/1.1, so connections are kept alive between requests
+       until idle for config.SERVER_KEEP_ALIVE seconds.
+    '''
+
+    protocol_version = 'HTTP/1.1'
+    timeout = config.SERVER_KEEP_ALIVE
+    server: 'Server'
+
+    def do_GET(self) -> None:
+        self._dispatch('GET')
+
+    def do_POST(self) -> None:
+        self._dispatch('POST')
+
+    def do_PATCH(self) -> None:
+        self._dispatch('PATCH')
+
+    def _body(self) -> PAYLOAD:
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if not length: return {}
+        if not 0 < length <= config.SERVER_MAX_BODY:
+            # Body left unread, the connection cannot be reused.
+            self.close_connection = True
+            raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE if length > 0
+                           else HTTPStatus.BAD_REQUEST, 'Invalid body length')
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, 'Body is not JSON')
+        if not isinstance(body, dict):
+            raise APIError(HTTPStatus.BAD_REQUEST, 'Body is not a JSON object')
+        return body
+
+    def _token(self) -> str:
+        scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            raise APIError(HTTPStatus.UNAUTHORIZED, 'Missing bearer token')
+        return token
+
+    def _dispatch(self, method: str) -> None:
+        service = self.server.service
+        url = urlsplit(self.path)
+        try:
+            # Body is read first so the connection can be reused on errors.
+            body = self._body()
+            matches = [route for route in ROUTES if route[1].fullmatch(url.path)]
+            route = next((r for r in matches if r[0] == method), None)
+            if route is None:
+                raise APIError(HTTPStatus.METHOD_NOT_ALLOWED if matches
+                               else HTTPStatus.NOT_FOUND, 'No such endpoint')
+            name, needs_session = route[2], route[3]
+            args: List[Any] = []
+            if needs_session:
+                token = self._token()
+                args.append(token if name == 'logout' else service.sessions.get(token))
+            args.extend(int(group) for group in route[1].fullmatch(url.path).groups())
+            if name == 'list_tasks':
+                args.extend(parse_qs(url.query).get('owner', [])[:1])
+            elif method != 'GET' and name not in ('logout', 'complete_task'):
+                args.append(body)
+            self._send(HTTPStatus.OK, getattr(service, name)(*args))
+        except APIError as e:
+            self._send(e.status, {'error': e.args[0]})
+        except (taskError, ValueError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        except Exception as e:
+            logger.exception(e)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Server error'})
+
+    def _send(self, status: HTTPStatus, payload: PAYLOAD) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection: self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info('%s ' + format, self.address_string(), *args)
+
+class Server(HTTPServer):
+    '''
+       HTTP server handing each connection to a pool of 'workers'
+       threads, all sharing one Service.
+    '''
+
+    def __init__(self, service: Service,
+                 address: Tuple[str, int] = (config.SERVER_HOST, config.SERVER_PORT),
+                 workers: int = config.SERVER_WORKERS) -> None:
+        super(Server, self).__init__(address, RequestHandler)
+        self.service = service
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='api')
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        '''
+           Stops listening and waits for connections being served.
+        '''
+
+        super(Server, self).server_close()
+        self._pool.shutdown(wait=True)
+
+def serve(host: str = config.SERVER_HOST, port: int = config.SERVER_PORT,
+          workers: int = config.SERVER_WORKERS) -> None:
+    '''
+       Loads model and users once and serves until interrupted.
+    '''
+
+    service = Service(user_manager.UserManager(),
+                      plugin.get_class(config.TASK_MODEL)())
+    with Server(service, (host, port), workers) as server:
+        logger.info('Serving on %s:%s', host, server.server_address[1])
+        print(f'Serving on http://{host}:{server.server_address[1]}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description = 'JSON HTTP API over the task model and users')
+    parser.add_argument('--host', type=str, default=config.SERVER_HOST,
+                        help='address to listen on')
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT,
+                        help='port to listen on')
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS,
+                        help='threads serving connections')
+    args = parser.parse_args()
+
+    config.setup_logging()
+    serve(args.host, args.port, args.workers)
@@ -0,0 +1,188 @@
+import importlib
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+__version__ = 0.1
+
+# Set up logger.
+logger = logging.getLogger(__name__)
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CLASS
+##
+# StateGraphError: Raised for an invalid app state configuration.
+# StateNode: State with its controller, view and settings resolved.
+# StateGraph: States of the app by name, validated once.
+##
+# 2. FUNCTION
+##
+# targets: Names of the states a state configuration can go to.
+########################################################
+
+# Type of state that ends the app.
+_NULL_TYPE_ = 'Null'
+
+
+class StateGraphError(ValueError):
+    '''
+       Raised for an invalid app state configuration.
+
+       'problems' holds one message per problem found.
+    '''
+
+    def __init__(self, problems: List[str]) -> None:
+        self.problems = problems
+        super(StateGraphError, self).__init__(
+            'Invalid app states:\n\t' + '\n\t'.join(problems))
+
+
+def _freeze(value: Any) -> Any:
+    # Lists become tuples so settings shared by every run stay unchanged.
+    if isinstance(value, list): return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def targets(state: Mapping[str, Any]) -> Tuple[str, ...]:
+    '''
+       Returns names of the states a state configuration can go to.
+
+       Options are state names unless taken from the user tasks,
+       as selection controllers do when 'source' is 'user'.
+    '''
+
+    names = [state.get('next', _NULL_TYPE_)]
+    if state.get('source', 'user') != 'user':
+        names.extend(state.get('options', ()))
+    return tuple(name for name in names if name != _NULL_TYPE_)
+
+
+@dataclass(frozen=True)
+class StateNode():
+    '''
+       State with its controller, view and settings resolved.
+    '''
+
+    name: str
+    controller: Type
+    view: Type
+    settings: Mapping[str, Any]
+    targets: Tuple[str, ...]
+    # Controller factory built once instead of on every transition.
+    make: Callable = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'make', partial(self.controller, **self.settings))
+
+
+class StateGraph():
+    '''
+       States of the app by name, validated once.
+
+       Each state's controller and view modules are imported at
+       compile time. Dangling 'next' and 'options' targets, missing
+       modules and an unknown start state raise StateGraphError.
+       States not reachable from the start state are logged.
+    '''
+
+    def __init__(self, start: str, nodes: Dict[str, Optional[StateNode]]) -> None:
+        self.start = start
+        # None for states ending the app.
+        self._nodes = nodes
+
+    @classmethod
+    def compile(cls, config_data: Mapping[str, Any],
+                view: str = '.prompt') -> 'StateGraph':
+        '''
+           Builds graph from the app state configuration.
+
+           'view' is the suffix of the view module of each type of
+           state, as '.prompt' or '.GUI'.
+        '''
+
+        problems: List[str] = []
+        start = config_data.get('start_state', _NULL_TYPE_)
+        # Filter states missing name and name of type.
+        states = [state for state in config_data.get('states', ())
+                  if 'name_of_type' in state and 'name' in state]
+        if not states: raise StateGraphError(['App has no states'])
+
+        modules: Dict[str, Any] = dict()
+        def load(path: str, state: str) -> Any:
+            if path not in modules:
+                try:
+                    modules[path] = importlib.import_module(path)
+                except Exception as e:
+                    modules[path] = None
+                    problems.append(f"State '{state}': could not load {path} ({e!r})")
+            return modules[path]
+
+        nodes: Dict[str, Optional[StateNode]] = dict()
+        for state in states:
+            name, kind = state['name'], state['name_of_type']
+            if name in nodes:
+                problems.append(f"State '{name}' is defined more than once")
+                continue
+            if kind == _NULL_TYPE_:
+                nodes[name] = None
+                continue
+            controller = load(f'src.{kind}.controller', name)
+            view_module = controller and load(f'src.{kind}{view}', name)
+            if view_module is None:
+                nodes[name] = None
+                continue
+            nodes[name] = StateNode(name, controller.Controller, view_module.View,
+                                    _freeze(state), targets(state))
+
+        if start not in nodes:
+            problems.append(f"Start state '{start}' is not defined")
+        for state in states:
+            for target in targets(state):
+                if target not in nodes:
+                    problems.append(f"State '{state['name']}' goes to "
+                                    f"undefined state '{target}'")
+        if problems: raise StateGraphError(problems)
+
+        graph = cls(start, nodes)
+        unreachable = set(nodes) - graph.reachable()
+        for name in sorted(unreachable):
+            logger.warning("State '%s' is not reachable from '%s'", name, start)
+        return graph
+
+    def reachable(self) -> 'set[str]':
+        '''
+           Returns names of the states reachable from the start state.
+        '''
+
+        seen = {self.start}
+        queue = deque(seen)
+        while queue:
+            node = self._nodes.get(queue.popleft())
+            for target in node.targets if node else ():
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+
+    def get(self, name: str) -> Optional[StateNode]:
+        '''
+           Returns state by name, None if it ends the app.
+        '''
+
+        if name not in self._nodes and name != _NULL_TYPE_:
+            logger.error("Unknown state '%s', exiting", name)
+        return self._nodes.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
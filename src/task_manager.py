@@ -1,13 +1,13 @@
 import json
-import importlib
 import logging
+import threading
 import time
 
-from functools import partial
-from typing import Type
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple, Type
 
-from src import protocols, config, user_manager
-from src.task_master import local_model
+from src import protocols, config, plugin, instrument
+from src.state_graph import StateGraph, StateNode
 
 __version__ = 0.1
 
@@ -28,54 +28,67 @@ with open(config._APP_STATE_CONFIG_) as f:
     config_data = json.load(f)
     # Get start state.
     START_STATE = config_data['start_state']
-    # Filter states missing name and name of type.
-    STATE_DATA = list(filter(
-        lambda x:('name_of_type' in x.keys() and 'name' in x.keys()),
-        config_data['states']
-        ))
-    
-# Check for valid states.
-assert len(STATE_DATA) > 0, 'App has no states'
-# Check for valid start state.
-assert START_STATE in [state['name'] for state in STATE_DATA], 'Initial state is not valid'
 
-# Creates a state preconfigured to specific task.
-def get_state(**kwargs):
+
+def load(view: str = DEFAULT_VIEW) -> Tuple[StateGraph, Type, Type]:
     '''
-       Loads module if necessary and returns the state with configurations set.
+       Imports what is needed before the first prompt.
+
+       Returns compiled states, user manager and model classes.
+       Password hasher, reports and other states' dependencies are
+       imported when first used.
     '''
 
-    # If no name of type is given, return None.
-    if kwargs.get('name_of_type', 'Null') == 'Null':
-        return None, None
-    # Copy args to avoid changing them.
-    args_ = kwargs.copy()
+    return (StateGraph.compile(config_data, view),
+            plugin.get_class(config.USER_MANAGER),
+            plugin.get_class(config.TASK_MODEL))
 
-    # Get type of State to configure.
-    module = 'src.' + args_['name_of_type'] + '.controller'
-    
-    # Get view for state.
-    view_type = 'src.' + args_['name_of_type'] + DEFAULT_VIEW
 
-    # Loads module and view. Defaults to 'exit' if fail.
-    # Load module if necessary.
-    if module not in globals():
+class ModelLoadError(RuntimeError):
+    '''
+       Raised when using a model that failed to load in the background.
+    '''
+    ...
+
+class BackgroundModel():
+    '''
+       Model constructed on a background thread.
+
+       Loading starts at once and attributes wait until it is done,
+       so states not using the model, as the login page, run while
+       the task file is parsed. A failed load raises ModelLoadError
+       when the model is first used.
+    '''
+
+    def __init__(self, factory: Callable[[], protocols.model_protocol]) -> None:
+        self._future: 'Future[protocols.model_protocol]' = Future()
+        threading.Thread(target=self._load, args=(factory,),
+                         name='model warm-up', daemon=True).start()
+
+    def _load(self, factory: Callable[[], protocols.model_protocol]) -> None:
         try:
-            globals()[module] = importlib.import_module(module)
-        except:
-            logger.error(f"Could not load module {module}")
-            return None, None
-    # Load view if necessary.
-    if view_type not in globals():
+            with instrument.timed('model warm-up'):
+                self._future.set_result(factory())
+        except BaseException as e:
+            logger.error('Could not load model: %r', e)
+            self._future.set_exception(e)
+
+    def ready(self) -> bool:
+        return self._future.done()
+
+    def result(self) -> protocols.model_protocol:
+        '''
+           Waits for and returns the loaded model.
+        '''
+
         try:
-            globals()[view_type] = importlib.import_module(view_type)
-        except:
-            logger.error(f"Could not load view {view_type}")
-            return None, None
-        
-    # Return configured state.
-    return (partial(globals()[module].Controller, **args_),
-            globals()[view_type].View)
+            with instrument.timed('model warm-up wait'):
+                return self._future.result()
+        except Exception as e:
+            raise ModelLoadError(f'Could not load tasks: {e}') from e
+
+    def __getattr__(self, name: str):
+        return getattr(self.result(), name)
 
 
 # Main class that controls the application. 
@@ -87,7 +100,8 @@ class TaskManager():
     def __new__(cls,
                  user: protocols.user_protocol,
                  model: protocols.model_protocol,
-                 start: str = 'Null') -> 'TaskManager':
+                 start: str = 'Null',
+                 graph: Optional[StateGraph] = None) -> 'TaskManager':
         '''
            Guarantees only one instance of the class is created.
         '''
@@ -100,7 +114,8 @@ class TaskManager():
     def __init__(self,
                  user: protocols.user_protocol,
                  model: protocols.model_protocol,
-                 start: str = 'Null') -> None:
+                 start: str = 'Null',
+                 graph: Optional[StateGraph] = None) -> None:
         super().__init__()
 
         # Avoid changes in case of existing instance.
@@ -108,6 +123,8 @@ class TaskManager():
         # Set user manager and data model.
         self.user = user
         self.model = model
+        # States compiled once, with the view chosen at startup.
+        self.graph = graph or StateGraph.compile(config_data, DEFAULT_VIEW)
         # Defines current state of app.
         self.state = start
         # Defines restaring state after crashes.
@@ -117,15 +134,15 @@ class TaskManager():
         # Keep an index of the current task being processed.
         self.task_index = -1
 
-    def state_wrapper(self, pre_controller: Type[protocols.preconfigured_controller]):
+    def state_wrapper(self, node: StateNode):
         '''
            Wraps Controller class as a callable
         '''
 
         def wrapper(user:protocols.user_protocol, model:protocols.model_protocol):
             # Create controller and bind view.
-            state = pre_controller(user=user, model=model, id=self.task_index)
-            state.bind_UI(view=self.current_view)
+            state = node.make(user=user, model=model, id=self.task_index)
+            state.bind_UI(view=node.view)
             # Run and store new id.
             state.run()
             self.task_index = state.id
@@ -139,24 +156,10 @@ class TaskManager():
         '''
 
         while True:
-            logger.info(f'State to run: {self.state}')
-            # State configuration.
-            try:
-                # Find state configuration.
-                state_config = next(
-                    filter(
-                        lambda x: x['name'] == self.state,
-                        STATE_DATA
-                    )
-                )
-            except StopIteration:
-                # Or set to null is not found.
-                state_config = {'name of type': 'Null'}
-
-            logger.info(f'next_state: {state_config}')
-            # Get state to execute and .
-            next_state, self.current_view = get_state(**state_config)
-            logger.info(f'next_state: {next_state}')
+            logger.info('State to run: %s', self.state)
+            # Find state, None if not found or ending the app.
+            next_state = self.graph.get(self.state)
+            logger.info('next_state: %s', next_state)
 
             # Check for end of app.
             if next_state is None: break
@@ -164,9 +167,10 @@ class TaskManager():
             # Run to next state.
             try:
                 # Create callable state.
-                callable_state = self.state_wrapper(next_state) #type: ignore
-                # Execute state.
-                self.state = callable_state(self.user, self.model) 
+                callable_state = self.state_wrapper(next_state)
+                # Execute state, timed per state name when instrumented.
+                with instrument.timed(f'state {self.state}'):
+                    self.state = callable_state(self.user, self.model)
             except ValueError as e:
                 # Print error message and restart.
                 print(f'{self.__class__.__name__} crashed with call to:',
@@ -184,9 +188,17 @@ class TaskManager():
                     print(f'restarting...{simb[i%len(simb)]}', end='\r')
                     # wait for half a second.
                     time.sleep(0.5)     
+            except ModelLoadError as e:
+                # No tasks to work on, end the app.
+                print(e)
+                logger.error(e)
+                break
 
-        # Save changes to tasks.
-        self.model.save_tasks()
+        # Save changes to tasks, none if they never loaded.
+        try:
+            self.model.save_tasks()
+        except ModelLoadError:
+            pass
         # Clear instance reference from class.
         TaskManager._kill()
             
@@ -198,6 +210,24 @@ class TaskManager():
 
         del cls.instance
 
+def setup(view: str = DEFAULT_VIEW) -> TaskManager:
+    '''
+       Sets up logging, states, user manager and the model loading in
+       the background. Returns the app ready for its first prompt.
+    '''
+
+    config.setup_logging()
+    graph, Users, Model = load(view)
+    # Create task manager, tasks load while the user logs in.
+    return TaskManager(
+        model=BackgroundModel(lambda: Model(by_owner=config.PARTIAL_LOAD)),
+        user=Users(),
+        start=START_STATE,
+        graph=graph)
+
+# Statement timed by '--startup-profile', from a new interpreter.
+_FIRST_PROMPT_ = 'from src import task_manager; task_manager.setup({view!r})'
+
 if __name__ == '__main__':
     import argparse
 
@@ -205,18 +235,27 @@ if __name__ == '__main__':
         description = 'Example of {} module'.format(__file__.split("\\")[-1]))
     parser.add_argument('--UI', type=str,
                         help='UI to use: prompt or view')
+    parser.add_argument('--instrument', action='store_true',
+                        help='print latency summary at exit')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='print import times up to the first prompt and exit')
     args = parser.parse_args()
 
+    if args.instrument: instrument.enable(report_at_exit=True)
+
     UI_options = ['prompt', 'GUI']
     if args.UI is not None:
         if args.UI in UI_options:
             DEFAULT_VIEW = '.'+args.UI
         else:
             parser.error(f'Invalid UI option: {args.UI}')
-            
-    # Create task manager
-    app = TaskManager(
-        user=user_manager.UserManager(),
-        model=local_model.Model(),
-        start=START_STATE)
-    app.run()
\ No newline at end of file
+
+    if args.startup_profile:
+        seconds, imports = instrument.import_times(
+            _FIRST_PROMPT_.format(view=DEFAULT_VIEW))
+        print('\n'.join(instrument.import_summary(imports)))
+        print(f'\nFirst prompt ready in {seconds:.3f} s, ' + \
+              f'budget {config.STARTUP_BUDGET:.3f} s')
+        exit(0 if seconds <= config.STARTUP_BUDGET else 1)
+
+    setup(DEFAULT_VIEW).run()
@@ -0,0 +1,184 @@
+import sys
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterator, List
+from src.task_master.single_task import DATA_TYPE, TASK_LABELS, \
+    from_ordinal, to_ordinal
+from src.task_master.tasks import Tasks
+
+__version__ = 0.1
+
+# Labels by column.
+_OWNER_, _TITLE_, _DESCRIPTION_, _DUE_, _ASSIGNED_, _COMPLETED_ = TASK_LABELS
+
+class TaskColumns(MutableSequence):
+    '''
+       Sequence of task data stored as one column per label.
+
+       - owners: codes into a table of distinct owner names,
+       - titles: interned strings,
+       - descriptions: strings,
+       - due and assigned dates: ordinals in integer arrays,
+       - completed: bitmap.
+       Items are built as DATA_TYPE dictionaries on access, so changes
+       must be written back by setting the item.
+    '''
+
+    def __init__(self) -> None:
+        super(TaskColumns, self).__init__()
+        self._owner_names: List[str] = list()
+        self._owner_codes: Dict[str, int] = dict()
+        self._owners = array('I')
+        self._titles: List[str] = list()
+        self._descriptions: List[str] = list()
+        self._due = array('i')
+        self._assigned = array('i')
+        self._completed = bytearray()
+        self._size = 0
+        # Dates converted both ways, tasks share few distinct dates.
+        self._ordinals: Dict[str, int] = dict()
+        self._dates: Dict[int, str] = dict()
+
+##############################################
+#                                            #
+#             COLUMN HELPERS                 #
+#                                            #
+##############################################
+
+    def _owner_code(self, owner: str) -> int:
+        '''
+           Returns code of owner name, adding it if new.
+        '''
+
+        code = self._owner_codes.get(owner)
+        if code is None:
+            code = self._owner_codes[owner] = len(self._owner_names)
+            self._owner_names.append(owner)
+        return code
+
+    def _ordinal(self, text: str) -> int:
+        ordinal = self._ordinals.get(text)
+        if ordinal is None: ordinal = self._ordinals[text] = to_ordinal(text)
+        return ordinal
+
+    def _date(self, ordinal: int) -> str:
+        text = self._dates.get(ordinal)
+        if text is None: text = self._dates[ordinal] = from_ordinal(ordinal)
+        return text
+
+    def _bit(self, index: int) -> bool:
+        return bool(self._completed[index >> 3] & (1 << (index & 7)))
+
+    def _set_bit(self, index: int, value: bool) -> None:
+        if value:
+            self._completed[index >> 3] |= 1 << (index & 7)
+        else:
+            self._completed[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def _shift_bits(self, index: int, insert: bool) -> None:
+        '''
+           Opens (insert) or closes a bit at 'index', moving later bits.
+        '''
+
+        byte = index >> 3
+        tail = int.from_bytes(self._completed[byte:], 'little')
+        low = tail & ((1 << (index & 7)) - 1)
+        high = tail >> (index & 7)
+        high = high << 1 if insert else high >> 1
+        tail = low | (high << (index & 7))
+        size = (self._size + (1 if insert else -1) + 7 >> 3) - byte
+        self._completed[byte:] = tail.to_bytes(max(size, 0), 'little')
+
+    def _index(self, index: int) -> int:
+        '''
+           Returns non negative index or raises IndexError.
+        '''
+
+        if index < 0: index += self._size
+        if not 0 <= index < self._size: raise IndexError("Invalid index")
+        return index
+
+##############################################
+#                                            #
+#             SEQUENCE                       #
+#                                            #
+##############################################
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        i = self._index(index)
+        return {
+            _OWNER_: self._owner_names[self._owners[i]],
+            _TITLE_: self._titles[i],
+            _DESCRIPTION_: self._descriptions[i],
+            _DUE_: self._date(self._due[i]),
+            _ASSIGNED_: self._date(self._assigned[i]),
+            _COMPLETED_: 'Yes' if self._bit(i) else 'No',
+        }
+
+    def __iter__(self) -> Iterator[DATA_TYPE]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __setitem__(self, index: Any, data: DATA_TYPE) -> None:
+        if isinstance(index, slice):
+            raise TypeError(f'{self.__class__.__name__} does not set slices')
+        i = self._index(index)
+        self._owners[i] = self._owner_code(data[_OWNER_])
+        self._titles[i] = sys.intern(data[_TITLE_])
+        self._descriptions[i] = data[_DESCRIPTION_]
+        self._due[i] = self._ordinal(data[_DUE_])
+        self._assigned[i] = self._ordinal(data[_ASSIGNED_])
+        self._set_bit(i, data[_COMPLETED_] == 'Yes')
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            raise TypeError(f'{self.__class__.__name__} does not delete slices')
+        i = self._index(index)
+        del self._owners[i]
+        del self._titles[i]
+        del self._descriptions[i]
+        del self._due[i]
+        del self._assigned[i]
+        self._shift_bits(i, insert=False)
+        self._size -= 1
+
+    def insert(self, index: int, data: DATA_TYPE) -> None:
+        # Clamp index like list.insert.
+        if index < 0: index = max(index + self._size, 0)
+        i = min(index, self._size)
+        # Convert first so a bad row leaves columns unchanged.
+        values = (self._owner_code(data[_OWNER_]), sys.intern(data[_TITLE_]),
+                  data[_DESCRIPTION_], self._ordinal(data[_DUE_]),
+                  self._ordinal(data[_ASSIGNED_]), data[_COMPLETED_] == 'Yes')
+        self._owners.insert(i, values[0])
+        self._titles.insert(i, values[1])
+        self._descriptions.insert(i, values[2])
+        self._due.insert(i, values[3])
+        self._assigned.insert(i, values[4])
+        if i == self._size:
+            if not self._size & 7: self._completed.append(0)
+        else:
+            self._shift_bits(i, insert=True)
+        self._size += 1
+        self._set_bit(i, values[5])
+
+    def clear(self) -> None:
+        self.__init__()
+
+
+class ColumnarTasks(Tasks):
+    '''
+       Class manages list of tasks stored by column.
+
+       Same interface as Tasks with TaskColumns as buffer.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(ColumnarTasks, self).__init__(*args, **kwargs)
+        # Tasks as columns instead of a list of DATA_TYPE.
+        self._buffer = TaskColumns() #type: ignore
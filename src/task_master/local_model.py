@@ -1,12 +1,18 @@
 import logging
+from collections import Counter
+from functools import cached_property
 from typing import List, Optional, Tuple
 from src import plugin
 from src import config, user_manager
-from src.task_master import single_task, tasks, task_stats
+from src.task_master import merge, owner_index, single_task, tasks, task_stats
+
+# Set up logger.
+logger = logging.getLogger(__name__)
 
 try:
     DataFile = plugin.get_class(config.FILE_HANDLER)
     ReportFile = plugin.get_class(config.REPORT_HANDLER)
+    TaskStore = plugin.get_class(config.TASK_STORE)
 except Exception as e:
     logging.error("Could not load modules defined in config.py")
     print(e.args[0])
@@ -21,33 +27,71 @@ class Model():
     def __init__(self,
                  taskfile: str = config._TASK_FILE_,
                  u_report_file: str = config._USER_REPORT_FILE_,
-                 t_report_file: str = config._TASK_REPORT_FILE_
+                 t_report_file: str = config._TASK_REPORT_FILE_,
+                 by_owner: bool = False
                  ) -> None:
-        self.tasks = tasks.Tasks()
+        '''
+           Loads all tasks, or if 'by_owner' only tasks of the first
+           owner they are asked for, see _ensure.
+        '''
+
+        self.tasks: tasks.Tasks = TaskStore()
 
         # Create file handlers
         self.taskfile = DataFile(taskfile, labels=tasks.TASK_LABELS)
-
-        self.user_report_file = ReportFile(
-            filename=u_report_file,
-            labels=task_stats.USER_REPORT_LABELS)
-        
-        self.task_report_file = ReportFile(
-            filename=t_report_file,
-            labels=task_stats.TASK_REPORT_LABELS)
+        self.create_report_files(u_report_file, t_report_file)
+        # While loaded by owner, their rows as last loaded or saved, base
+        # of merges with other sessions. Otherwise the task file buffer
+        # holds them, see _mark_saved.
+        self._base: List[merge.ROW_TYPE] = list()
+        # While loaded by owner: index of the task file, owner loaded
+        # and file row of each task.
+        self._path = taskfile
+        self._index: Optional[owner_index.OwnerIndex] = None
+        self._owner: Optional[str] = None
+        self._positions: List[int] = list()
+
+        if by_owner and self.taskfile.line_rows:
+            with self.taskfile.locked(exclusive=False):
+                self._index = owner_index.get(taskfile)
+            self._rows_match = False
+            self._saved_generation = self.tasks.generation
+            return
         
         # Load tasks data from file.
         self.taskfile.load()
 
         # Update tasks list with data from file.
         self.tasks.extend(self.taskfile.buffer)
+        self._mark_saved()
         
+    def create_report_files(self, u_report_file: str, t_report_file: str) -> None:
+        '''
+           Sets user and task report file paths.
+
+           Handlers are created when a report is first written or read.
+        '''
+
+        self._u_report_file = u_report_file
+        self._t_report_file = t_report_file
+
+    @cached_property
+    def user_report_file(self):
+        return ReportFile(filename=self._u_report_file,
+                          labels=task_stats.USER_REPORT_LABELS)
+
+    @cached_property
+    def task_report_file(self):
+        return ReportFile(filename=self._t_report_file,
+                          labels=task_stats.TASK_REPORT_LABELS)
+
     def get_all_tasks(self, user: Optional[str] = None) -> Tuple[List[str], List[int]]:
         '''
            Returns all the tasks associated to a user and a mapping to real task index.
            If no user is specified, returns all tasks.
         '''
 
+        self._ensure(user)
         return self.tasks.list_tasks(user)
 
     def get_task(self, index: int) -> str:
@@ -64,6 +108,7 @@ class Model():
            Delegate task inclusion to Tasks class.
         '''
 
+        self._ensure(data[0] if data else None)
         self.tasks.extend([{k:v for k,v in zip(tasks.TASK_LABELS, data)}])
         return True
 
@@ -108,14 +153,240 @@ class Model():
         except IndexError or single_task.taskError:
             return False
 
+    def edit_many(self, edit: tasks.TaskEdit,
+                  task_ids: Optional[List[int]] = None,
+                  where: Optional[tasks.TaskFilter] = None) -> tasks.BatchResult:
+        '''
+           Delegates batch edit to Tasks class.
+        '''
+
+        if task_ids is None: self._ensure(None)
+        return self.tasks.edit_many(edit, task_ids, where)
+
+    def reassign_tasks(self, owner: str,
+                       task_ids: Optional[List[int]] = None,
+                       where: Optional[tasks.TaskFilter] = None) -> tasks.BatchResult:
+        '''
+           Changes owner of many tasks.
+        '''
+
+        return self.edit_many(lambda task: task.edit_user(owner), task_ids, where)
+
+    def complete_tasks(self, task_ids: Optional[List[int]] = None,
+                       where: Optional[tasks.TaskFilter] = None) -> tasks.BatchResult:
+        '''
+           Marks many tasks as completed.
+        '''
+
+        return self.edit_many(lambda task: task.mark_as_completed(),
+                              task_ids, where)
+
+    @staticmethod
+    def _values(rows) -> List[merge.ROW_TYPE]:
+        '''
+           Rows as tuples of values in label order.
+        '''
+
+        return [tuple(row.get(label, '') for label in tasks.TASK_LABELS)
+                for row in rows]
+
+    def _mark_saved(self) -> None:
+        '''
+           Marks file rows as matching tasks.
+
+           The task file buffer keeps the rows as loaded or saved, so no
+           other copy of the tasks is kept as base of merges: buffer rows
+           are copies of the tasks, never changed by editing them.
+        '''
+
+        # Rows skipped on load would shift indices of file rows.
+        self._rows_match = len(self.taskfile.buffer) == len(self.tasks)
+        self.tasks.clear_dirty()
+        self._saved_generation = self.tasks.generation
+
+    @staticmethod
+    def _valid(row) -> bool:
+        '''
+           Checks tasks would load the row, as Tasks.extend does.
+        '''
+
+        try:
+            single_task.SingleTask(**single_task.valid_filter(dict(row)))
+        except single_task.taskError:
+            return False
+        return True
+
+    def _saved_rows(self) -> List[merge.ROW_TYPE]:
+        '''
+           Rows tasks were last loaded from or saved to.
+        '''
+
+        rows = self.taskfile.buffer
+        # Without rows skipped on load.
+        if not self._rows_match: rows = filter(self._valid, rows)
+        return self._values(rows)
+
+    def _merge(self) -> None:
+        '''
+           Merges tasks with the file written by another session.
+
+           Tasks are replaced by the three-way merge of the rows last
+           loaded or saved, the tasks and the rows now in the file.
+           Fields changed by both keep our value.
+        '''
+
+        base = self._saved_rows()
+        self.taskfile.reload()
+        rows, conflicts = merge.merge_rows(
+            base, self._values(self.tasks.rows(range(len(self.tasks)))),
+            self._values(self.taskfile.buffer), self.tasks.removed)
+        for i, pos in conflicts:
+            logger.warning('Task %s %s changed by another session, kept %r',
+                           i+1, tasks.TASK_LABELS[pos], rows[i][pos])
+        logger.info('Merged %s tasks with changes of another session', len(rows))
+        self.tasks = TaskStore()
+        self.tasks.extend([dict(zip(tasks.TASK_LABELS, row)) for row in rows])
+        # Whole file is written.
+        self._rows_match = False
+
     def save_tasks(self):
          '''
             Saves task changes to file.
+
+            Skips if tasks did not change since loaded or saved. Without
+            removals only changed and added rows are passed to the file
+            handler.
+            File stays locked from the version check to the write. If
+            another session wrote it since last load or save, changes
+            are merged instead of overwriting theirs.
          '''
 
-         self.taskfile.buffer.clear()
-         self.taskfile.buffer.extend(iter(self.tasks))
-         self.taskfile.dump()
+         if self.tasks.generation == self._saved_generation: return
+         if self._index is not None: return self._save_owner()
+         with self.taskfile.locked():
+             if self.taskfile.stale(): self._merge()
+             buffer = self.taskfile.buffer
+             if self._rows_match and not self.tasks.removed:
+                 dirty = self.tasks.dirty
+                 for i, row in zip(dirty, self.tasks.rows(dirty)):
+                     if i < len(buffer): buffer[i] = dict(row)
+                     else: buffer.append(dict(row))
+                 self.taskfile.dump_rows(dirty)
+                 self._mark_saved()
+                 return
+             buffer.clear()
+             buffer.extend(dict(row) for row in self.tasks)
+             self.taskfile.dump()
+             self._mark_saved()
+
+# LOADING BY OWNER
+
+    def _ensure(self, owner: Optional[str]) -> None:
+        '''
+           Loads tasks 'owner' needs when loaded by owner.
+
+           Only tasks of the first owner asked for are read. All tasks
+           are loaded when asked for all or for another owner.
+        '''
+
+        if self._index is None: return
+        if owner is None or self._owner not in (None, owner):
+            self._load_all()
+        elif self._owner is None:
+            self._load_owner(owner)
+
+    def _load_owner(self, owner: str) -> None:
+        '''
+           Loads tasks of 'owner' reading only their rows.
+        '''
+
+        with self.taskfile.locked(exclusive=False):
+            if self._index.version != owner_index.version(self._path): #type: ignore
+                self._index = owner_index.get(self._path)
+            rows = self._index.read(self._path, owner) #type: ignore
+        for position, line in rows:
+            before = len(self.tasks)
+            self.tasks.extend([dict(zip(tasks.TASK_LABELS, line.split(';')))])
+            # Invalid rows are skipped.
+            if len(self.tasks) > before: self._positions.append(position)
+        self._owner = owner
+        self._base = self._values(self.tasks.rows(range(len(self.tasks))))
+        self.tasks.clear_dirty()
+        self._saved_generation = self.tasks.generation
+        logger.info('Loaded %s tasks of %s', len(self.tasks), owner)
+
+    def _load_all(self) -> None:
+        '''
+           Loads all tasks, saving changes to the owner's tasks first.
+
+           Task indices returned before change.
+        '''
+
+        if self.tasks.generation != self._saved_generation: self._save_owner()
+        self._index, self._owner, self._positions, self._base = None, None, list(), list()
+        self.taskfile.reload()
+        self.tasks = TaskStore()
+        self.tasks.extend(self.taskfile.buffer)
+        self._mark_saved()
+
+    def _save_owner(self) -> None:
+        '''
+           Saves tasks loaded by owner into the whole task file.
+
+           The file handler loads the file and writes it, with the file
+           locked. Only the owner's rows are merged, against the rows
+           they were loaded from: by position while no rows were
+           removed, otherwise by content with the rows of the file
+           still matching them. Rows of other owners are kept as they
+           are in the file.
+        '''
+
+        ours = self._values(self.tasks.rows(range(len(self.tasks))))
+        with self.taskfile.locked():
+            self.taskfile.load()
+            buffer = self.taskfile.buffer
+            if self.tasks.removed or len(buffer) < self._index.rows: #type: ignore
+                # Loaded rows still in the file, their other rows are kept.
+                loaded = Counter(self._base)
+                theirs, others = list(), list()
+                for row in buffer:
+                    values = self._values([row])[0]
+                    if loaded[values]:
+                        loaded[values] -= 1
+                        theirs.append(values)
+                    else:
+                        others.append(row)
+                rows, conflicts = merge.merge_rows(self._base, ours, theirs, True)
+                buffer.clear()
+                buffer.extend(dict(zip(tasks.TASK_LABELS, row)) for row in rows)
+                buffer.extend(others)
+                self.taskfile.dump()
+                reload = True
+            else:
+                merged, conflicts = merge.merge_subset(
+                    self._base, ours, self._positions,
+                    {i: self._values([buffer[i]])[0] for i in self._positions})
+                for i, row in merged.items():
+                    buffer[i] = dict(zip(tasks.TASK_LABELS, row))
+                # Tasks differ from the file if the other session changed them.
+                reload = any(merged[i] != row for i, row in zip(self._positions, ours))
+                added = range(len(buffer), len(buffer) + len(ours) - len(self._base))
+                buffer.extend(dict(zip(tasks.TASK_LABELS, row))
+                              for row in ours[len(self._base):])
+                self._positions.extend(added)
+                self.taskfile.dump_rows(sorted(merged) + list(added))
+            self._index = owner_index.scan(self._path)
+            self._index.dump(self._path)
+        for i, pos in conflicts:
+            logger.warning('Task %s %s changed by another session, kept ours',
+                           i+1, tasks.TASK_LABELS[pos])
+        self._base = ours
+        self.tasks.clear_dirty()
+        self._saved_generation = self.tasks.generation
+        if reload and self._owner is not None:
+            logger.info('Merged tasks of %s with changes of another session', self._owner)
+            self.tasks, self._positions = TaskStore(), list()
+            self._load_owner(self._owner)
 
 # REPORT GENERATING AND READING
 
@@ -159,17 +430,22 @@ class Model():
                       "\nUser statistics:\n"
         self.user_report_file.set_pre_header(pre_header)
 
+    def get_task_stats(self, userlist: List[str]) -> task_stats.TaskStats:
+        '''
+           Returns statistics calculator from live task status counts.
+        '''
+
+        self._ensure(None)
+        return task_stats.TaskStats.from_counts(self.tasks.status_counts(),
+                                                userlist)
+
     def write_report(self, userlist: List[str]) -> None:
         '''
            Returns users and tasks statistics.
         '''
 
         # Creates a report generator and returns users and tasks reports.
-        task_stats_calc = task_stats.TaskStats(
-            [*iter(self.tasks)],
-            self.tasks.get_stats(),
-            userlist
-        )
+        task_stats_calc = self.get_task_stats(userlist)
 
         # Pass total number of users and tasks to report file headers.
         self.set_report_headers(
@@ -0,0 +1,130 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+__version__ = 0.1
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. FUNCTION
+##
+# merge_row: Three-way merge of a row, field by field.
+# merge_rows: Three-way merge of the rows of a data file.
+# merge_subset: Three-way merge of some rows of a data file.
+########################################################
+
+# Row as a tuple of values in label order.
+ROW_TYPE = Tuple[str, ...]
+# Row index and field position changed differently on both sides.
+CONFLICT_TYPE = Tuple[int, int]
+
+def merge_row(base: ROW_TYPE, ours: ROW_TYPE, theirs: ROW_TYPE
+              ) -> Tuple[ROW_TYPE, List[int]]:
+    '''
+       Returns row with the changes of both sides from 'base' and
+       positions of fields both sides changed differently.
+
+       Conflicting fields keep our value.
+    '''
+
+    if ours == base or ours == theirs: return theirs, []
+    if theirs == base: return ours, []
+    merged, conflicts = list(), list()
+    for pos, (b, o, t) in enumerate(zip(base, ours, theirs)):
+        if o != b and t != b and o != t: conflicts.append(pos)
+        merged.append(t if o == b else o)
+    return tuple(merged), conflicts
+
+def _similar(a: ROW_TYPE, b: ROW_TYPE) -> int:
+    '''
+       Number of fields equal in both rows.
+    '''
+
+    return sum(x == y for x, y in zip(a, b))
+
+def _align(base: Sequence[ROW_TYPE], rows: Sequence[ROW_TYPE]
+           ) -> List[Optional[int]]:
+    '''
+       Returns the index in 'base' each row comes from, None if added.
+
+       'rows' are base with rows removed, edited in place or appended.
+       Rows equal in both are matched first, keeping order. In between,
+       a row comes from the base row sharing most fields, if more than
+       half, and later than the one before.
+    '''
+
+    origin: List[Optional[int]] = [None] * len(rows)
+    matcher = SequenceMatcher(None, base, rows, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            origin[j1:j2] = range(i1, i2)
+            continue
+        for j in range(j1, j2):
+            if i1 >= i2: break
+            # Earliest of the most similar rows.
+            score, first = max((_similar(base[i], rows[j]), -i) for i in range(i1, i2))
+            if 2 * score <= len(rows[j]): continue
+            origin[j], i1 = -first, -first + 1
+    return origin
+
+def merge_rows(base: Sequence[ROW_TYPE], ours: Sequence[ROW_TYPE],
+               theirs: Sequence[ROW_TYPE], removed: bool = False
+               ) -> Tuple[List[ROW_TYPE], List[CONFLICT_TYPE]]:
+    '''
+       Three-way merge of the rows of a data file.
+
+       - base: rows when last loaded or saved,
+       - ours: rows now, 'removed' if any was removed since base,
+       - theirs: rows written meanwhile by another session.
+       Returns merged rows and the conflicts kept with our value.
+
+       Rows of each side are matched to the base row they come from:
+       ours by index while we removed none, otherwise as theirs are,
+       see _align. Rows kept by both are merged field by field, rows
+       removed by either side are removed and rows added are appended,
+       theirs first.
+    '''
+
+    kept_ours: List[Optional[ROW_TYPE]] = [None] * len(base)
+    kept_theirs: List[Optional[ROW_TYPE]] = [None] * len(base)
+    added: List[ROW_TYPE] = list()
+    for side, rows, origin in [
+            (kept_theirs, theirs, _align(base, theirs)),
+            (kept_ours, ours, _align(base, ours) if removed else
+             [i if i < len(base) else None for i in range(len(ours))])]:
+        for row, i in zip(rows, origin):
+            if i is None: added.append(row)
+            else: side[i] = row
+
+    merged, conflicts = list(), list()
+    for b, o, t in zip(base, kept_ours, kept_theirs):
+        if o is None or t is None: continue
+        row, fields = merge_row(b, o, t)
+        conflicts.extend((len(merged), pos) for pos in fields)
+        merged.append(row)
+    return merged + added, conflicts
+
+def merge_subset(base: Sequence[ROW_TYPE], ours: Sequence[ROW_TYPE],
+                 positions: Sequence[int], theirs: Mapping[int, ROW_TYPE]
+                 ) -> Tuple[Dict[int, ROW_TYPE], List[CONFLICT_TYPE]]:
+    '''
+       Three-way merge of some rows of a data file.
+
+       - base: rows loaded, from the file rows at 'positions',
+       - ours: rows now, rows after base were added,
+       - theirs: rows at 'positions' written meanwhile by another session.
+       Returns merged rows by position and the conflicts kept with our
+       value. Rows added by us are left to the caller.
+
+       Rows are matched by position, so neither side may have removed
+       rows since base was loaded. Otherwise use merge_rows with the
+       whole file.
+    '''
+
+    merged, conflicts = dict(), list()
+    for b, o, i in zip(base, ours, positions):
+        row, fields = merge_row(b, o, theirs[i])
+        merged[i] = row
+        conflicts.extend((i, pos) for pos in fields)
+    return merged, conflicts
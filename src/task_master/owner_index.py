@@ -0,0 +1,162 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from src import config
+from src.file_handler import atomic_write, DURABILITY_NONE
+
+__version__ = 0.1
+
+# Set up logger.
+logger = logging.getLogger(__name__)
+
+########################################################
+#                   MEMBERS                            #
+########################################################
+#
+# 1. CLASS
+##
+# OwnerIndex: Byte ranges of the rows of each owner in a task file.
+##
+# 2. FUNCTION
+##
+# version: Identifies content of a file.
+# split_lines: Rows of a task file as lines.
+# scan: Builds index reading a task file.
+# load: Reads index kept next to a task file, if current.
+# get: Current index of a task file, rebuilt if needed.
+########################################################
+
+# Consecutive rows of an owner: first row and byte range [start, end).
+RUN_TYPE = Tuple[int, int, int]
+# Inode, size and modification time of a file.
+VERSION_TYPE = Tuple[int, int, int]
+
+def version(path: str) -> VERSION_TYPE:
+    '''
+       Identifies content of a file: writes replace it, so its
+       inode, size and modification time change.
+    '''
+
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def split_lines(data: bytes) -> List[bytes]:
+    '''
+       Rows of a task file as lines, without the newlines.
+
+       Carriage returns of CRLF files are kept, as they count in the
+       byte offsets of the rows.
+    '''
+
+    lines = data.split(b'\n')
+    # Data files have no trailing newline, empty files no rows.
+    if not lines[-1]: lines.pop()
+    return lines
+
+@dataclass
+class OwnerIndex():
+    '''
+       Byte ranges of the rows of each owner in a task file.
+
+       Rows are lines whose first value is the owner. Runs of
+       consecutive rows of an owner are kept as one range, so the
+       rows of an owner can be read without reading the others.
+       'version' is the task file version the index was built from.
+    '''
+
+    version: VERSION_TYPE
+    rows: int = 0
+    runs: Dict[str, List[RUN_TYPE]] = field(default_factory=dict)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes], version: VERSION_TYPE) -> 'OwnerIndex':
+        index = cls(version)
+        last, offset = None, 0
+        for row, line in enumerate(lines):
+            owner = line.split(b';', 1)[0].rstrip(b'\r').decode()
+            end = offset + len(line)
+            if owner == last:
+                first, start, _ = index.runs[owner][-1]
+                index.runs[owner][-1] = (first, start, end)
+            else:
+                index.runs.setdefault(owner, []).append((row, offset, end))
+            last, offset = owner, end + 1
+            index.rows += 1
+        return index
+
+    def read(self, path: str, owner: str) -> List[Tuple[int, str]]:
+        '''
+           Returns row number and line of each row of 'owner'.
+        '''
+
+        rows = list()
+        with open(path, 'rb') as f:
+            for first, start, end in self.runs.get(owner, ()):
+                f.seek(start)
+                lines = f.read(end - start).decode().split('\n')
+                # Files written in Windows text mode end lines with CRLF.
+                rows.extend(enumerate((line.rstrip('\r') for line in lines), first))
+        return rows
+
+    def dump(self, path: str) -> None:
+        '''
+           Writes index next to task file at 'path'.
+        '''
+
+        lines = [';'.join(map(str, self.version + (self.rows,)))]
+        for owner, runs in self.runs.items():
+            lines.extend(f'{owner};{first};{start};{end}' for first, start, end in runs)
+        # Lost on a crash it is rebuilt, not worth a sync.
+        with atomic_write(path + config._OWNER_INDEX_SUFFIX_,
+                          durability=DURABILITY_NONE) as f:
+            f.write('\n'.join(lines))
+
+def scan(path: str) -> OwnerIndex:
+    '''
+       Builds index reading task file at 'path'.
+
+       Only the owner of each line is decoded.
+    '''
+
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    index = OwnerIndex.from_lines(split_lines(data),
+                                  (stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    logger.info('Indexed %s rows of %s owners in %s', index.rows, len(index.runs), path)
+    return index
+
+def load(path: str) -> Optional[OwnerIndex]:
+    '''
+       Reads index kept next to task file at 'path'.
+
+       Returns None if missing, unreadable or built from another
+       version of the task file.
+    '''
+
+    try:
+        with open(path + config._OWNER_INDEX_SUFFIX_) as f:
+            header, *lines = f.read().split('\n')
+        *stamp, rows = map(int, header.split(';'))
+        index = OwnerIndex(tuple(stamp), rows) #type: ignore
+        for line in lines:
+            owner, first, start, end = line.rsplit(';', 3)
+            index.runs.setdefault(owner, []).append((int(first), int(start), int(end)))
+    except (OSError, ValueError):
+        return None
+    return index if index.version == version(path) else None
+
+def get(path: str) -> OwnerIndex:
+    '''
+       Returns current index of task file at 'path', rebuilding
+       and writing it if stale.
+
+       Hold at least a shared lock of the task file while calling.
+    '''
+
+    index = load(path)
+    if index is None:
+        index = scan(path)
+        index.dump(path)
+    return index
@@ -1,10 +1,13 @@
 import logging
 from dataclasses import dataclass, asdict, field
-from datetime import datetime
-from typing import Callable, Mapping
+from datetime import date, datetime
+from typing import Callable, Mapping, MutableMapping
 
 __version__ = 0.1
 
+# Set up logger.
+logger = logging.getLogger(__name__)
+
 DATETIME_STRING_FORMAT = "%Y-%m-%d"
 DATA_TYPE = Mapping[str,str]
 
@@ -16,6 +19,30 @@ _MORE_ = '...'
 # Callback type for flagging task chenges to manager object.
 EditCallback = Callable[[], None] #Optional['SingleTask']]
 
+def to_ordinal(text: str) -> int:
+    '''
+       Converts a date string to its proleptic Gregorian ordinal.
+    '''
+
+    try:
+        return date.fromisoformat(text).toordinal()
+    except ValueError:
+        return datetime.strptime(text, DATETIME_STRING_FORMAT).toordinal()
+
+def from_ordinal(ordinal: int) -> str:
+    '''
+       Converts a proleptic Gregorian ordinal to a date string.
+    '''
+
+    return date.fromordinal(ordinal).strftime(DATETIME_STRING_FORMAT)
+
+def today_ordinal() -> int:
+    '''
+       Returns today's date as an ordinal.
+    '''
+
+    return date.today().toordinal()
+
 class taskError(ValueError):
     '''
        Error raised when task operation is invalid.
@@ -53,7 +80,7 @@ class SingleTask():
             )
     completed: str = 'No'
 
-    #logging.info('Created single task Owner/Title: {self.owner}/{self.title}')
+    #logger.info('Created single task Owner/Title: %s/%s', self.owner, self.title)
     callback: EditCallback = field(default=lambda: None, repr=False)
 
     def bind_edit_flag(self, method: EditCallback):
@@ -71,15 +98,24 @@ class SingleTask():
         dic.pop('callback')
         return dic
 
+    @property
+    def due_ordinal(self) -> int:
+        '''
+           Returns due date as an ordinal, parsed again only when the
+           due date changed, however it was set.
+        '''
+        due = self.__dict__.get('_due')
+        if due is None or due[0] != self.due_date:
+            due = self.__dict__['_due'] = (self.due_date, to_ordinal(self.due_date))
+        return due[1]
+
     @property
     def isOverdue(self) -> bool:
         '''
            Returns True if task is overdue.
         '''
         # Completed tasks are not overdue.
-        return not self.isCompleted and \
-            datetime.strptime(self.due_date, DATETIME_STRING_FORMAT).date() < \
-            datetime.now().date()
+        return not self.isCompleted and self.due_ordinal < today_ordinal()
 
     @property
     def isCompleted(self) -> bool:
@@ -137,7 +173,7 @@ class SingleTask():
         '''
         self.completed = 'Yes'
         self.callback()
-        logging.info('Marked task {self.title} as completed')
+        logger.info('Marked task %s as completed', self.title)
 
     def edit_user(self, owner:str) -> bool:
         '''
@@ -149,7 +185,7 @@ class SingleTask():
         if len(owner) == 0: raise taskError('Empty new owner name')
         self.owner = owner
         self.callback()
-        logging.info('Changed Owner of task {self.title} to: {self.owner}')
+        logger.info('Changed Owner of task %s to: %s', self.title, self.owner)
         return True
 
     def edit_date(self, new_date:str) -> bool:
@@ -165,13 +201,75 @@ class SingleTask():
             raise taskError(e.args[0])
         self.due_date = new_date
         self.callback()
-        logging.info('Changed Due date of task {self.title} to: {self.due_date}')
+        logger.info('Changed Due date of task %s to: %s', self.title, self.due_date)
         return True
 
 # Labels of task data
 TASK_LABELS =  list(SingleTask.__dataclass_fields__.keys())
 TASK_LABELS.remove('callback')
 
+def _row_field(label: str) -> property:
+    '''
+       Property reading and writing 'label' of the backing row.
+    '''
+
+    def get(self: 'TaskView') -> str:
+        return self._row[label]
+    def set(self: 'TaskView', value: str) -> None:
+        self._row[label] = value
+    return property(get, set)
+
+class TaskView(SingleTask):
+    '''
+       SingleTask over a backing row of task data.
+
+       Reads and writes go straight to the row: no dataclass fields are
+       copied. Rows must hold every label in TASK_LABELS.
+       'point' moves the view to another row, so a single view can be
+       reused over many rows.
+    '''
+
+    owner = _row_field('owner') #type: ignore
+    title = _row_field('title') #type: ignore
+    description = _row_field('description') #type: ignore
+    due_date = _row_field('due_date') #type: ignore
+    assigned_date = _row_field('assigned_date') #type: ignore
+    completed = _row_field('completed') #type: ignore
+
+    def __init__(self, row: MutableMapping[str, str],
+                 callback: EditCallback = lambda: None) -> None:
+        self._row = row
+        self.callback = callback
+
+    def point(self, row: MutableMapping[str, str]) -> 'TaskView':
+        '''
+           Moves view to 'row' and returns it.
+        '''
+
+        self._row = row
+        return self
+
+    def detach(self) -> None:
+        '''
+           Moves view to a copy of its row, so edits stop reaching it.
+        '''
+
+        self._row = dict(self._row)
+
+    @property
+    def row(self) -> MutableMapping[str, str]:
+        '''
+           Returns backing row.
+        '''
+        return self._row
+
+    @property
+    def data(self) -> DATA_TYPE:
+        '''
+           Returns copy of task data as a dictionary.
+        '''
+        return {label: self._row[label] for label in TASK_LABELS}
+
 def valid_filter(data: DATA_TYPE) -> DATA_TYPE:
     '''
        Crops out invalid attributes of data.
@@ -0,0 +1,287 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from src import config
+from src.file_handler import SQLiteFileHandler
+from src.task_master import local_model, task_stats
+from src.task_master.single_task import SingleTask, taskError, valid_filter, \
+    to_ordinal, today_ordinal
+from src.task_master.tasks import BatchResult, TaskEdit, TaskFilter, \
+    TASK_LABELS, STAT_LABELS
+
+__version__ = 0.1
+
+# Set up logger.
+logger = logging.getLogger(__name__)
+
+# Status of a task row as SQL, parameters from _status_params.
+# Due dates are compared as ordinals, strptime accepts them unpadded.
+_STATUS_SQL_ = 'CASE WHEN "completed" = ? THEN ? ' + \
+               'WHEN due_ordinal("due_date") < ? THEN ? ELSE ? END'
+
+# Row ids per query of a batch edit, below SQLite's parameter limit.
+_BATCH_SIZE_ = 500
+
+def _status_params() -> Tuple[Any, ...]:
+    '''
+       Parameters for _STATUS_SQL_ with today's date.
+    '''
+
+    return ('Yes', STAT_LABELS[0], today_ordinal(), STAT_LABELS[1], STAT_LABELS[2])
+
+def _due_ordinal(text: Optional[str]) -> Optional[int]:
+    '''
+       SQL function converting a due date to its ordinal, NULL if invalid.
+    '''
+
+    try:
+        return to_ordinal(text) #type: ignore
+    except (TypeError, ValueError):
+        return None
+
+class Model(local_model.Model):
+    '''
+       Task model kept in a SQLite table.
+
+       Owner lookups, status filters and edits run as SQL statements
+       on single rows instead of a list of all tasks.
+       Tasks are identified by their row id.
+    '''
+
+    def __init__(self,
+                 taskfile: str = config._TASK_FILE_,
+                 u_report_file: str = config._USER_REPORT_FILE_,
+                 t_report_file: str = config._TASK_REPORT_FILE_,
+                 database: str = config._SQLITE_DB_,
+                 by_owner: bool = False
+                 ) -> None:
+        '''
+           Opens the task table. Rows are read by query, so
+           'by_owner' changes nothing.
+        '''
+
+        # Create table handler and report file handlers.
+        self.taskfile = SQLiteFileHandler(taskfile, labels=TASK_LABELS,
+                                          database=database)
+        self.taskfile.index(TASK_LABELS[0], TASK_LABELS[5])
+        self.create_report_files(u_report_file, t_report_file)
+
+        self._db = self.taskfile.connection
+        self._db.create_function('due_ordinal', 1, _due_ordinal,
+                                 deterministic=True)
+        self._table = self.taskfile.table
+        self._columns = ', '.join(f'"{label}"' for label in TASK_LABELS)
+
+    def _get(self, task_id: int) -> SingleTask:
+        '''
+           Returns task with row id 'task_id'.
+        '''
+
+        row = self._db.execute(
+            f'SELECT {self._columns} FROM "{self._table}" WHERE id = ?',
+            (task_id,)).fetchone()
+        if row is None: raise IndexError("Invalid index")
+        return SingleTask(**dict(zip(TASK_LABELS, row)))
+
+    def _set(self, task_id: int, label: str, value: str) -> None:
+        '''
+           Sets a single field of task with row id 'task_id'.
+        '''
+
+        with self._db:
+            self._db.execute(
+                f'UPDATE "{self._table}" SET "{label}" = ? WHERE id = ?',
+                (value, task_id))
+
+    def get_all_tasks(self, user: Optional[str] = None) -> Tuple[List[str], List[int]]:
+        '''
+           Returns all the tasks associated to a user and their row ids.
+           If no user is specified, returns all tasks.
+        '''
+
+        query = f'SELECT id, {self._columns}, {_STATUS_SQL_} ' + \
+                f'FROM "{self._table}"'
+        params = _status_params()
+        if type(user) is str:
+            query += f' WHERE "{TASK_LABELS[0]}" = ?'
+            params += (user,)
+
+        out = []
+        index = []
+        for id, *values, status in self._db.execute(query + ' ORDER BY id', params):
+            task = SingleTask(**dict(zip(TASK_LABELS, values)))
+            out.append(task.summary+f"\tStatus: {status}")
+            index.append(id)
+        return out, index
+
+    def get_task(self, index: int) -> str:
+        '''
+           Returns full text description of a task.
+        '''
+
+        return str(self._get(index))
+
+# TASK EDITING AND READING
+
+    def add_task(self, data: List[str]) -> bool:
+        '''
+           Inserts a task ignoring invalid values.
+        '''
+
+        try:
+            task = SingleTask(**valid_filter( #type: ignore
+                {k:v for k,v in zip(TASK_LABELS, data)}))
+        except taskError as e:
+            logger.warning('Unable to insert task due to: %s', e.args[0])
+            return True
+        with self._db:
+            self._db.execute(
+                f'INSERT INTO "{self._table}" ({self._columns}) ' + \
+                f'VALUES ({", ".join("?"*len(TASK_LABELS))})',
+                tuple(task.data[label] for label in TASK_LABELS))
+        return True
+
+    def mark_as_completed(self, task_id: int) -> None:
+        '''
+           Marks a task as completed.
+        '''
+
+        self._set(task_id, TASK_LABELS[5], 'Yes')
+
+    def is_task_completed(self, task_id: int) -> bool:
+        '''
+           Check task completion.
+        '''
+
+        try:
+            return self._get(task_id).isCompleted
+        except IndexError:
+            pass
+        return False
+
+    def edit_user(self, task_id: int, owner: str) -> bool:
+        '''
+           Validates owner change as SingleTask does and updates row.
+        '''
+
+        try:
+            task = self._get(task_id)
+        except IndexError:
+            return False
+        task.edit_user(owner)
+        self._set(task_id, TASK_LABELS[0], task.owner)
+        return True
+
+    def edit_date(self, task_id: int, date: str) -> bool:
+        '''
+           Validates due date change as SingleTask does and updates row.
+        '''
+
+        try:
+            task = self._get(task_id)
+        except IndexError:
+            return False
+        task.edit_date(date)
+        self._set(task_id, TASK_LABELS[3], task.due_date)
+        return True
+
+    def edit_many(self, edit: TaskEdit,
+                  task_ids: Optional[List[int]] = None,
+                  where: Optional[TaskFilter] = None) -> BatchResult:
+        '''
+           Applies 'edit' to tasks with row ids in 'task_ids' (all if None)
+           that pass 'where'.
+
+           Edits that raised are reported by row id, the others are
+           written in a single transaction.
+        '''
+
+        query = f'SELECT id, {self._columns} FROM "{self._table}"'
+        rows: Dict[int, Tuple[str, ...]] = dict()
+        if task_ids is None:
+            rows.update((id, tuple(values))
+                        for id, *values in self._db.execute(query))
+        else:
+            task_ids = list(dict.fromkeys(task_ids))
+            for start in range(0, len(task_ids), _BATCH_SIZE_):
+                chunk = task_ids[start:start+_BATCH_SIZE_]
+                rows.update((id, tuple(values)) for id, *values in
+                            self._db.execute(query + ' WHERE id IN ' + \
+                                f'({", ".join("?"*len(chunk))})', chunk))
+        result = BatchResult()
+        updates = []
+        for id in rows if task_ids is None else task_ids:
+            if id not in rows:
+                result.errors[id] = 'Invalid index'
+                continue
+            task = SingleTask(**dict(zip(TASK_LABELS, rows[id])))
+            if where is not None and not where(task): continue
+            try:
+                edit(task)
+            except ValueError as e:
+                result.errors[id] = str(e)
+                continue
+            updates.append((*(task.data[label] for label in TASK_LABELS), id))
+            result.applied.append(id)
+
+        with self._db:
+            self._db.executemany(
+                f'UPDATE "{self._table}" SET ' + \
+                ', '.join(f'"{label}" = ?' for label in TASK_LABELS) + \
+                ' WHERE id = ?', updates)
+        return result
+
+    def save_tasks(self):
+         '''
+            Every edit is committed on its own: nothing left to save.
+         '''
+
+         self._db.commit()
+
+# REPORT GENERATING AND READING
+
+    def get_task_stats(self, userlist: List[str]) -> task_stats.TaskStats:
+        '''
+           Returns statistics calculator from counts grouped in SQL.
+        '''
+
+        counts = {(owner, status): number for owner, status, number in
+                  self._db.execute(
+                      f'SELECT "{TASK_LABELS[0]}", {_STATUS_SQL_} AS status, '
+                      f'COUNT(*) FROM "{self._table}" '
+                      f'GROUP BY "{TASK_LABELS[0]}", status',
+                      _status_params())}
+        return task_stats.TaskStats.from_counts(counts, userlist)
+
+
+def import_scsv(database: str = config._SQLITE_DB_, replace: bool = False) -> None:
+    '''
+       Copies task, user and admin SCSV files into the database.
+
+       New tables are seeded by their handler, existing ones are
+       imported again only if 'replace'.
+    '''
+
+    from src import user_manager
+
+    for filename, labels in [(config._TASK_FILE_, TASK_LABELS),
+                             (config._USER_FILE_, user_manager.USER_LABELS),
+                             (config._ADMIN_FILE_, [])]:
+        handler = SQLiteFileHandler(filename, labels=labels, database=database)
+        if replace: handler.import_scsv(replace=True)
+        handler.load()
+        print(f'{filename}: {len(handler.buffer)} rows in table {handler.table}')
+        handler.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description = 'Imports SCSV data files into the SQLite database')
+    parser.add_argument('--database', type=str, default=config._SQLITE_DB_,
+                        help='SQLite database path')
+    parser.add_argument('--replace', action='store_true',
+                        help='replace rows of existing tables')
+    args = parser.parse_args()
+
+    import_scsv(args.database, args.replace)
@@ -4,6 +4,9 @@ from src.task_master.tasks import DATA_TYPE, TASK_LABELS, STAT_LABELS
 
 __version__ = 0.1
 
+# Set up logger.
+logger = logging.getLogger(__name__)
+
 ########################################################
 #                   MEMBERS                            #
 ########################################################
@@ -20,6 +23,8 @@ __version__ = 0.1
 # 3. CLASS
 ##
 # TaskStats: Calculates statistics for given task data.
+#   Methods:
+#   - from_counts: Creates TaskStats from (user, status) counts.
 #   Properties:
 #   - users_stats: List of statistics per user.
 #   - tasks_stats: Aggregated statistics for all users.
@@ -84,8 +89,20 @@ class TaskStats():
         self._users: Optional[List[DATA_TYPE]] = None
         # Holds last response to task_statistics
         self._tasks: Optional[DATA_TYPE] = None
-        logging.info(f'Created {self.__class__} with ' + \
-                     f'{"no " if userlist is None else ""}userlist')
+        logger.info('Created %s with %suserlist',
+                    self.__class__, "no " if userlist is None else "")
+
+    @classmethod
+    def from_counts(cls,
+                    counts: _STATS_TYPE,
+                    userlist: Optional[List[str]] = None) -> 'TaskStats':
+        '''
+           Creates statistics from (user, status) counts instead of task data.
+        '''
+
+        task_stats = cls([], [], userlist or sorted({user for user, _ in counts}))
+        task_stats._stats = dict(counts)
+        return task_stats
 
     @property
     def users_stats(self):
@@ -102,7 +119,7 @@ class TaskStats():
            For each data entry counts (user, status) pairs.
         '''
 
-        logging.info(f'Running {self._get_status.__name__}')
+        logger.info('Running %s', self._get_status.__name__)
 
         data_counts = {}
         # For each data entry in buffer and related stats
@@ -118,7 +135,8 @@ class TaskStats():
                 key: data_counts.get(key,0)+1
             })
 
-        logging.info(f'{self._get_status.__name__} completed with {len(data_counts)} entries')
+        logger.info('%s completed with %s entries',
+                    self._get_status.__name__, len(data_counts))
         return data_counts
     
 
@@ -129,7 +147,7 @@ class TaskStats():
            Sets value for user_stats property
         '''
 
-        logging.info(f'Running {self.user_statistics.__name__}')
+        logger.info('Running %s', self.user_statistics.__name__)
 
         self._users = []
         # For each user in the list
@@ -160,7 +178,8 @@ class TaskStats():
             # Include current users' line
             self._users.append(line)
 
-        logging.info(f'{self.user_statistics.__name__} completed with {len(self._users)} entries')
+        logger.info('%s completed with %s entries',
+                    self.user_statistics.__name__, len(self._users))
 
 
     def task_statistics(self) -> None:
@@ -170,7 +189,7 @@ class TaskStats():
            Sets value for task_stats property.
         '''
         
-        logging.info(f'Running {self.task_statistics.__name__}')
+        logger.info('Running %s', self.task_statistics.__name__)
         
         output = {}
         output.update({_REPO_LABELS[2]:0})
@@ -201,7 +220,8 @@ class TaskStats():
 
         # Return with values as strings
         self._tasks = {k:f'{v}' if type(v) is int else f'{v:1.2f}' for k,v in output.items()}
-        logging.info(f'{self.task_statistics.__name__} completed with {len(self._tasks)} entries')
+        logger.info('%s completed with %s entries',
+                    self.task_statistics.__name__, len(self._tasks))
 
 
 ######################
@@ -1,6 +1,10 @@
 import logging
-from typing import Any, List, Optional, Tuple
-from src.task_master.single_task import SingleTask, taskError, valid_filter, DATA_TYPE, TASK_LABELS
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.task_master.single_task import SingleTask, TaskView, taskError, \
+    valid_filter, today_ordinal, DATA_TYPE, TASK_LABELS
 
 __version__ = 0.1
 
@@ -10,32 +14,151 @@ logger = logging.getLogger(__name__)
 # Labels for task status
 STAT_LABELS = ['Done', 'Overdue', 'Ongoing']
 
+@dataclass
+class BatchResult():
+    '''
+       Outcome of a batch edit.
+
+       Attributes:
+           applied: List[int] - indices of tasks changed
+           errors: Dict[int, str] - error message by index of tasks
+                   left unchanged
+    '''
+    applied: List[int] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        '''
+           Returns True if no edit failed.
+        '''
+        return not self.errors
+
+# Type of a batch edit and of a task filter.
+TaskEdit = Callable[[SingleTask], Any]
+TaskFilter = Callable[[SingleTask], bool]
+
+class StatusCounts():
+    '''
+       Live number of tasks per (owner, status).
+
+       Pending tasks are also counted per due date ordinal so that a
+       change of day only moves the counts of the dates crossed from
+       'Ongoing' to 'Overdue' (or back if the clock goes backwards).
+    '''
+
+    def __init__(self, today: Optional[int] = None) -> None:
+        # Number of tasks per (owner, status).
+        self._counts: Dict[Tuple[str, str], int] = dict()
+        # Number of pending tasks per due date ordinal and owner.
+        self._pending: Dict[int, Dict[str, int]] = dict()
+        # Day ordinal counts are classified against.
+        self._today: int = today_ordinal() if today is None else today
+
+    def _count(self, owner: str, status: str, number: int) -> None:
+        key = (owner, status)
+        value = self._counts.get(key, 0) + number
+        if value: self._counts[key] = value
+        else: self._counts.pop(key, None)
+
+    def add(self, owner: str, due: int, done: bool, number: int = 1) -> None:
+        '''
+           Counts 'number' tasks (negative to discount them).
+        '''
+
+        if done:
+            self._count(owner, STAT_LABELS[0], number)
+            return
+        owners = self._pending.setdefault(due, {})
+        owners[owner] = owners.get(owner, 0) + number
+        if not owners[owner]: owners.pop(owner)
+        if not owners: self._pending.pop(due)
+        self._count(owner,
+                    STAT_LABELS[1] if due < self._today else STAT_LABELS[2],
+                    number)
+
+    def discard(self, owner: str, due: int, done: bool) -> None:
+        '''
+           Discounts a task.
+        '''
+
+        self.add(owner, due, done, -1)
+
+    def roll(self, today: Optional[int] = None) -> None:
+        '''
+           Moves pending counts to the status they have on 'today'.
+        '''
+
+        today = today_ordinal() if today is None else today
+        if today == self._today: return
+        low, high = sorted((self._today, today))
+        # Forward: ongoing become overdue. Backwards: the other way round.
+        old, new = (STAT_LABELS[2], STAT_LABELS[1]) if today > self._today \
+            else (STAT_LABELS[1], STAT_LABELS[2])
+        for due, owners in self._pending.items():
+            if low <= due < high:
+                for owner, number in owners.items():
+                    self._count(owner, old, -number)
+                    self._count(owner, new, number)
+        self._today = today
+
+    def counts(self, today: Optional[int] = None) -> Dict[Tuple[str, str], int]:
+        '''
+           Returns copy of (owner, status) counts on 'today'.
+        '''
+
+        self.roll(today)
+        return dict(self._counts)
+
 class Tasks():
     '''
        Class manages list of tasks.
 
        Maintains a list of tasks as DATA_TYPE.
-       Creates a SingleTask object for each entry manipulation.
-       After editing the SingleTask object, corresponding list item is updated.
+       Creates a TaskView over the entry for each entry manipulation.
+       After editing through the view, indices and status are updated.
        Changes are flushed when other task is accessed or flush() is called.
+       Scans reuse a single view and move no cursor.
 
        Attributes:
        - _buffer: List of tasks as DATA_TYPE.
+       - _owners: Sorted indices of tasks per owner.
+       - _due: Due date ordinal of each task.
+       - _done: Completion flag of each task.
+       - _counts: Live number of tasks per (owner, status).
+       - _dirty: Indices of tasks changed or added since last clear_dirty().
+       - _removed: Marker for tasks removed since last clear_dirty().
+       - _generation: Count of changes to the tasks.
        - _cursor: Cursor to current task.
        - _changed: Marker to check if task was changed.
        - _task: Pointer to task.
+       - _task_owner: Owner of task when indexed.
     '''
 
     def __init__(self, *args, **kwargs):
         super(Tasks, self).__init__(*args, **kwargs)
         # List of tasks as DATA_TYPE.
         self._buffer: List[DATA_TYPE] = list()
+        # Sorted indices of tasks per owner.
+        self._owners: Dict[str, List[int]] = dict()
+        # Due date ordinals and completion flags for status.
+        self._due = array('i')
+        self._done = bytearray()
+        # Live number of tasks per (owner, status).
+        self._counts = StatusCounts()
+        # Indices of tasks changed or added and removals since last save.
+        self._dirty: Set[int] = set()
+        self._removed: bool = False
+        # Count of changes to the tasks.
+        self._generation: int = 0
         # Cursor to current task.
         self._cursor: int = 0
         # Marker to check if task was changed.
         self._changed: bool = False
         # Pointer to task.
-        self._task: Optional[SingleTask] = None
+        self._task: Optional[TaskView] = None
+        # Owner of task when indexed, views edit rows in place.
+        self._task_owner: str = ''
 
 
 ##############################################
@@ -74,14 +197,22 @@ class Tasks():
         for data in tasks_data:
             try:
                 # Create task object and add to buffer
-                self._buffer.append(SingleTask(**valid_filter(data)).data) #type: ignore
+                task = SingleTask(**valid_filter(data)) #type: ignore
+                self._buffer.append(task.data)
+                # Keep status columns of new task.
+                self._due.append(task.due_ordinal)
+                self._done.append(task.isCompleted)
+                self._counts.add(task.owner, task.due_ordinal, task.isCompleted)
+                # Index new task under its owner.
+                self._owners.setdefault(
+                    self._buffer[-1][TASK_LABELS[0]], []).append(len(self) - 1)
+                self._dirty.add(len(self) - 1)
+                self._generation += 1
                 
             except taskError as e:
                 # Logs warning if task creation fails
-                logger.warning(f'''Unable to insert task due to:
-                              {e.args[0]}
-                              Data dump:
-                              {data}''')
+                logger.warning('Unable to insert task due to:\n%s\nData dump:\n%s',
+                               e.args[0], data)
 
     def is_valid_index(self, index: int) -> bool:
         '''
@@ -97,12 +228,47 @@ class Tasks():
 
         # Removes task in valid index.
         if self.is_valid_index(index):
+            # Index pending changes of working task first.
+            self._update()
             # If removing current working task, flush task.
             if self._cursor == index: self.flush()
             # If removing from lower index, adjust cursor.
             if self._cursor > index: self._cursor -= 1
-            # Remove task from list.
+            # Discount and remove task from list.
+            owner = self._buffer[index][TASK_LABELS[0]]
+            self._counts.discard(owner, self._due[index], bool(self._done[index]))
             self._buffer.pop(index)
+            self._due.pop(index)
+            self._done.pop(index)
+            # Indices after 'index' shifted.
+            self._unindex(index, owner)
+            self._dirty = {i - (i > index) for i in self._dirty if i != index}
+            self._removed = True
+            self._generation += 1
+
+    def _unindex(self, index: int, owner: str) -> None:
+        '''
+           Drops removed task in 'index' from 'owner' index and shifts
+           later indices of every owner down by one.
+        '''
+
+        indices = self._owners[owner]
+        indices.pop(bisect_left(indices, index))
+        if not indices: self._owners.pop(owner)
+        for indices in self._owners.values():
+            # Only indices after the removed one move.
+            for i in range(bisect_left(indices, index), len(indices)):
+                indices[i] -= 1
+
+    def _move_owner(self, index: int, old: str, new: str) -> None:
+        '''
+           Moves task in 'index' from 'old' owner index to 'new'.
+        '''
+
+        indices = self._owners[old]
+        indices.pop(bisect_left(indices, index))
+        if not indices: self._owners.pop(old)
+        insort(self._owners.setdefault(new, []), index)
         
 ##############################################
 #                                            #
@@ -126,9 +292,28 @@ class Tasks():
         if self._task is None or not self._changed: return
 
         # Updates data in list and resets flag.
-        self._buffer[self._cursor] = self._task.data
+        self._store(self._cursor, self._task, self._task_owner)
+        self._task_owner = self._task.owner
         self._changed = False
 
+    def _store(self, index: int, task: TaskView, old_owner: str) -> None:
+        '''
+           Stores row of 'task' in 'index', which was owned by 'old_owner'.
+
+           Keeps owner index, status columns and counts current.
+        '''
+
+        if task.owner != old_owner:
+            self._move_owner(index, old_owner, task.owner)
+        self._counts.discard(old_owner, self._due[index],
+                             bool(self._done[index]))
+        self._counts.add(task.owner, task.due_ordinal, task.isCompleted)
+        self._buffer[index] = task.row
+        self._due[index] = task.due_ordinal
+        self._done[index] = task.isCompleted
+        self._dirty.add(index)
+        self._generation += 1
+
     def flush(self):
         '''
            Updates data in buffer[cursor] from task object and release it.
@@ -140,8 +325,9 @@ class Tasks():
         
         # Update from working task.
         self._update()
-        # Remove binded method to stop rougue calls.
+        # Remove binded method and row to stop rougue calls.
         self._task.bind_edit_flag(lambda: None)
+        self._task.detach()
         # Release task object from tasks.
         self._task = None
 
@@ -171,16 +357,16 @@ class Tasks():
 
     def __getitem__(self, index: int) -> SingleTask:
         '''
-           Returns SingleTask object associated with task in 'index'.
+           Returns task view over the task in 'index'.
         '''
         
         # Sets cursor to index position and tests for task change.
         self._change_cursor(index)
         # If same index, returns existing object otherwise create new.
         if self._task is None:
-            # If task changed create task object and bind to flag method.
-            self._task = SingleTask(**(self._buffer[self._cursor]))#type:ignore
-            self._task.bind_edit_flag(self._edit_flag)
+            # If task changed create view bound to flag method.
+            self._task = TaskView(self._buffer[self._cursor], self._edit_flag)
+            self._task_owner = self._task.owner
 
         return self._task
     
@@ -197,35 +383,140 @@ class Tasks():
     def list_tasks(self, owner:Optional[str] = None) -> Tuple[List[str],List[int]]:
         '''
            Returns string of all tasks in list and their indices.
+
+           Only tasks in the owner index are visited if 'owner' is a string.
         '''
 
         self._update()
         out = []
         index = []
-        for i in range(len(self)):
-            task = self[i]
-            if task.is_owned_by(owner):
-                out.append(task.summary+f"\tStatus: {self._stats(i)}")
-                index.append(i)
+        indices = list(self._owners.get(owner, [])) \
+            if type(owner) is str else range(len(self))
+        today = today_ordinal()
+        # One view moved over the rows, cursor stays put.
+        view = TaskView({})
+        for i in indices:
+            view.point(self._buffer[i])
+            out.append(view.summary+f"\tStatus: {self._stats(i, today)}")
+            index.append(i)
         return out, index
 
+##############################################
+#                                            #
+#             BATCH EDITING                  #
+#                                            #
+##############################################
+
+    def edit_many(self, edit: TaskEdit,
+                  indices: Optional[Iterable[int]] = None,
+                  where: Optional[TaskFilter] = None) -> BatchResult:
+        '''
+           Applies 'edit' to tasks in 'indices' (all if None) that pass
+           'where', without moving the cursor.
+
+           Every edit runs first on a copy of its row. Rows whose edit
+           raised are left unchanged and reported by index, the others
+           are stored in one pass and marked dirty.
+        '''
+
+        # Working task is released, its row may be replaced.
+        self.flush()
+        result = BatchResult()
+        view = TaskView({})
+        edited: List[Tuple[int, DATA_TYPE]] = []
+        for i in dict.fromkeys(range(len(self)) if indices is None else indices):
+            if not self.is_valid_index(i):
+                result.errors[i] = 'Invalid index'
+                continue
+            row = self._buffer[i]
+            if where is not None and not where(view.point(row)): continue
+            try:
+                edit(view.point(dict(row)))
+            except ValueError as e:
+                result.errors[i] = str(e)
+                continue
+            edited.append((i, view.row))
+
+        for i, row in edited:
+            self._store(i, view.point(row), self._buffer[i][TASK_LABELS[0]])
+            result.applied.append(i)
+        logger.info('Batch edit changed %s tasks, %s failed',
+                    len(result.applied), len(result.errors))
+        return result
+
+    @property
+    def dirty(self) -> List[int]:
+        '''
+           Sorted indices of tasks changed or added since last clear_dirty().
+        '''
+
+        self._update()
+        return sorted(self._dirty)
+
+    @property
+    def removed(self) -> bool:
+        '''
+           Returns True if tasks were removed since last clear_dirty().
+        '''
+
+        return self._removed
+
+    def clear_dirty(self) -> None:
+        self._dirty.clear()
+        self._removed = False
+
+    @property
+    def generation(self) -> int:
+        '''
+           Count of changes to the tasks, including working task's.
+        '''
+
+        self._update()
+        return self._generation
+
+    def rows(self, indices: Iterable[int]) -> Iterator[DATA_TYPE]:
+        '''
+           Yields stored rows of tasks in 'indices' without copying them.
+        '''
+
+        self._update()
+        return (self._buffer[i] for i in indices)
+
 ##############################################
 #                                            #
 #             TASK LIST STATUS               #
 #                                            #
 ##############################################
 
-    def _stats(self, i: int) -> str:
+    def _stats(self, i: int, today: Optional[int] = None) -> str:
         '''
            Returns the status code of task in 'index'.
+
+           Expects status columns updated from working task.
         '''
 
-        task = self[i]
-        if task.isCompleted:
+        if self._done[i]:
             return STAT_LABELS[0]
-        if task.isOverdue:
+        if self._due[i] < (today_ordinal() if today is None else today):
             return STAT_LABELS[1]
         return STAT_LABELS[2]
+
+    def classify(self, indices: Optional[Iterable[int]] = None,
+                 today: Optional[int] = None) -> List[str]:
+        '''
+           Returns the status code of tasks in 'indices' (all if None).
+
+           Compares due date ordinals against a single 'today' ordinal.
+        '''
+
+        self._update()
+        today = today_ordinal() if today is None else today
+        done, due = self._done, self._due
+        done_label, overdue_label, ongoing_label = STAT_LABELS
+        if indices is None: indices = range(len(self))
+        return [done_label if done[i] else
+                overdue_label if due[i] < today else
+                ongoing_label for i in indices]
     
     def get_stats(self) -> List[str]:
         '''
@@ -233,4 +524,12 @@ class Tasks():
         '''
 
         self.flush()
-        return [self._stats(i) for i in range(len(self))]
\ No newline at end of file
+        return self.classify()
+
+    def status_counts(self, today: Optional[int] = None) -> Dict[Tuple[str, str], int]:
+        '''
+           Returns number of tasks per (owner, status) without a pass over tasks.
+        '''
+
+        self._update()
+        return self._counts.counts(today)
\ No newline at end of file
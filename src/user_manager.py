@@ -1,9 +1,18 @@
+import csv
+import hashlib
+import hmac
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from src import plugin
 from src import file_handler, config
-from typing import Iterator, Optional, Type
+from typing import (Callable, Dict, FrozenSet, Iterable, Iterator, List,
+                    Optional, Tuple, Type)
 
-default_hasher = plugin.get_class(config.PASSWORD_HASHER)
 data_file = plugin.get_class(config.FILE_HANDLER)
 
 __version__ = 0.1
@@ -13,48 +22,167 @@ logger = logging.getLogger(__name__)
 
 USER_LABELS = ['username', 'password']
 
+# Called with users hashed so far and users to hash.
+ProgressCallback = Callable[[int, int], None]
+
+def hasher():
+    '''
+       Returns config.PASSWORD_HASHER, imported on first use.
+
+       Kept as module attribute 'default_hasher' once loaded.
+    '''
+
+    if 'default_hasher' not in globals():
+        globals()['default_hasher'] = plugin.get_class(config.PASSWORD_HASHER)
+    return globals()['default_hasher']
+
+def __getattr__(name: str):
+    # Loads 'default_hasher' when first read from outside the module.
+    if name == 'default_hasher': return hasher()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 class UserError(ValueError):
     '''
        Error raised when user operation is invalid.
     '''
     ...
 
+def hash_password(pwd: str) -> str:
+    '''
+       Hashes with default hasher, picklable for process pools.
+    '''
+
+    return hasher().hash(pwd)
+
+@dataclass
+class ImportResult():
+    '''
+       Outcome of a bulk user import.
+
+       - added: usernames written, in input order,
+       - skipped: reason by username not written,
+       - hashed: passwords hashed,
+       - hash_seconds and write_seconds: time spent in each phase.
+    '''
+
+    added: List[str] = field(default_factory=list)
+    skipped: Dict[str, str] = field(default_factory=dict)
+    hashed: int = 0
+    hash_seconds: float = 0.
+    write_seconds: float = 0.
+
+    @property
+    def rate(self) -> float:
+        '''
+           Users hashed per second.
+        '''
+
+        return self.hashed / self.hash_seconds if self.hash_seconds else 0.
+
+class VerifyCache():
+    '''
+       Bounded cache of recent successful password verifications.
+
+       Entries are keyed on a digest of user, stored hash and password
+       salted with a per process random key, so neither passwords nor
+       reusable digests are kept. Entries expire after 'ttl' seconds and
+       the least recently used entry is evicted beyond 'size' entries.
+       A size of 0 disables the cache. Safe to share between threads,
+       hashes are verified without holding its lock.
+    '''
+
+    def __init__(self, size: int = config.VERIFY_CACHE_SIZE,
+                 ttl: float = config.VERIFY_CACHE_TTL) -> None:
+        self._size = size
+        self._ttl = ttl
+        self._salt = os.urandom(32)
+        # Expiry time by digest, least recently used first.
+        self._entries: 'OrderedDict[bytes, float]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, user: str, stored: str, pwd: str) -> bytes:
+        message = '\0'.join([user, stored, pwd]).encode()
+        return hmac.new(self._salt, message, hashlib.sha256).digest()
+
+    def verify(self, user: str, stored: str, pwd: str) -> bool:
+        '''
+           Verifies 'pwd' against 'stored' hash, skipping recent successes.
+        '''
+
+        if not self._size:
+            return hasher().verify(pwd, stored)
+        key = self._key(user, stored, pwd)
+        now = time.monotonic()
+        with self._lock:
+            expiry = self._entries.get(key)
+            if expiry is not None:
+                if expiry > now:
+                    self._entries.move_to_end(key)
+                    return True
+                del self._entries[key]
+        if not hasher().verify(pwd, stored): return False
+        with self._lock:
+            self._entries[key] = now + self._ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 class UserManager():
     '''
        Class for managing users.
 
        Deals with login and keeps hashed passwords.
-       Defaults to SCSVFileHandler with default file path.
+       Defaults to config.FILE_HANDLER with default file path.
+       Passwords by username are rebuilt only when the file handler's
+       generation changes.
     '''    
 
     def __init__(self,
                  filename: str = config._USER_FILE_,
-                 file_handler: Type[file_handler.FileHandler] \
-                                = file_handler.SCSVFileHandler,
+                 file_handler: Type[file_handler.FileHandler] = data_file,
+                 verify_cache: Optional[VerifyCache] = None,
                  *args, **kwargs):
         super(UserManager, self).__init__(*args, **kwargs)
         self._file = file_handler(filename, labels=USER_LABELS)
         self._user: Optional[str] = None
+        # Passwords by username and handler generation they were read at.
+        self._users_pwd: Dict[str, str] = dict()
+        self._generation: Optional[int] = None
+        # Admin usernames and admin handler generation they were read at.
+        self._admins: FrozenSet[str] = frozenset()
+        self._admins_generation: Optional[int] = None
+        self._verify_cache = verify_cache or VerifyCache()
 
     @property
     def _get_users_pwd(self) -> file_handler.DATA_TYPE:
         '''
            Reads 'username' and 'password' [USER_LABELS] from file handler
            and returns as a dictionary.
+
+           Dictionary is rebuilt only if the handler read or wrote the file.
         '''
 
-        logger.info(f'Reading {USER_LABELS[0]} and'+\
-                     f'{USER_LABELS[1]} from {self._file}')
         self._file.load()
-        return {data[USER_LABELS[0]]:data[USER_LABELS[1]]
-                for data in self._file.buffer}
+        generation = getattr(self._file, 'generation', None)
+        if generation is None or generation != self._generation:
+            logger.info('Reading %s and %s from %s',
+                        USER_LABELS[0], USER_LABELS[1], self._file)
+            self._users_pwd = {data[USER_LABELS[0]]:data[USER_LABELS[1]]
+                               for data in self._file.buffer}
+            self._generation = generation
+        return self._users_pwd
     
     def user_exists(self, user:str, *args, **kwargs) -> bool:
         '''
            Checks if username already exists
         '''
 
-        return user in self._get_users_pwd.keys()
+        return user in self._get_users_pwd
     
     def add_user(self, user:str, pwd:str) -> bool:
         '''
@@ -65,29 +193,167 @@ class UserManager():
         if user == '' or pwd == '': return False
         if self.user_exists(user): return False
                             #raise UserError('User already exists.')
-        self._file.buffer.append({
-            USER_LABELS[0]:user,
-            USER_LABELS[1]:default_hasher.hash(pwd)})
-        self._file.dump()
+        return self.add_hashed(user, hasher().hash(pwd))
+
+    def add_hashed(self, user:str, hashed:str) -> bool:
+        '''
+           Writes user with an already hashed password.
+
+           Returns False if the user exists, added meanwhile by
+           another session.
+        '''
+
+        # Users added by other sessions are read again with the file locked.
+        with self._file.locked() \
+             if isinstance(self._file, file_handler.FileHandler) \
+             else nullcontext():
+            if self.user_exists(user): return False
+            self._file.buffer.append({
+                USER_LABELS[0]:user,
+                USER_LABELS[1]:hashed})
+            self._file.dump()
+        # Only this user changed since last read.
+        if self._generation is not None:
+            self._users_pwd[user] = hashed
+            self._generation = getattr(self._file, 'generation', None)
         return True
     
+    def _hash_all(self, passwords: List[str], workers: int,
+                  progress: Optional[ProgressCallback]) -> List[str]:
+        '''
+           Hashes passwords in order over 'workers' processes.
+        '''
+
+        if workers == 1 or len(passwords) < 2:
+            hashes = list()
+            for pwd in passwords:
+                hashes.append(hash_password(pwd))
+                if progress: progress(len(hashes), len(passwords))
+            return hashes
+        from concurrent.futures import ProcessPoolExecutor
+        hashes = list()
+        with ProcessPoolExecutor(workers or None) as pool:
+            for hashed in pool.map(hash_password, passwords,
+                                   chunksize=config.HASH_CHUNK_SIZE):
+                hashes.append(hashed)
+                if progress: progress(len(hashes), len(passwords))
+        return hashes
+
+    def add_users(self, users: Iterable[Tuple[str, str]],
+                  workers: int = config.HASH_WORKERS,
+                  progress: Optional[ProgressCallback] = None) -> ImportResult:
+        '''
+           Adds many users writing the user file once.
+
+           Users that are empty, hold separators, repeat or already
+           exist are skipped. Passwords are hashed over 'workers'
+           processes, one per core if 0, calling 'progress' as they
+           complete. Users added meanwhile by other sessions are
+           checked again with the file locked before writing.
+        '''
+
+        result = ImportResult()
+        existing = self._get_users_pwd
+        names: List[str] = list()
+        passwords: List[str] = list()
+        for user, pwd in users:
+            if user == '' or pwd == '':
+                result.skipped[user] = 'empty'
+            elif any(c in user for c in ';\n\r'):
+                result.skipped[user] = 'invalid'
+            elif user in existing:
+                result.skipped[user] = 'exists'
+            elif user in result.skipped or user in names:
+                result.skipped[user] = 'duplicate'
+            else:
+                names.append(user)
+                passwords.append(pwd)
+
+        start = time.perf_counter()
+        hashes = self._hash_all(passwords, workers, progress)
+        result.hashed = len(hashes)
+        result.hash_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with self._file.locked() \
+             if isinstance(self._file, file_handler.FileHandler) \
+             else nullcontext():
+            existing = self._get_users_pwd
+            added: Dict[str, str] = dict()
+            for user, hashed in zip(names, hashes):
+                if user in existing:
+                    result.skipped[user] = 'exists'
+                    continue
+                self._file.buffer.append({
+                    USER_LABELS[0]:user,
+                    USER_LABELS[1]:hashed})
+                added[user] = hashed
+            if added: self._file.dump()
+        result.added = list(added)
+        result.write_seconds = time.perf_counter() - start
+
+        # Only added users changed since last read.
+        if self._generation is not None:
+            self._users_pwd.update(added)
+            self._generation = getattr(self._file, 'generation', None)
+        logger.info('Imported %s users, skipped %s, %.1f hashes/s',
+                    len(result.added), len(result.skipped), result.rate)
+        return result
+
+    def import_csv(self, path: str, **kwargs) -> ImportResult:
+        '''
+           Adds users from a CSV file of username and password rows.
+
+           A first row equal to the labels is a header. Keyword arguments
+           go to add_users.
+        '''
+
+        with open(path, newline='') as f:
+            rows = [row for row in csv.reader(f) if row]
+        if rows and [value.strip() for value in rows[0]] == USER_LABELS:
+            rows = rows[1:]
+        return self.add_users(((row[0].strip(), row[1] if len(row) > 1 else '')
+                               for row in rows), **kwargs)
+
     def log_in(self, user:str, pwd:str) -> bool:
         '''
            Logs in if matching username and password.
         '''
         if self._user is not None:
-            logging.info(f'Logged out of {self._user}')
+            logging.info('Logged out of %s', self._user)
             self._user = None
         
-        try:
-            if  default_hasher.verify(pwd,
-                                  self._get_users_pwd.get(user, '')):
-                self._user = user
-                return True
-        except:
-            pass
-        
+        if self.verify(user, pwd):
+            self._user = user
+            return True
         return False
+
+    def verify(self, user:str, pwd:str) -> bool:
+        '''
+           Checks password of a user without logging in.
+        '''
+
+        return self.check_password(user, self.stored_hash(user), pwd)
+
+    def stored_hash(self, user:str) -> str:
+        '''
+           Returns hashed password of a user, empty if unknown.
+        '''
+
+        return self._get_users_pwd.get(user, '')
+
+    def check_password(self, user:str, stored:str, pwd:str) -> bool:
+        '''
+           Checks password against 'stored' hash of a user.
+
+           Reads no file, so it can run away from the user file's thread.
+        '''
+
+        try:
+            return self._verify_cache.verify(user, stored, pwd)
+        # Hashers reject unknown users' empty and malformed hashes.
+        except (ValueError, TypeError):
+            return False
     
     @property
     def user_logged(self) -> Optional[str]:
@@ -103,11 +369,27 @@ class UserManager():
            Returns True if logged user is part of 'admin' list.
         '''
 
+        return self._user in self.admins
+
+    @property
+    def admins(self) -> FrozenSet[str]:
+        '''
+           Set of admin usernames, rebuilt only if '.ADMIN' file changed.
+        '''
+
         # Get list of admin users from '.ADMIN' file.
         admin_list = data_file(config._ADMIN_FILE_)
         admin_list.load()
-        # Admin file has on labels, every admin name is a value.
-        return any([self._user in admin_dic.values() for admin_dic in admin_list.buffer])
+        generation = getattr(admin_list, 'generation', None)
+        if generation is None or generation != self._admins_generation:
+            # Admin file has no labels, every admin name is a value
+            # whether separated by newlines or semicolons.
+            self._admins = frozenset(name.strip()
+                                     for admin_dic in admin_list.buffer
+                                     for name in admin_dic.values()
+                                     if name.strip())
+            self._admins_generation = generation
+        return self._admins
     
     @property
     def users(self) -> Iterator[str]:
@@ -122,8 +404,28 @@ class UserManager():
     
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description = 'Example of {} module'.format(__file__.split("/")[-1]))
+    parser.add_argument('--import', dest='csv', type=str,
+                        help='CSV file of username,password rows to add')
+    parser.add_argument('--workers', type=int, default=config.HASH_WORKERS,
+                        help='hashing processes, 0 for one per core')
+    args = parser.parse_args()
 
+    config.setup_logging()
     manager = UserManager()
-    #manager.add_user('tester', 'testing')
-    manager.log_in('admin', 'admin')
-    print(manager.user_logged)
\ No newline at end of file
+    if args.csv is None:
+        #manager.add_user('tester', 'testing')
+        manager.log_in('admin', 'admin')
+        print(manager.user_logged)
+    else:
+        def progress(done: int, total: int) -> None:
+            print(f'Hashed {done}/{total}', end='\r')
+        result = manager.import_csv(args.csv, workers=args.workers,
+                                    progress=progress)
+        print(f'\nAdded {len(result.added)} users, skipped {len(result.skipped)}')
+        for user, reason in result.skipped.items(): print(f'  {user}: {reason}')
+        print(f'Hashing: {result.hash_seconds:.2f} s ({result.rate:.1f} users/s), ' + \
+              f'writing: {result.write_seconds:.3f} s')
\ No newline at end of file
@@ -63,18 +63,18 @@ class View(tk.Tk):
         self.cancel_button = ttk.Button(self.frame, text="Cancel", command=self.destroy)
         self.cancel_button.pack()
 
-        logger.info(f'{self.__class__} UI created')
+        logger.info('%s UI created', self.__class__)
 
     def bind_provider(self, call: protocols.ControllerUserService) -> None:
         '''
            Binds the contrller service
         '''
 
-        logger.info(f'{self.__class__} binded to method {call.__name__}')
+        logger.info('%s binded to method %s', self.__class__, call.__name__)
         self.controller_service = call
 
     def noLogin(self, *args, **kwargs) -> None:
-        logger.info(f'{self.__class__} tried to login but no method binded')
+        logger.info('%s tried to login but no method binded', self.__class__)
         messagebox.showerror(message="No method binded")
 
     def run(self, key=None):
@@ -98,12 +98,12 @@ class View(tk.Tk):
 
         if response:
             # Login successful
-            logger.info(f'{self.title} successful for user {username}')
+            logger.info('%s successful for user %s', self.title, username)
             messagebox.showinfo(message=self.success_msg)
             self.destroy() 
         else:
             # Login failed
-            logger.info(f'{self.title} failed for user {username}')
+            logger.info('%s failed for user %s', self.title, username)
             messagebox.showerror(message=self.failure_msg) 
 
 
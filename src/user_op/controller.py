@@ -1,6 +1,7 @@
 import logging
 from typing import Optional, Type
 from src import protocols
+from src.instrument import instrumented
 
 __version__ = 0.1
 
@@ -51,7 +52,7 @@ class Controller():
             Binds to the UI class.
         '''
 
-        logger.info(f'{self.__class__} binded to class {view.__name__}')
+        logger.info('%s binded to class %s', self.__class__, view.__name__)
         self.view = view
     
     def bind_provider(self, user: protocols.user_protocol) -> None:
@@ -59,10 +60,11 @@ class Controller():
             Binds to the provider.
         '''
 
-        logger.info(f'{self.__class__} binded to class {user.__class__}')
+        logger.info('%s binded to class %s', self.__class__, user.__class__)
         self.user = user
 
     # Controller in the middle
+    @instrumented()
     def controller_service(self, user: str, password: str,
                            repeat_pass: str = '') -> bool:
         '''
@@ -100,12 +102,13 @@ class Controller():
     #                                        #
     ##########################################
 
+    @instrumented()
     def run(self):
         '''
             Runs the login.
         '''
         
-        logger.info(f'{self.__class__} running.')
+        logger.info('%s running.', self.__class__)
 
         # Raise error if UI not binded.
         if self.view is None:
@@ -125,7 +128,7 @@ class Controller():
         
         # Reset id at the end for next state.
         self.id = -1
-        logger.info(f'{self.__class__} closing.')
+        logger.info('%s closing.', self.__class__)
 
 if  __name__ == "__main__":
     print(f'{__file__}: This module cannot be run directly.')
\ No newline at end of file
@@ -27,11 +27,11 @@ class View():
         '''
            Guarantees only one instance of the class is created
         '''
-        logger.info(f'{cls.__name__}.__new__ called')
+        logger.info('%s.__new__ called', cls.__name__)
         if not hasattr(cls, 'instance'):
             cls.instance = super(View, cls).__new__(
                 cls, *args, **kwargs)
-            logger.info(f'{cls.__name__} created new instance')
+            logger.info('%s created new instance', cls.__name__)
         return cls.instance
         
     def __init__(self,
@@ -64,7 +64,7 @@ class View():
            Binds the function to the method
         '''
         
-        logger.info(f'{self.__class__} binded to login method {call.__name__}')
+        logger.info('%s binded to login method %s', self.__class__, call.__name__)
         self.controller_service = call
         
     def noLogin(self, *args, **kwargs) -> bool:
@@ -92,11 +92,11 @@ class View():
                 break
 
             if response:
-                logger.info(f'{self.prompt} successful for user {username}')
+                logger.info('%s successful for user %s', self.prompt, username)
                 print(self.success_msg)
                 break
             
-            logger.info(f'{self.prompt} failed for user {username}')
+            logger.info('%s failed for user %s', self.prompt, username)
             input(self.failure_msg)
             if self.operation == 'register': break
 
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import unittest
+import logging
+from unittest import mock
+from src import async_model
+from src.fake import FakeModel
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingModel(FakeModel):
+    '''
+       Model whose reads wait for 'release' and are counted.
+    '''
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.calls = 0
+        self.tasks = [['admin', 'T1']]
+
+    def get_all_tasks(self, user=None):
+        self.calls += 1
+        self.release.wait()
+        return [str(task) for task in self.tasks], list(range(len(self.tasks)))
+
+    def add_task(self, data):
+        self.tasks.append(data)
+        return True
+
+
+class TestAsyncModel(unittest.TestCase):
+
+    def test_reads_coalesced(self):
+        '''
+           Test concurrent identical reads share one call.
+        '''
+        logging.info('test_reads_coalesced')
+
+        model = BlockingModel()
+        facade = async_model.AsyncModel(model)
+
+        async def run():
+            reads = [asyncio.ensure_future(facade.get_all_tasks('admin'))
+                     for _ in range(5)]
+            other = asyncio.ensure_future(facade.get_all_tasks('tester'))
+            await asyncio.sleep(.05)
+            model.release.set()
+            return await asyncio.gather(*reads), await other
+
+        results, _ = asyncio.run(run())
+        facade.close()
+        self.assertEqual(model.calls, 2)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_write_starts_new_read(self):
+        '''
+           Test reads after a write do not join a read started before it.
+        '''
+        logging.info('test_write_starts_new_read')
+
+        model = BlockingModel()
+        facade = async_model.AsyncModel(model)
+
+        async def run():
+            before = asyncio.ensure_future(facade.get_all_tasks())
+            await asyncio.sleep(0)
+            write = asyncio.ensure_future(facade.add_task(['tester', 'T2']))
+            after = asyncio.ensure_future(facade.get_all_tasks())
+            model.release.set()
+            return await before, await write, await after
+
+        before, added, after = asyncio.run(run())
+        facade.close()
+        self.assertTrue(added)
+        self.assertEqual(len(before[1]), 1)
+        self.assertEqual(len(after[1]), 2)
+
+
+class TestAsyncUserManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # Names of the threads running each user manager call.
+        self.threads = dict()
+        self.users = mock.Mock(admins=frozenset(['admin']))
+        self.users.stored_hash.side_effect = self.on('stored_hash', lambda user: 'stored')
+        self.users.check_password.side_effect = self.on(
+            'check_password', lambda user, stored, pwd: pwd == 'pwd')
+        self.users.user_exists.side_effect = self.on('user_exists',
+                                                     lambda user: user == 'admin')
+        self.users.add_hashed.side_effect = self.on('add_hashed', lambda user, hashed: True)
+        self.facade = async_model.AsyncUserManager(self.users)
+        return super().setUp()
+
+    def on(self, name, call):
+        '''
+           Wraps 'call' recording names of the threads running it.
+        '''
+
+        def recorded(*args):
+            self.threads.setdefault(name, set()).add(
+                threading.current_thread().name.split('_')[0])
+            return call(*args)
+        return recorded
+
+    def tearDown(self) -> None:
+        self.facade.close()
+        return super().tearDown()
+
+    def test_log_in(self):
+        '''
+           Test login verifies on the KDF executor and keeps the user.
+        '''
+        logging.info('test_log_in')
+
+        async def run():
+            failed = await self.facade.log_in('admin', 'bad')
+            logged = await self.facade.log_in('admin', 'pwd')
+            return failed, logged, await self.facade.is_admin()
+
+        failed, logged, admin = asyncio.run(run())
+        self.assertFalse(failed)
+        self.assertTrue(logged)
+        self.assertTrue(admin)
+        self.assertEqual(self.facade.user_logged, 'admin')
+        self.users.log_in.assert_not_called()
+        self.assertEqual(self.threads['stored_hash'], {'users'})
+        self.assertEqual(self.threads['check_password'], {'kdf'})
+
+    def test_add_user(self):
+        '''
+           Test only hashing runs on the KDF executor, the user file
+           is read and written on the manager's thread.
+        '''
+        logging.info('test_add_user')
+
+        hashed = self.on('hash', lambda pwd: 'hashed ' + pwd)
+        with mock.patch.object(async_model, 'hash_password', hashed):
+            async def run():
+                return (await self.facade.add_user('admin', 'pwd'),
+                        await self.facade.add_user('tester', 'pwd'))
+            exists, added = asyncio.run(run())
+        self.assertFalse(exists)
+        self.assertTrue(added)
+        self.users.add_hashed.assert_called_once_with('tester', 'hashed pwd')
+        self.users.add_user.assert_not_called()
+        self.assertEqual(self.threads['user_exists'], {'users'})
+        self.assertEqual(self.threads['add_hashed'], {'users'})
+        self.assertEqual(self.threads['hash'], {'kdf'})
+
+    def test_concurrent_logins(self):
+        '''
+           Test many logins run while the event loop stays responsive.
+        '''
+        logging.info('test_concurrent_logins')
+
+        facades = [async_model.AsyncUserManager(self.users) for _ in range(8)]
+
+        async def run():
+            ticks = 0
+            logins = asyncio.gather(*(facade.log_in('admin', 'pwd')
+                                      for facade in facades))
+            while not logins.done():
+                ticks += 1
+                await asyncio.sleep(0)
+            return await logins, ticks
+
+        results, ticks = asyncio.run(run())
+        for facade in facades: facade.close()
+        self.assertTrue(all(results))
+        self.assertGreater(ticks, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import logging
+from benchmark import data, run
+from src.task_master import tasks
+
+logger = logging.getLogger(__name__)
+
+
+class TestBenchmarkData(unittest.TestCase):
+
+    def test_task_lines(self):
+        '''
+           Test synthetic task lines are valid tasks with skewed owners.
+        '''
+        logging.info('test_task_lines')
+
+        owners = data.owner_names(10)
+        lines = list(data.task_lines(1000, owners, skew=2., completed=.5))
+        task_list = tasks.Tasks()
+        task_list.extend([dict(zip(tasks.TASK_LABELS, line.split(';')))
+                          for line in lines])
+        self.assertEqual(len(task_list), 1000)
+        # Busiest owner first.
+        self.assertGreater(len(task_list.list_tasks(owners[0])[1]),
+                           len(task_list.list_tasks(owners[-1])[1]))
+        done = task_list.get_stats().count(tasks.STAT_LABELS[0])
+        self.assertTrue(400 < done < 600)
+
+    def test_user_lines(self):
+        '''
+           Test user lines padded up to number of rows.
+        '''
+        logging.info('test_user_lines')
+
+        lines = list(data.user_lines(['a', 'b'], 3, 'hash'))
+        self.assertEqual(lines, ['a;hash', 'b;hash', 'extra2;hash'])
+
+
+class TestBenchmarkCompare(unittest.TestCase):
+
+    def test_compare(self):
+        '''
+           Test only wall time growth over threshold is a regression.
+        '''
+        logging.info('test_compare')
+
+        old = {'results': {'1k': {'a': {'wall': 1.}, 'b': {'wall': 1.}}}}
+        new = {'results': {'1k': {'a': {'wall': 1.1}, 'b': {'wall': 1.5},
+                                  'c': {'wall': 9.}}}}
+        regressions = run.compare(old, new, threshold=.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('1k b:'))
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_save_tasks_writes(self):
+        '''
+           Test each timed save has changed tasks to write.
+        '''
+        logging.info('test_save_tasks_writes')
+
+        context = run.Context(200, owners=5, dirty=3)
+        try:
+            for _ in range(2):
+                save = run.save_tasks(context)
+                self.assertEqual(len(context.model.tasks.dirty), 3)
+                generation = context.model.taskfile.generation
+                save()
+                self.assertEqual(context.model.tasks.dirty, [])
+                self.assertGreater(context.model.taskfile.generation, generation)
+        finally:
+            context.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import logging
+from datetime import datetime, timedelta
+from src.task_master import columnar_tasks, single_task, tasks
+
+logger = logging.getLogger(__name__)
+
+
+class TestColumnarTasks(unittest.TestCase):
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.now = datetime.now()
+        self.delta = timedelta(days=1)
+        self.data = [{
+            single_task.TASK_LABELS[0]: owner,
+            single_task.TASK_LABELS[1]: 'Test',
+            single_task.TASK_LABELS[2]: 'Test Task',
+            single_task.TASK_LABELS[3]: (self.now+delta).strftime(
+                single_task.DATETIME_STRING_FORMAT),
+            single_task.TASK_LABELS[4]: self.now.strftime(
+                single_task.DATETIME_STRING_FORMAT),
+            single_task.TASK_LABELS[5]: completed,
+            } for owner, delta, completed in [('Tester', self.delta, 'No'),
+                                              ('Other', -self.delta, 'No'),
+                                              ('Tester', self.delta, 'Yes')]]
+
+    def setUp(self) -> None:
+        self.testing_tasks = columnar_tasks.ColumnarTasks()
+        self.testing_tasks.extend([dict(data) for data in self.data])
+
+    def test_same_data(self):
+        '''
+           Test iterating gives back the data added.
+        '''
+        logging.info('test_same_data')
+
+        self.assertEqual(list(self.testing_tasks), self.data)
+
+    def test_edit_and_stats(self):
+        '''
+           Test editing through SingleTask and status of tasks.
+        '''
+        logging.info('test_edit_and_stats')
+
+        self.testing_tasks[0].edit_user('Other')
+        self.testing_tasks[1].mark_as_completed()
+        self.assertEqual(self.testing_tasks.list_tasks('Other')[1], [0, 1])
+        self.assertEqual(self.testing_tasks.get_stats(),
+                         [tasks.STAT_LABELS[2], tasks.STAT_LABELS[0],
+                          tasks.STAT_LABELS[0]])
+
+    def test_remove(self):
+        '''
+           Test removing a task keeps the other columns aligned.
+        '''
+        logging.info('test_remove')
+
+        self.testing_tasks.remove(1)
+        self.assertEqual(list(self.testing_tasks), [self.data[0], self.data[2]])
+
+    def test_bad_date_leaves_columns(self):
+        '''
+           Test a row with a bad date is not half inserted.
+        '''
+        logging.info('test_bad_date_leaves_columns')
+
+        columns = columnar_tasks.TaskColumns()
+        data = dict(self.data[0])
+        data[single_task.TASK_LABELS[3]] = 'tomorrow'
+        self.assertRaises(ValueError, lambda: columns.append(data))
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(len(columns._owners), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,8 @@
+import os
+import stat
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 from src import file_handler
@@ -5,16 +10,33 @@ from src import file_handler
 PATCH_OPEN = "src.file_handler.open"
 PATCH_PATH = "src.file_handler.os.path.exists"
 PATCH_STAT = "src.file_handler.os.stat"
+PATCH_REPLACE = "src.file_handler.os.replace"
+PATCH_FSYNC = "src.file_handler.os.fsync"
+PATCH_CHMOD = "src.file_handler.os.chmod"
+PATCH_FCNTL = "src.file_handler.fcntl"
 
 mock_path = mock.MagicMock(return_value=True)
 mock_open = mock.MagicMock()
 mock_file = mock.MagicMock()
 mock_stat = mock.MagicMock()
 mock_timestamp = mock.MagicMock()
+mock_replace = mock.MagicMock()
+mock_fsync = mock.MagicMock()
+mock_chmod = mock.MagicMock()
+mock_fcntl = mock.MagicMock()
 
 mock_stat.return_value = mock_timestamp
 mock_timestamp.st_mtime = 1
+mock_timestamp.st_mode = 0o100644
 mock_file.__enter__.return_value = mock_file
+mock_file.tell.return_value = 0
+
+def written() -> str:
+   '''
+      Text passed to the last writelines call on the mock file.
+   '''
+
+   return ''.join(mock_file.writelines.call_args.args[0])
 ##############################################################################
 ##############################################
 #                                            #
@@ -22,6 +44,10 @@ mock_file.__enter__.return_value = mock_file
 #                                            #
 ##############################################
 
+@mock.patch(PATCH_FCNTL, mock_fcntl)
+@mock.patch(PATCH_FSYNC, mock_fsync)
+@mock.patch(PATCH_CHMOD, mock_chmod)
+@mock.patch(PATCH_REPLACE, mock_replace)
 @mock.patch(PATCH_STAT, mock_stat)
 @mock.patch(PATCH_PATH, mock_path)
 @mock.patch(PATCH_OPEN, mock_open)
@@ -126,14 +152,15 @@ class TestSCSVFileHandler(unittest.TestCase):
          {'1':'semi-collon', '3':'values', '':'banana', '2':'separated'}])
       f_handler.dump()
 
-      mock_file.write.assert_called_with('semi-collon;separated;values')
+      self.assertEqual(written(), 'semi-collon;separated;values')
 
       # Write two lines
       buffer.extend([
          {'2':'what will happen', '5':'with less labels'}])
       f_handler.dump()
 
-      mock_file.write.assert_called_with('\nwhat will happen;;')
+      self.assertEqual(written(),
+                       'semi-collon;separated;values\nwhat will happen;;')
 
       f_handler.close()
 
@@ -149,7 +176,7 @@ class TestSCSVFileHandler(unittest.TestCase):
          {'1':'semi-collon', '3':'values', '':'banana', '2':'separated'}])
       f_handler.dump()
 
-      mock_file.write.assert_called_with('semi-collon;values;banana;separated')
+      self.assertEqual(written(), 'semi-collon;values;banana;separated')
 
       f_handler.close()
 
@@ -190,6 +217,471 @@ class TestSCSVFileHandler(unittest.TestCase):
         
 
 
+##############################################################################
+##############################################
+#                                            #
+#        file_handler.atomic_write           #
+#                                            #
+##############################################
+
+class TestAtomicWrite(unittest.TestCase):
+
+   def setUp(self) -> None:
+      self.dir = tempfile.TemporaryDirectory()
+      self.filename = os.path.join(self.dir.name, 'TASK')
+      with open(self.filename, 'w') as f:
+         f.write('old')
+      return super().setUp()
+
+   def tearDown(self) -> None:
+      self.dir.cleanup()
+      return super().tearDown()
+
+   def read(self) -> str:
+      with open(self.filename) as f:
+         return f.read()
+
+   def test_replaces_file(self):
+      '''
+         Test if file is replaced and no temporary file is left.
+      '''
+
+      for durability in ['none', 'fsync-file', 'fsync-dir']:
+         with file_handler.atomic_write(self.filename,
+                                        durability=durability) as f:
+            f.write(durability)
+         self.assertEqual(self.read(), durability)
+      self.assertEqual(os.listdir(self.dir.name), ['TASK'])
+
+   def test_failed_write_keeps_file(self):
+      '''
+         Test if a write raising leaves the old file untouched.
+      '''
+
+      def write():
+         with file_handler.atomic_write(self.filename) as f:
+            f.write('partial')
+            raise OSError('disk full')
+      self.assertRaises(OSError, write)
+      self.assertEqual(self.read(), 'old')
+      self.assertEqual(os.listdir(self.dir.name), ['TASK'])
+
+   def test_keeps_permissions(self):
+      '''
+         Test if the replaced file keeps its permissions.
+      '''
+
+      os.chmod(self.filename, 0o640)
+      with file_handler.atomic_write(self.filename) as f:
+         f.write('new')
+      self.assertEqual(self.read(), 'new')
+      self.assertEqual(stat.S_IMODE(os.stat(self.filename).st_mode), 0o640)
+
+   def test_durability_levels(self):
+      '''
+         Test if files are flushed to disk only when asked.
+      '''
+
+      with mock.patch(PATCH_FSYNC) as fsync:
+         with file_handler.atomic_write(self.filename, durability='none') as f:
+            f.write('new')
+         fsync.assert_not_called()
+         with file_handler.atomic_write(self.filename,
+                                        durability='fsync-file') as f:
+            f.write('new')
+         self.assertEqual(fsync.call_count, 1)
+      self.assertRaises(ValueError, lambda: file_handler.atomic_write(
+         self.filename, durability='maybe').__enter__())
+
+   def test_dump_in_chunks(self):
+      '''
+         Test if dumps of many rows write the same lines.
+      '''
+
+      handler = file_handler.SCSVFileHandler(self.filename, labels=['a', 'b'])
+      rows = [{'a':str(i), 'b':'x'} for i in range(2*file_handler._WRITE_CHUNK_ + 1)]
+      handler.buffer.extend(rows)
+      handler.dump()
+      handler.close()
+      self.assertEqual(self.read(), '\n'.join(f'{i};x' for i in range(len(rows))))
+
+
+##############################################################################
+##############################################
+#                                            #
+#        file_handler.FileHandler locks      #
+#                                            #
+##############################################
+
+class TestFileLocks(unittest.TestCase):
+
+   def setUp(self) -> None:
+      self.dir = tempfile.TemporaryDirectory()
+      self.filename = os.path.join(self.dir.name, 'TASK')
+      with open(self.filename, 'w') as f:
+         f.write('1;x')
+      self.handler = file_handler.SCSVFileHandler(self.filename, labels=['a', 'b'])
+      return super().setUp()
+
+   def tearDown(self) -> None:
+      self.handler.close()
+      self.dir.cleanup()
+      return super().tearDown()
+
+   def test_locked_is_reentrant(self):
+      '''
+         Test if load and dump run while the lock is held.
+      '''
+
+      with self.handler.locked(exclusive=False):
+         self.handler.load()
+         with self.handler.locked():
+            self.handler.buffer.append({'a':'2', 'b':'y'})
+            self.handler.dump()
+      self.assertTrue(os.path.exists(self.filename + '.lock'))
+      self.handler.reload()
+      self.assertEqual(len(self.handler.buffer), 2)
+
+   def test_stale(self):
+      '''
+         Test if writes of another session are detected.
+      '''
+
+      self.assertFalse(self.handler.stale())
+      self.handler.load()
+      self.assertFalse(self.handler.stale())
+      with open(self.filename + '.new', 'w') as f:
+         f.write('1;x\n2;y')
+      os.replace(self.filename + '.new', self.filename)
+      self.assertTrue(self.handler.stale())
+      self.handler.load()
+      self.assertFalse(self.handler.stale())
+      self.handler.dump()
+      self.assertFalse(self.handler.stale())
+
+   def test_unchanged_load_skips_lock(self):
+      '''
+         Test if loading an unchanged file takes no lock.
+      '''
+
+      self.handler.load()
+      with mock.patch.object(file_handler, '_lock') as lock:
+         self.handler.load()
+         lock.assert_not_called()
+         with open(self.filename, 'a') as f:
+            f.write('\n2;y')
+         self.handler.load()
+         lock.assert_called_once()
+      self.assertEqual(len(self.handler.buffer), 2)
+
+   @unittest.skipIf(file_handler.fcntl is None, 'needs fcntl')
+   def test_lock_wait_measured(self):
+      '''
+         Test if a load waits for an exclusive lock held elsewhere.
+      '''
+
+      with open(self.filename + '.lock', 'a+b') as other:
+         file_handler.fcntl.flock(other.fileno(), file_handler.fcntl.LOCK_EX)
+         thread = threading.Thread(target=self.handler.load)
+         thread.start()
+         time.sleep(.2)
+         self.assertEqual(self.handler.buffer, [])
+         file_handler.fcntl.flock(other.fileno(), file_handler.fcntl.LOCK_UN)
+         thread.join()
+      self.assertEqual(len(self.handler.buffer), 1)
+      self.assertGreater(self.handler.lock_wait, .1)
+
+
+##############################################################################
+##############################################
+#                                            #
+#     file_handler.SCSVHandler on disk       #
+#                                            #
+##############################################
+
+class TestSCSVFileHandlerTailLoad(unittest.TestCase):
+
+   def setUp(self) -> None:
+      self.dir = tempfile.TemporaryDirectory()
+      self.filename = os.path.join(self.dir.name, 'USER')
+      self.write('w', 'admin;hash1\ntester;hash2')
+      self.handler = file_handler.SCSVFileHandler(
+         self.filename, labels=['username', 'password'])
+      self.handler.load()
+      self.first = self.handler.buffer[0]
+      return super().setUp()
+
+   def tearDown(self) -> None:
+      file_handler.FileHandler.handlers.clear()
+      self.dir.cleanup()
+      return super().tearDown()
+
+   def write(self, mode: str, text: str) -> None:
+      with open(self.filename, mode) as f:
+         f.write(text)
+      # Guarantee a new timestamp on coarse clocks.
+      stat = os.stat(self.filename)
+      os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+   def test_appended_rows_only(self):
+      '''
+         Test if appended rows are parsed without reloading the others.
+      '''
+
+      self.write('a', '\njohn;hash3')
+      self.handler.load()
+
+      self.assertIs(self.handler.buffer[0], self.first)
+      self.assertEqual(self.handler.buffer[2],
+                       {'username':'john', 'password':'hash3'})
+      self.assertEqual(len(self.handler.buffer), 3)
+
+   def test_touched_file(self):
+      '''
+         Test if a new timestamp alone does not reload the file.
+      '''
+
+      self.write('a', '')
+      self.handler.load()
+
+      self.assertIs(self.handler.buffer[0], self.first)
+      self.assertEqual(len(self.handler.buffer), 2)
+
+   def test_rewritten_file(self):
+      '''
+         Test if a rewritten prefix triggers a full reload.
+      '''
+
+      self.write('w', 'other;hash1\ntester;hash2\njohn;hash3')
+      self.handler.load()
+
+      self.assertIsNot(self.handler.buffer[0], self.first)
+      self.assertEqual(self.handler.buffer[0]['username'], 'other')
+      self.assertEqual(len(self.handler.buffer), 3)
+
+   def test_truncated_file(self):
+      '''
+         Test if a truncated file triggers a full reload.
+      '''
+
+      self.write('w', 'admin;hash1')
+      self.handler.load()
+
+      self.assertEqual(self.handler.buffer, [self.first])
+      self.assertIsNot(self.handler.buffer[0], self.first)
+
+   def test_extended_last_line(self):
+      '''
+         Test if a completed last line triggers a full reload.
+      '''
+
+      self.write('a', 'more')
+      self.handler.load()
+
+      self.assertEqual(self.handler.buffer[1]['password'], 'hash2more')
+      self.assertEqual(len(self.handler.buffer), 2)
+
+   def test_dump_then_append(self):
+      '''
+         Test if rows appended after own dump are read once.
+      '''
+
+      self.handler.buffer.append({'username':'john', 'password':'hash3'})
+      self.handler.dump()
+      self.write('a', '\nmary;hash4')
+      self.handler.load()
+
+      self.assertIs(self.handler.buffer[0], self.first)
+      self.assertEqual([row['username'] for row in self.handler.buffer],
+                       ['admin', 'tester', 'john', 'mary'])
+
+   def test_generation(self):
+      '''
+         Test if generation changes only when rows are read or written.
+      '''
+
+      generation = self.handler.generation
+      self.write('a', '')
+      self.handler.load()
+      self.handler.load()
+      self.assertEqual(self.handler.generation, generation)
+      self.write('a', '\njohn;hash3')
+      self.handler.load()
+      self.assertEqual(self.handler.generation, generation + 1)
+      self.handler.dump()
+      self.assertEqual(self.handler.generation, generation + 2)
+
+   def big_file(self, rows: int = 2000) -> None:
+      '''
+         Replaces file with 'rows' rows, far more than the bytes
+         appended to it, and loads it.
+      '''
+
+      self.write('w', '\n'.join(f'user{i:05};hash{i:05}' for i in range(rows)))
+      self.handler.load()
+      self.assertEqual(self.handler.buffer[0]['username'], 'user00000')
+
+   def replace(self, text: str) -> None:
+      with file_handler.atomic_write(self.filename) as f:
+         f.write(text)
+      self.write('a', '')
+
+   def test_replaced_early_row(self):
+      '''
+         Test if a same length rewrite of an early row renamed over
+         the file triggers a full reload.
+      '''
+
+      self.big_file()
+      with open(self.filename) as f:
+         text = f.read()
+      self.replace(text.replace('user00000', 'USER00000', 1))
+      self.handler.load()
+
+      self.assertEqual(self.handler.buffer[0]['username'], 'USER00000')
+      self.assertEqual(len(self.handler.buffer), 2000)
+
+   def test_edited_early_row_and_append(self):
+      '''
+         Test if an early edit followed by an append, in place or
+         renamed over the file, reloads the edited row too.
+      '''
+
+      self.big_file()
+      with open(self.filename, 'r+') as f:
+         f.write('USER00000')
+      self.write('a', '\njohn;hash3')
+      self.handler.load()
+      self.assertEqual(self.handler.buffer[0]['username'], 'USER00000')
+      self.assertEqual(self.handler.buffer[-1]['username'], 'john')
+
+      with open(self.filename) as f:
+         text = f.read()
+      self.replace(text.replace('user00001', 'USER00001', 1) + '\nmary;hash4')
+      self.handler.load()
+      self.assertEqual(self.handler.buffer[1]['username'], 'USER00001')
+      self.assertEqual([row['username'] for row in self.handler.buffer[-2:]],
+                       ['john', 'mary'])
+      self.assertEqual(len(self.handler.buffer), 2002)
+
+
+##############################################################################
+##############################################
+#                                            #
+#      file_handler.SQLiteFileHandler        #
+#                                            #
+##############################################
+
+class TestSQLiteFileHandler(unittest.TestCase):
+
+   def setUp(self) -> None:
+      self.dir = tempfile.TemporaryDirectory()
+      self.database = os.path.join(self.dir.name, 'DB')
+      self.filename = os.path.join(self.dir.name, '.USER')
+      self.handler = file_handler.SQLiteFileHandler(
+         self.filename, labels=['username', 'password'], database=self.database)
+      self.handler.load()
+      return super().setUp()
+
+   def tearDown(self) -> None:
+      for handler in list(file_handler.FileHandler.handlers.values()):
+         handler.close()
+      self.dir.cleanup()
+      return super().tearDown()
+
+   def rows(self):
+      return self.handler.connection.execute(
+         'SELECT * FROM "user" ORDER BY id').fetchall()
+
+   def test_table_named_after_file(self):
+      '''
+         Test if table is named after the data file.
+      '''
+
+      self.assertEqual(self.handler.table, 'user')
+      self.assertFalse(os.path.exists(self.filename))
+
+   def test_dump_changed_rows(self):
+      '''
+         Test if dump inserts, updates and deletes rows.
+      '''
+
+      buffer = self.handler.buffer
+      buffer.extend([{'username':'admin', 'password':'1'},
+                     {'username':'tester', 'password':'2'}])
+      self.handler.dump()
+      self.assertEqual(self.rows(), [(1, 'admin', '1'), (2, 'tester', '2')])
+
+      buffer[0] = {'username':'admin', 'password':'3'}
+      buffer.pop()
+      self.handler.dump()
+      self.assertEqual(self.rows(), [(1, 'admin', '3')])
+
+   def test_dump_rows(self):
+      '''
+         Test if only given rows are updated and appended rows inserted.
+      '''
+
+      buffer = self.handler.buffer
+      buffer.extend([{'username':'admin', 'password':'1'},
+                     {'username':'tester', 'password':'2'}])
+      self.handler.dump()
+      buffer[0] = {'username':'admin', 'password':'3'}
+      buffer[1] = {'username':'tester', 'password':'4'}
+      buffer.append({'username':'john', 'password':'5'})
+      self.handler.dump_rows([1])
+      self.assertEqual(self.rows(), [(1, 'admin', '1'), (2, 'tester', '4'),
+                                     (3, 'john', '5')])
+
+   def test_load_after_other_connection(self):
+      '''
+         Test if load reads rows committed by another connection.
+      '''
+
+      other = file_handler.connect(self.database)
+      with other:
+         other.execute('INSERT INTO "user" (username, password) VALUES (?, ?)',
+                       ('john', 'hash'))
+      other.close()
+      self.handler.load()
+
+      self.assertEqual(self.handler.buffer, [{'username':'john', 'password':'hash'}])
+
+   def test_no_labels(self):
+      '''
+         Test if a file without labels keeps a value per row.
+      '''
+
+      filename = os.path.join(self.dir.name, '.ADMIN')
+      handler = file_handler.SQLiteFileHandler(filename, database=self.database)
+      with open(filename, 'w') as f:
+         f.write('admin;The IT crowd\njohn')
+
+      self.assertEqual(handler.import_scsv(), 3)
+      handler.load()
+      self.assertEqual([row['0'] for row in handler.buffer],
+                       ['admin', 'The IT crowd', 'john'])
+
+   def test_new_table_seeded(self):
+      '''
+         Test if a new table starts with the rows of its data file, once.
+      '''
+
+      filename = os.path.join(self.dir.name, '.ADMIN')
+      with open(filename, 'w') as f:
+         f.write('admin\njohn')
+      handler = file_handler.SQLiteFileHandler(filename, database=self.database)
+      handler.load()
+      self.assertEqual([row['0'] for row in handler.buffer], ['admin', 'john'])
+
+      handler.buffer.pop()
+      handler.dump()
+      handler.close()
+      handler = file_handler.SQLiteFileHandler(filename, database=self.database)
+      handler.load()
+      self.assertEqual([row['0'] for row in handler.buffer], ['admin'])
+
+
 ##############################################################################
 ##############################################
 #                                            #
@@ -197,6 +689,10 @@ class TestSCSVFileHandler(unittest.TestCase):
 #                                            #
 ##############################################
 
+@mock.patch(PATCH_FCNTL, mock_fcntl)
+@mock.patch(PATCH_FSYNC, mock_fsync)
+@mock.patch(PATCH_CHMOD, mock_chmod)
+@mock.patch(PATCH_REPLACE, mock_replace)
 @mock.patch(PATCH_STAT, mock_stat)
 @mock.patch(PATCH_PATH, mock_path)
 @mock.patch(PATCH_OPEN, mock_open)
@@ -249,10 +745,7 @@ class TestReportFileHandler(unittest.TestCase):
       expected.append('\n'+'\t'.join(['entry'.ljust(11)]*7))
       expected.append(sep_line)
 
-      for call_read, arg in zip(mock_file.write.mock_calls, expected):
-          self.assertEqual(call_read.args, (arg,))
-
-      mock_file.write.mock_calls.clear()
+      self.assertEqual(written(), ''.join(expected))
 
       # Insert on buffer another line with 'another' for each label.
       buffer.extend([
@@ -266,8 +759,7 @@ class TestReportFileHandler(unittest.TestCase):
       expected.append('\n'+'\t'.join(['another'.ljust(11)]*7))
       expected.append(sep_line)
 
-      for call_read, arg in zip(mock_file.write.mock_calls, expected):
-          self.assertEqual(call_read.args, (arg,))
+      self.assertEqual(written(), ''.join(expected))
 
 
    def test_set_pre_header(self):
@@ -299,8 +791,7 @@ class TestReportFileHandler(unittest.TestCase):
       expected.append('\n'+'\t'.join(['entry'.ljust(11)]*7))
       expected.append(sep_line)
 
-      for call_read, arg in zip(mock_file.write.mock_calls, expected):
-          self.assertEqual(call_read.args, (arg,))
+      self.assertEqual(written(), ''.join(expected))
 
 
    def test_read_report_file(self):
@@ -320,6 +811,253 @@ class TestReportFileHandler(unittest.TestCase):
       self.assertEqual(str(handler), 'TEST STRING')
       handler.close()
 
-      
+
+
+##############################################################################
+##############################################
+#                                            #
+#      file_handler.JournalFileHandler       #
+#                                            #
+##############################################
+
+class TestJournalFileHandler(unittest.TestCase):
+
+   LABELS = ['owner', 'title', 'completed']
+
+   def setUp(self) -> None:
+      self.dir = tempfile.TemporaryDirectory()
+      self.filename = os.path.join(self.dir.name, 'TASK')
+      with open(self.filename, 'w') as f:
+         f.write('admin;first;No\ntester;second;No')
+      self.handler = file_handler.JournalFileHandler(
+         self.filename, labels=self.LABELS)
+      self.handler.load()
+      return super().setUp()
+
+   def tearDown(self) -> None:
+      file_handler.FileHandler.handlers.clear()
+      self.dir.cleanup()
+      return super().tearDown()
+
+   def read(self, path: str) -> str:
+      with open(path) as f:
+         return f.read()
+
+   def reopen(self) -> file_handler.JournalFileHandler:
+      self.handler.close()
+      handler = file_handler.JournalFileHandler(
+         self.filename, labels=self.LABELS)
+      handler.load()
+      return handler
+
+   def test_dump_appends_changes_only(self):
+      '''
+         Test if dump journals changed rows and keeps snapshot.
+      '''
+
+      self.handler.buffer[1]['completed'] = 'Yes'
+      self.handler.buffer.append(
+         {'owner':'admin', 'title':'third', 'completed':'No'})
+      self.handler.dump()
+
+      self.assertEqual(self.read(self.filename),
+                       'admin;first;No\ntester;second;No')
+      self.assertEqual(self.read(self.filename + '.journal'),
+                       'C;1;completed;Yes\nI;2;admin;third;No\n')
+
+      # Nothing changed, nothing appended.
+      self.handler.dump()
+      self.assertEqual(len(self.read(self.filename + '.journal').split('\n')), 3)
+
+   def test_dump_rows(self):
+      '''
+         Test if only given rows and appended rows are journaled.
+      '''
+
+      self.handler.buffer[0]['completed'] = 'Yes'
+      self.handler.buffer[1]['completed'] = 'Yes'
+      self.handler.buffer.append(
+         {'owner':'admin', 'title':'third', 'completed':'No'})
+      self.handler.dump_rows([1])
+
+      self.assertEqual(self.read(self.filename + '.journal'),
+                       'C;1;completed;Yes\nI;2;admin;third;No\n')
+
+   def test_load_replays_journal(self):
+      '''
+         Test if a new handler sees journaled changes.
+      '''
+
+      self.handler.buffer[0] = {'owner':'john', 'title':'new', 'completed':'No'}
+      self.handler.buffer.append(
+         {'owner':'admin', 'title':'third', 'completed':'No'})
+      self.handler.dump()
+      expected = [dict(row) for row in self.handler.buffer]
+
+      self.assertEqual(self.reopen().buffer, expected)
+
+   def test_load_ignores_torn_record(self):
+      '''
+         Test if a record without line ending is ignored.
+      '''
+
+      with open(self.filename + '.journal', 'w') as f:
+         f.write('C;0;completed;Yes\nC;1;completed;Ye')
+
+      handler = self.reopen()
+      self.assertEqual(handler.buffer[0]['completed'], 'Yes')
+      self.assertEqual(handler.buffer[1]['completed'], 'No')
+
+   def test_load_replays_appended_records_only(self):
+      '''
+         Test if records appended by others are replayed on loaded rows.
+      '''
+
+      second = self.handler.buffer[1]
+      with open(self.filename + '.journal', 'a') as f:
+         f.write('C;0;completed;Yes\n')
+      self.handler.load()
+
+      self.assertIs(self.handler.buffer[1], second)
+      self.assertEqual(self.handler.buffer[0]['completed'], 'Yes')
+      # Replayed record is persisted: nothing to append.
+      self.handler.dump()
+      self.assertEqual(self.read(self.filename + '.journal'),
+                       'C;0;completed;Yes\n')
+
+   def test_dump_after_other_session(self):
+      '''
+         Test if records appended by others since last load are
+         replayed on dump, keeping fields changed here.
+      '''
+
+      with open(self.filename + '.journal', 'a') as f:
+         f.write('C;0;title;OTHER\nC;1;completed;Maybe\n')
+      first = self.handler.buffer[0]
+      first['completed'] = 'Yes'
+      self.handler.buffer[1]['completed'] = 'Yes'
+      self.handler.dump()
+
+      expected = [{'owner':'admin', 'title':'OTHER', 'completed':'Yes'},
+                  {'owner':'tester', 'title':'second', 'completed':'Yes'}]
+      self.assertIs(self.handler.buffer[0], first)
+      self.assertEqual(self.handler.buffer, expected)
+      self.handler.load()
+      self.assertEqual(self.handler.buffer, expected)
+      self.assertEqual(self.reopen().buffer, expected)
+
+   def test_compaction(self):
+      '''
+         Test if compaction folds journal into snapshot.
+      '''
+
+      self.handler.buffer[0]['completed'] = 'Yes'
+      self.handler.dump()
+      self.handler.compact()
+
+      self.assertEqual(self.read(self.filename),
+                       'admin;first;Yes\ntester;second;No')
+      self.assertEqual(self.read(self.filename + '.journal'), '')
+      self.assertEqual(self.reopen().buffer[0]['completed'], 'Yes')
+
+   def test_compaction_after_other_session(self):
+      '''
+         Test if a compaction is dropped when another session wrote a
+         snapshot while it read the files.
+      '''
+
+      self.handler.buffer[0]['completed'] = 'Yes'
+      self.handler.dump()
+      replay = self.handler._replay
+
+      def other_session(*args, **kwargs):
+         # Other session saved a row and compacted its own journal.
+         with file_handler.atomic_write(self.filename) as f:
+            f.write('admin;first;Yes\ntester;second;Yes')
+         with file_handler.atomic_write(self.filename + '.journal') as f:
+            f.write('')
+         return replay(*args, **kwargs)
+
+      with mock.patch.object(self.handler, '_replay', other_session):
+         self.handler.compact()
+
+      self.assertEqual(self.read(self.filename),
+                       'admin;first;Yes\ntester;second;Yes')
+      self.assertEqual(self.reopen().buffer[1]['completed'], 'Yes')
+
+   def test_compaction_on_threshold(self):
+      '''
+         Test if passing journal size threshold triggers compaction.
+      '''
+
+      self.handler._compact_size = 0
+      self.handler.buffer[0]['completed'] = 'Yes'
+      self.handler.dump()
+      self.handler.compact(wait=True)
+
+      self.assertEqual(self.read(self.filename + '.journal'), '')
+
+   def test_removed_rows_write_snapshot(self):
+      '''
+         Test if removing rows rewrites the snapshot.
+      '''
+
+      self.handler.buffer.pop(0)
+      self.handler.dump()
+
+      self.assertEqual(self.read(self.filename), 'tester;second;No')
+      self.assertEqual(self.read(self.filename + '.journal'), '')
+
+   def crash_on_write(self, failed: int) -> None:
+      '''
+         Appends a row, then removes one so a snapshot is written,
+         failing atomic write number 'failed' of the snapshot.
+      '''
+
+      self.handler.buffer.append(
+         {'owner':'admin', 'title':'third', 'completed':'No'})
+      self.handler.dump()
+      self.handler.buffer.pop(0)
+      writes = []
+      real = file_handler.atomic_write
+
+      def atomic_write(*args, **kwargs):
+         writes.append(args[0])
+         if len(writes) == failed: raise OSError('crash')
+         return real(*args, **kwargs)
+
+      with mock.patch.object(file_handler, 'atomic_write', atomic_write):
+         with self.assertRaises(OSError):
+            self.handler.dump()
+
+   def test_crash_before_journal_replaced(self):
+      '''
+         Test if journal records already in a written snapshot are
+         not replayed again when the journal was not replaced.
+      '''
+
+      self.crash_on_write(3)
+      self.assertEqual(self.read(self.filename),
+                       'tester;second;No\nadmin;third;No')
+
+      handler = self.reopen()
+      self.assertEqual([row['title'] for row in handler.buffer],
+                       ['second', 'third'])
+      self.assertEqual(self.read(self.filename + '.journal'), '')
+      self.assertFalse(os.path.exists(self.filename + '.journal.pending'))
+
+   def test_crash_before_snapshot_replaced(self):
+      '''
+         Test if the journal is kept when the snapshot was not replaced.
+      '''
+
+      self.crash_on_write(2)
+
+      handler = self.reopen()
+      self.assertEqual([row['title'] for row in handler.buffer],
+                       ['first', 'second', 'third'])
+      self.assertFalse(os.path.exists(self.filename + '.journal.pending'))
+
+
 if __name__=='__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+import io
+import unittest
+import logging
+from unittest import mock
+from src import instrument
+
+logger = logging.getLogger(__name__)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        '''
+           Test percentiles fall in the bucket of the ranked latency.
+        '''
+        logging.info('test_percentiles')
+
+        histogram = instrument.Histogram()
+        for _ in range(90): histogram.add(.001)
+        for _ in range(10): histogram.add(.1)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(.5), .001, delta=.0002)
+        self.assertAlmostEqual(histogram.percentile(.95), .1, delta=.02)
+        # Never above the slowest call.
+        self.assertLessEqual(histogram.percentile(.99), .1)
+
+    def test_empty(self):
+        '''
+           Test empty histogram percentiles.
+        '''
+        logging.info('test_empty')
+
+        self.assertEqual(instrument.Histogram().percentile(.5), 0.)
+
+
+class TestRecording(unittest.TestCase):
+
+    def setUp(self) -> None:
+        instrument.reset()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        instrument.disable()
+        instrument.reset()
+        return super().tearDown()
+
+    def test_disabled(self):
+        '''
+           Test nothing is recorded while disabled.
+        '''
+        logging.info('test_disabled')
+
+        call = instrument.instrumented('call')(lambda x: x)
+        self.assertEqual(call(42), 42)
+        with instrument.timed('block'): pass
+        self.assertEqual(instrument.histograms(), {})
+
+    def test_enabled(self):
+        '''
+           Test calls and blocks recorded while enabled, even on errors.
+        '''
+        logging.info('test_enabled')
+
+        instrument.enable()
+        call = instrument.instrumented('call')(lambda x: 1/x)
+        call(1)
+        self.assertRaises(ZeroDivisionError, lambda: call(0))
+        with instrument.timed('block'): pass
+        histograms = instrument.histograms()
+        self.assertEqual(histograms['call'].count, 2)
+        self.assertEqual(histograms['block'].count, 1)
+
+    def test_default_name(self):
+        '''
+           Test default name is module and qualified name.
+        '''
+        logging.info('test_default_name')
+
+        instrument.enable()
+        instrument.instrumented()(self.setUp)()
+        self.assertIn(f'{__name__}.TestRecording.setUp',
+                      instrument.histograms())
+
+    def test_report(self):
+        '''
+           Test summary written with a line per name.
+        '''
+        logging.info('test_report')
+
+        instrument.enable()
+        with instrument.timed('block'): pass
+        out = io.StringIO()
+        instrument.report(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('block'))
+
+    @mock.patch('src.instrument.atexit')
+    def test_report_at_exit(self, atexit):
+        '''
+           Test report registered once at exit.
+        '''
+        logging.info('test_report_at_exit')
+
+        with mock.patch('src.instrument._at_exit', False):
+            instrument.enable(report_at_exit=True)
+            instrument.enable(report_at_exit=True)
+        atexit.register.assert_called_once_with(instrument.report)
+
+
+if __name__ == '__main__':
+    unittest.main()
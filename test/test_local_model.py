@@ -0,0 +1,328 @@
+import os
+import tempfile
+import unittest
+import logging
+from unittest import mock
+from src.file_handler import FileHandler
+from src.task_master import local_model, owner_index, tasks
+
+logger = logging.getLogger(__name__)
+
+
+class ModelFileTestCase(unittest.TestCase):
+    '''
+       Model over a task file with two tasks in a temporary directory.
+    '''
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        path = lambda name: os.path.join(self.dir.name, name)
+        self.taskfile = path('TASK')
+        with open(self.taskfile, 'w') as f:
+            f.write('admin;T1;D;2023-01-01;2023-01-01;No\n' + \
+                    'tester;T2;D;2023-01-01;2023-01-01;No')
+        self.model = local_model.Model(
+            taskfile=self.taskfile,
+            u_report_file=path('USER_REPORT'),
+            t_report_file=path('TASK_REPORT'))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        for handler in list(FileHandler.handlers.values()):
+            handler.close()
+        self.dir.cleanup()
+        return super().tearDown()
+
+    def read(self) -> str:
+        with open(self.taskfile) as f:
+            return f.read()
+
+
+class TestModelSave(ModelFileTestCase):
+
+    def test_read_only_session(self):
+        '''
+           Test nothing is written if tasks did not change.
+        '''
+        logging.info('test_read_only_session')
+
+        self.model.get_all_tasks()
+        self.model.get_task(1)
+        self.model.write_report(['admin'])
+        with mock.patch.object(self.model.taskfile, 'dump') as dump, \
+             mock.patch.object(self.model.taskfile, 'dump_rows') as dump_rows:
+            self.model.save_tasks()
+        dump.assert_not_called()
+        dump_rows.assert_not_called()
+
+    def test_changed_rows_passed(self):
+        '''
+           Test changed and added rows are handed to the file handler.
+        '''
+        logging.info('test_changed_rows_passed')
+
+        self.model.mark_as_completed(1)
+        self.model.add_task(['john', 'T3', 'D', '2023-01-01', '2023-01-01', 'No'])
+        with mock.patch.object(self.model.taskfile, 'dump_rows') as dump_rows:
+            self.model.save_tasks()
+        dump_rows.assert_called_once_with([1, 2])
+        self.assertEqual(self.model.taskfile.buffer[1][tasks.TASK_LABELS[5]], 'Yes')
+        self.assertEqual(len(self.model.taskfile.buffer), 3)
+
+    def test_saved_rows_are_base(self):
+        '''
+           Test rows saved stay the base of merges after more edits.
+        '''
+        logging.info('test_saved_rows_are_base')
+
+        self.model.edit_date(1, '2024-01-01')
+        self.model.save_tasks()
+        self.model.edit_date(1, '2025-01-01')
+        # Other session changes the owner of the same task.
+        with open(self.taskfile + '.new', 'w') as f:
+            f.write('admin;T1;D;2023-01-01;2023-01-01;No\n' + \
+                    'john;T2;D;2024-01-01;2023-01-01;No')
+        os.replace(self.taskfile + '.new', self.taskfile)
+        self.model.save_tasks()
+        self.assertEqual(self.read().split('\n')[1],
+                         'john;T2;D;2025-01-01;2023-01-01;No')
+
+    def test_save_after_remove(self):
+        '''
+           Test removal rewrites the file and later saves are skipped.
+        '''
+        logging.info('test_save_after_remove')
+
+        self.model.tasks.remove(0)
+        self.model.save_tasks()
+        self.assertEqual(self.read(), 'tester;T2;D;2023-01-01;2023-01-01;No')
+        with mock.patch.object(self.model.taskfile, 'dump') as dump:
+            self.model.save_tasks()
+        dump.assert_not_called()
+
+
+class TestModelMerge(ModelFileTestCase):
+
+    def write(self, text: str) -> None:
+        '''
+           Replaces task file as another session saving would.
+        '''
+
+        with open(self.taskfile + '.new', 'w') as f:
+            f.write(text)
+        os.replace(self.taskfile + '.new', self.taskfile)
+
+    def test_changes_merged(self):
+        '''
+           Test changes of both sessions are kept.
+        '''
+        logging.info('test_changes_merged')
+
+        self.write('admin;T1;D;2023-01-01;2023-01-01;Yes\n' + \
+                   'tester;T2;D;2023-01-01;2023-01-01;No\n' + \
+                   'mary;T4;D;2023-01-01;2023-01-01;No')
+        self.model.edit_user(1, 'john')
+        self.model.add_task(['john', 'T3', 'D', '2023-01-01', '2023-01-01', 'No'])
+        self.model.save_tasks()
+        self.assertEqual(self.read(),
+                         'admin;T1;D;2023-01-01;2023-01-01;Yes\n' + \
+                         'john;T2;D;2023-01-01;2023-01-01;No\n' + \
+                         'mary;T4;D;2023-01-01;2023-01-01;No\n' + \
+                         'john;T3;D;2023-01-01;2023-01-01;No')
+        self.assertTrue(self.model.is_task_completed(0))
+        self.assertFalse(self.model.taskfile.stale())
+
+    def test_conflict_keeps_ours(self):
+        '''
+           Test a field changed by both sessions keeps this session's value.
+        '''
+        logging.info('test_conflict_keeps_ours')
+
+        self.write('mary;T1;D;2023-01-01;2023-01-01;No\n' + \
+                   'tester;T2;D;2023-01-01;2023-01-01;No')
+        self.model.edit_user(0, 'john')
+        with self.assertLogs(local_model.logger, 'WARNING'):
+            self.model.save_tasks()
+        self.assertTrue(self.read().startswith('john;T1'))
+
+    def test_removal_merged(self):
+        '''
+           Test rows added by another session survive a removal.
+        '''
+        logging.info('test_removal_merged')
+
+        self.write('admin;T1;D;2023-01-01;2023-01-01;No\n' + \
+                   'tester;T2;D;2023-01-01;2023-01-01;No\n' + \
+                   'mary;T4;D;2023-01-01;2023-01-01;No')
+        self.model.tasks.remove(0)
+        self.model.save_tasks()
+        self.assertEqual(self.read(),
+                         'tester;T2;D;2023-01-01;2023-01-01;No\n' + \
+                         'mary;T4;D;2023-01-01;2023-01-01;No')
+
+
+class TestModelByOwner(TestModelMerge):
+    '''
+       Model loading tasks by owner, over a task file with tasks of
+       admin and tester interleaved.
+    '''
+
+    ROWS = ['admin;T1;D;2023-01-01;2023-01-01;No',
+            'tester;T2;D;2023-01-01;2023-01-01;No',
+            'admin;T3;D;2023-01-01;2023-01-01;No']
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.write('\n'.join(self.ROWS))
+        self.model = local_model.Model(
+            taskfile=self.taskfile,
+            u_report_file=os.path.join(self.dir.name, 'USER_REPORT'),
+            t_report_file=os.path.join(self.dir.name, 'TASK_REPORT'),
+            by_owner=True)
+
+    def test_loads_owner_rows(self):
+        '''
+           Test only rows of the owner asked for are loaded.
+        '''
+        logging.info('test_loads_owner_rows')
+
+        self.assertEqual(len(self.model.tasks), 0)
+        self.assertIsNotNone(owner_index.load(self.taskfile))
+        text, mapping = self.model.get_all_tasks('admin')
+        self.assertEqual(mapping, [0, 1])
+        self.assertIn('T3', self.model.get_task(1))
+        self.assertEqual(len(self.model.tasks), 2)
+
+    def test_save_keeps_others(self):
+        '''
+           Test saving writes the owner's rows back among the others.
+        '''
+        logging.info('test_save_keeps_others')
+
+        self.model.get_all_tasks('admin')
+        self.model.mark_as_completed(1)
+        self.model.add_task(['admin', 'T4', 'D', '2023-01-01', '2023-01-01', 'No'])
+        self.model.save_tasks()
+        self.assertEqual(self.read(), '\n'.join(self.ROWS[:2] + [
+            'admin;T3;D;2023-01-01;2023-01-01;Yes',
+            'admin;T4;D;2023-01-01;2023-01-01;No']))
+        index = owner_index.load(self.taskfile)
+        self.assertEqual(index.rows, 4)
+        self.assertEqual(index.read(self.taskfile, 'admin')[-1][0], 3)
+        # Nothing changed since.
+        with mock.patch.object(self.model.taskfile, 'dump') as dump, \
+             mock.patch.object(self.model.taskfile, 'dump_rows') as dump_rows:
+            self.model.save_tasks()
+        dump.assert_not_called()
+        dump_rows.assert_not_called()
+
+    def test_crlf_file(self):
+        '''
+           Test rows of a file with CRLF line endings load as in a full load.
+        '''
+        logging.info('test_crlf_file')
+
+        with open(self.taskfile, 'wb') as f:
+            f.write('\r\n'.join(self.ROWS[:2] + [
+                'admin;T3;D;2023-01-01;2023-01-01;Yes']).encode())
+        model = local_model.Model(taskfile=self.taskfile, by_owner=True)
+        self.assertEqual(model.get_all_tasks('admin')[1], [0, 1])
+        self.assertTrue(model.is_task_completed(1))
+
+    def test_load_all(self):
+        '''
+           Test asking for all tasks loads them with the owner's changes.
+        '''
+        logging.info('test_load_all')
+
+        self.model.get_all_tasks('admin')
+        self.model.edit_date(0, '2024-01-01')
+        text, mapping = self.model.get_all_tasks()
+        self.assertEqual(mapping, [0, 1, 2])
+        self.assertIn('2024-01-01', self.model.get_task(0))
+        self.assertTrue(self.read().startswith('admin;T1;D;2024-01-01;2023-01-01;No'))
+
+    def test_changes_merged(self):
+        '''
+           Test changes of another session to any row are kept.
+        '''
+        logging.info('test_changes_merged')
+
+        self.model.get_all_tasks('admin')
+        self.write('admin;T1;D;2023-01-01;2023-01-01;Yes\n' + \
+                   'tester;T2;D;2023-01-01;2024-01-01;No\n' + \
+                   self.ROWS[2] + '\n' + \
+                   'mary;T5;D;2023-01-01;2023-01-01;No')
+        self.model.edit_user(1, 'john')
+        self.model.save_tasks()
+        self.assertEqual(self.read(),
+                         'admin;T1;D;2023-01-01;2023-01-01;Yes\n' + \
+                         'tester;T2;D;2023-01-01;2024-01-01;No\n' + \
+                         'john;T3;D;2023-01-01;2023-01-01;No\n' + \
+                         'mary;T5;D;2023-01-01;2023-01-01;No')
+        # Tasks reloaded with the other session's change.
+        self.assertTrue(self.model.is_task_completed(0))
+
+    def test_conflict_keeps_ours(self):
+        '''
+           Test a field changed by both sessions keeps this session's value.
+        '''
+        logging.info('test_conflict_keeps_ours')
+
+        self.model.get_all_tasks('admin')
+        self.write('\n'.join(['mary' + self.ROWS[0][5:]] + self.ROWS[1:]))
+        self.model.edit_user(0, 'john')
+        with self.assertLogs(local_model.logger, 'WARNING'):
+            self.model.save_tasks()
+        self.assertTrue(self.read().startswith('john;T1'))
+
+    def test_removal_merged(self):
+        '''
+           Test rows removed by another session are matched by content.
+        '''
+        logging.info('test_removal_merged')
+
+        self.model.get_all_tasks('admin')
+        self.write('\n'.join(self.ROWS[1:]))
+        self.model.mark_as_completed(1)
+        self.model.save_tasks()
+        # Rows of others follow ours.
+        self.assertEqual(self.read(),
+                         'admin;T3;D;2023-01-01;2023-01-01;Yes\n' + \
+                         'tester;T2;D;2023-01-01;2023-01-01;No')
+        self.assertEqual(self.model.get_all_tasks('admin')[1], [0])
+
+    def test_owners_save_together(self):
+        '''
+           Test sessions of different owners sharing the file keep each
+           other's rows through edits, additions and removals.
+        '''
+        logging.info('test_owners_save_together')
+
+        tester = local_model.Model(taskfile=self.taskfile, by_owner=True)
+        self.model.get_all_tasks('admin')
+        tester.get_all_tasks('tester')
+
+        self.model.mark_as_completed(1)
+        self.model.save_tasks()
+        tester.edit_date(0, '2024-01-01')
+        tester.add_task(['tester', 'T4', 'D', '2023-01-01', '2023-01-01', 'No'])
+        tester.save_tasks()
+        self.model.tasks.remove(0)
+        self.model.save_tasks()
+        tester.mark_as_completed(1)
+        tester.save_tasks()
+
+        self.assertEqual(sorted(self.read().split('\n')), [
+            'admin;T3;D;2023-01-01;2023-01-01;Yes',
+            'tester;T2;D;2024-01-01;2023-01-01;No',
+            'tester;T4;D;2023-01-01;2023-01-01;Yes'])
+        self.assertEqual(owner_index.load(self.taskfile).rows, 3)
+        # Written through the file handler.
+        self.assertFalse(tester.taskfile.stale())
+        self.assertEqual(len(self.model.get_all_tasks('admin')[1]), 1)
+        self.assertEqual(len(tester.get_all_tasks('tester')[1]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from src import logs
+
+logger = logging.getLogger(__name__)
+
+
+class Recorder(logging.Handler):
+    '''
+       Handler keeping formatted records and the threads writing them.
+    '''
+
+    def __init__(self) -> None:
+        super(Recorder, self).__init__()
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.current_thread())
+        self.lines.append(self.format(record))
+
+
+class Late():
+    '''
+       Argument recording whether it was turned into text.
+    '''
+
+    def __init__(self) -> None:
+        self.formatted = False
+
+    def __str__(self) -> str:
+        self.formatted = True
+        return 'late'
+
+
+class TestLogs(unittest.TestCase):
+
+    def setUp(self) -> None:
+        root = logging.getLogger('')
+        self.level, self.handlers = root.level, root.handlers[:]
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        logs.stop()
+        root = logging.getLogger('')
+        root.setLevel(self.level)
+        root.handlers[:] = self.handlers
+        return super().tearDown()
+
+    def test_records_reach_sink(self):
+        '''
+           Test records are written by the listener thread.
+        '''
+        logging.info('test_records_reach_sink')
+
+        sink = Recorder()
+        logs.setup(sink, level=logging.INFO, fmt='text')
+        logger.info('Loaded %s tasks of %s', 3, 'admin')
+        logger.debug('Dropped %s', 'debug')
+        logs.stop()
+        self.assertEqual(len(sink.lines), 1)
+        self.assertTrue(sink.lines[0].endswith('INFO - Loaded 3 tasks of admin'))
+        self.assertNotIn(threading.current_thread(), sink.threads)
+
+    def test_lazy_format(self):
+        '''
+           Test arguments are formatted by the listener, not the caller.
+        '''
+        logging.info('test_lazy_format')
+
+        sink = Recorder()
+        release = threading.Event()
+        blocked = logging.Filter()
+        blocked.filter = lambda record: release.wait() or True
+        sink.addFilter(blocked)
+        # Other root handlers would format records in the caller.
+        logging.getLogger('').handlers.clear()
+        logs.setup(sink, level=logging.INFO)
+        late = Late()
+        logger.info('Marked task %s as completed', late)
+        formatted = late.formatted
+        release.set()
+        logs.stop()
+        self.assertFalse(formatted)
+        self.assertTrue(late.formatted)
+        self.assertTrue(sink.lines[-1].endswith('Marked task late as completed'))
+
+    def test_json_file(self):
+        '''
+           Test file sink writes one JSON object per record.
+        '''
+        logging.info('test_json_file')
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'LOG')
+            logs.setup(path, level=logging.INFO, max_bytes=10_000, fmt='json')
+            logger.warning('Waited %.3f s for %s lock', 0.25, 'shared')
+            try:
+                raise ValueError('bad')
+            except ValueError:
+                logger.exception('Failed')
+            logs.stop()
+            with open(path) as f:
+                entries = [json.loads(line) for line in f]
+        self.assertEqual(entries[0]['message'], 'Waited 0.250 s for shared lock')
+        self.assertEqual(entries[0]['level'], 'WARNING')
+        self.assertEqual(entries[0]['name'], __name__)
+        self.assertIn('ValueError: bad', entries[1]['exception'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import logging
+
+from src.task_master import merge
+
+logger = logging.getLogger(__name__)
+
+
+class TestMerge(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.base = [('admin', 'T1', 'No'), ('tester', 'T2', 'No')]
+        return super().setUp()
+
+    def test_merge_row(self):
+        '''
+           Test field by field merge of a row.
+        '''
+        logging.info('test_merge_row')
+
+        base = ('admin', 'T1', 'No')
+        self.assertEqual(merge.merge_row(base, base, ('john', 'T1', 'No')),
+                         (('john', 'T1', 'No'), []))
+        self.assertEqual(merge.merge_row(base, ('admin', 'T1', 'Yes'), base),
+                         (('admin', 'T1', 'Yes'), []))
+        self.assertEqual(merge.merge_row(base, ('admin', 'T1', 'Yes'),
+                                         ('john', 'T1', 'No')),
+                         (('john', 'T1', 'Yes'), []))
+        # Our value is kept on conflict.
+        self.assertEqual(merge.merge_row(base, ('mary', 'T1', 'No'),
+                                         ('john', 'T1', 'No')),
+                         (('mary', 'T1', 'No'), [0]))
+
+    def test_merge_by_index(self):
+        '''
+           Test merge of edited and appended rows.
+        '''
+        logging.info('test_merge_by_index')
+
+        ours = [('admin', 'T1', 'Yes'), ('tester', 'T2', 'No'),
+                ('john', 'T3', 'No')]
+        theirs = [('admin', 'T1', 'No'), ('mary', 'T2', 'No'),
+                  ('mary', 'T4', 'No')]
+        rows, conflicts = merge.merge_rows(self.base, ours, theirs)
+        self.assertEqual(rows, [('admin', 'T1', 'Yes'), ('mary', 'T2', 'No'),
+                                ('mary', 'T4', 'No'), ('john', 'T3', 'No')])
+        self.assertEqual(conflicts, [])
+
+        rows, conflicts = merge.merge_rows(
+            self.base, [('john', 'T1', 'No'), self.base[1]],
+            [('mary', 'T1', 'No'), self.base[1]])
+        self.assertEqual(rows[0], ('john', 'T1', 'No'))
+        self.assertEqual(conflicts, [(0, 0)])
+
+    def test_merge_with_removals(self):
+        '''
+           Test merge once rows were removed.
+        '''
+        logging.info('test_merge_with_removals')
+
+        # We removed first row, they removed second and added one.
+        rows, _ = merge.merge_rows(self.base, [self.base[1]],
+                                   [self.base[0], ('mary', 'T4', 'No')],
+                                   removed=True)
+        self.assertEqual(rows, [('mary', 'T4', 'No')])
+        # They removed first row, we edited second.
+        rows, _ = merge.merge_rows(self.base,
+                                   [self.base[0], ('tester', 'T2', 'Yes')],
+                                   [self.base[1]])
+        self.assertEqual(rows, [('tester', 'T2', 'Yes')])
+
+    def test_merge_remove_and_edit(self):
+        '''
+           Test rows edited by both are merged once rows were removed.
+        '''
+        logging.info('test_merge_remove_and_edit')
+
+        base = [('admin', 'T1', '2030'), ('tester', 'T2', '2030'),
+                ('tester', 'T3', '2030')]
+        # We removed first row and changed the date of second, they
+        # changed its owner.
+        ours = [('tester', 'T2', '2031'), base[2]]
+        theirs = [base[0], ('john', 'T2', '2030'), base[2]]
+        rows, conflicts = merge.merge_rows(base, ours, theirs, removed=True)
+        self.assertEqual(rows, [('john', 'T2', '2031'), base[2]])
+        self.assertEqual(conflicts, [])
+        # Both changed the date.
+        theirs = [base[0], ('tester', 'T2', '2032'), base[2]]
+        rows, conflicts = merge.merge_rows(base, ours, theirs, removed=True)
+        self.assertEqual(rows, [('tester', 'T2', '2031'), base[2]])
+        self.assertEqual(conflicts, [(0, 2)])
+
+    def test_merge_remove_and_add(self):
+        '''
+           Test rows they removed and added as many are told apart.
+        '''
+        logging.info('test_merge_remove_and_add')
+
+        # They removed first row and added one, we edited second.
+        theirs = [self.base[1], ('mary', 'T4', 'No')]
+        ours = [self.base[0], ('tester', 'T2', 'Yes')]
+        rows, conflicts = merge.merge_rows(self.base, ours, theirs)
+        self.assertEqual(rows, [('tester', 'T2', 'Yes'), ('mary', 'T4', 'No')])
+        self.assertEqual(conflicts, [])
+
+    def test_merge_subset(self):
+        '''
+           Test merge of rows at some positions of a file.
+        '''
+        logging.info('test_merge_subset')
+
+        # Our rows are file rows 1 and 3, they changed both.
+        base = [('admin', 'T1', 'No'), ('admin', 'T3', 'No')]
+        ours = [('admin', 'T1', 'Yes'), ('john', 'T3', 'No')]
+        theirs = {1: ('admin', 'T1', 'No'), 3: ('mary', 'T3', 'Yes')}
+        rows, conflicts = merge.merge_subset(base, ours, [1, 3], theirs)
+        self.assertEqual(rows, {1: ('admin', 'T1', 'Yes'),
+                                3: ('john', 'T3', 'Yes')})
+        self.assertEqual(conflicts, [(3, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
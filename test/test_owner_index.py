@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import logging
+from src.task_master import owner_index
+
+logger = logging.getLogger(__name__)
+
+
+class TestOwnerIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.taskfile = os.path.join(self.dir.name, 'TASK')
+        self.write('admin;T1\nadmin;T2\ntester;T3\nadmin;T4')
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+        return super().tearDown()
+
+    def write(self, text: str) -> None:
+        with open(self.taskfile + '.new', 'w') as f:
+            f.write(text)
+        os.replace(self.taskfile + '.new', self.taskfile)
+
+    def test_scan(self):
+        '''
+           Test consecutive rows of an owner share a byte range.
+        '''
+        logging.info('test_scan')
+
+        index = owner_index.scan(self.taskfile)
+        self.assertEqual(index.rows, 4)
+        self.assertEqual(index.runs, {'admin': [(0, 0, 17), (3, 28, 36)],
+                                      'tester': [(2, 18, 27)]})
+        self.assertEqual(index.read(self.taskfile, 'admin'),
+                         [(0, 'admin;T1'), (1, 'admin;T2'), (3, 'admin;T4')])
+        self.assertEqual(index.read(self.taskfile, 'nobody'), [])
+
+    def test_crlf_file(self):
+        '''
+           Test rows of a file with CRLF line endings are read without them.
+        '''
+        logging.info('test_crlf_file')
+
+        with open(self.taskfile, 'wb') as f:
+            f.write(b'admin;T1;Yes\r\ntester;T3;No\r\nadmin;T4;Yes\r\n')
+        index = owner_index.scan(self.taskfile)
+        self.assertEqual(index.rows, 3)
+        self.assertEqual(index.read(self.taskfile, 'admin'),
+                         [(0, 'admin;T1;Yes'), (2, 'admin;T4;Yes')])
+        self.assertEqual(index.read(self.taskfile, 'tester'), [(1, 'tester;T3;No')])
+
+    def test_dump_load(self):
+        '''
+           Test index is kept next to the file until the file changes.
+        '''
+        logging.info('test_dump_load')
+
+        self.assertIsNone(owner_index.load(self.taskfile))
+        index = owner_index.get(self.taskfile)
+        self.assertEqual(owner_index.load(self.taskfile), index)
+        self.write('tester;T3')
+        self.assertIsNone(owner_index.load(self.taskfile))
+        self.assertEqual(owner_index.get(self.taskfile).runs,
+                         {'tester': [(0, 0, 9)]})
+
+    def test_empty_file(self):
+        '''
+           Test an empty file has no rows.
+        '''
+        logging.info('test_empty_file')
+
+        self.write('')
+        index = owner_index.get(self.taskfile)
+        self.assertEqual((index.rows, index.runs), (0, {}))
+        self.assertEqual(owner_index.load(self.taskfile), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
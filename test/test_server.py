@@ -0,0 +1,215 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import logging
+from http.client import HTTPConnection
+from unittest import mock
+from src import config, server, user_manager
+from src.file_handler import FileHandler
+from src.task_master import local_model
+
+logger = logging.getLogger(__name__)
+
+
+class TestServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.hashed = user_manager.default_hasher.hash('pwd')
+        return super().setUpClass()
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        path = lambda name: os.path.join(self.dir.name, name)
+        with open(path('TASK'), 'w') as f:
+            f.write('admin;T1;D;2023-01-01;2023-01-01;No\n' + \
+                    'tester;T2;D;2023-01-01;2023-01-01;No')
+        with open(path('USER'), 'w') as f:
+            f.write(f'admin;{self.hashed}\ntester;{self.hashed}')
+        self.taskfile = path('TASK')
+        model = local_model.Model(taskfile=self.taskfile,
+                                  u_report_file=path('USER_REPORT'),
+                                  t_report_file=path('TASK_REPORT'))
+        users = user_manager.UserManager(filename=path('USER'))
+        self.server = server.Server(server.Service(users, model),
+                                    ('127.0.0.1', 0), workers=2)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.connection = HTTPConnection('127.0.0.1', self.server.server_address[1])
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        for handler in list(FileHandler.handlers.values()):
+            handler.close()
+        self.dir.cleanup()
+        return super().tearDown()
+
+    def request(self, method: str, path: str, body=None, token=None):
+        '''
+           Sends request on the kept alive connection.
+
+           Returns status and decoded JSON body.
+        '''
+
+        headers = {'Content-Type': 'application/json'}
+        if token: headers['Authorization'] = f'Bearer {token}'
+        self.connection.request(method, path, headers=headers,
+                                body=None if body is None else json.dumps(body))
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def login(self, user: str) -> str:
+        status, body = self.request('POST', '/login',
+                                    {'user': user, 'password': 'pwd'})
+        self.assertEqual(status, 200)
+        return body['token']
+
+    def test_login(self):
+        '''
+           Test sessions are required and granted by login.
+        '''
+        logging.info('test_login')
+
+        self.assertEqual(self.request('GET', '/tasks')[0], 401)
+        self.assertEqual(self.request('POST', '/login',
+                                      {'user': 'admin', 'password': 'x'})[0], 401)
+        token = self.login('admin')
+        self.assertEqual(self.request('GET', '/tasks', token=token)[0], 200)
+        self.assertEqual(self.request('POST', '/logout', token=token)[0], 200)
+        self.assertEqual(self.request('GET', '/tasks', token=token)[0], 401)
+        self.assertEqual(self.request('GET', '/nowhere', token=token)[0], 404)
+
+    def test_tasks(self):
+        '''
+           Test listing, adding, editing and completing tasks.
+        '''
+        logging.info('test_tasks')
+
+        token = self.login('tester')
+        status, body = self.request('GET', '/tasks', token=token)
+        self.assertEqual([task['id'] for task in body['tasks']], [1])
+        status, body = self.request('GET', '/tasks?owner=*', token=token)
+        self.assertEqual([task['id'] for task in body['tasks']], [0, 1])
+
+        status, _ = self.request('POST', '/tasks', {
+            'owner': 'tester', 'title': 'T3', 'description': 'D',
+            'due_date': '2023-02-01'}, token=token)
+        self.assertEqual(status, 200)
+        # Cached list was dropped by the write.
+        status, body = self.request('GET', '/tasks', token=token)
+        self.assertEqual([task['id'] for task in body['tasks']], [1, 2])
+
+        status, body = self.request('PATCH', '/tasks/2',
+                                    {'due_date': '2023-03-01'}, token=token)
+        self.assertEqual(status, 200)
+        self.assertIn('2023-03-01', body['text'])
+        self.assertEqual(self.request('PATCH', '/tasks/2', {'due_date': 'soon'},
+                                      token=token)[0], 400)
+        status, body = self.request('POST', '/tasks/1/complete', token=token)
+        self.assertTrue(body['completed'])
+        # Saved on every write.
+        with open(self.taskfile) as f:
+            self.assertIn('tester;T2;D;2023-01-01;2023-01-01;Yes', f.read())
+
+        # Tasks of others.
+        self.assertEqual(self.request('POST', '/tasks/0/complete',
+                                      token=token)[0], 403)
+        self.assertEqual(self.request('GET', '/tasks/42', token=token)[0], 404)
+
+    def test_rejects_field_breaks(self):
+        '''
+           Test fields cannot split the row they are written to.
+        '''
+        logging.info('test_rejects_field_breaks')
+
+        token = self.login('tester')
+        row = 'admin;Injected;evil;2030-01-01;2024-01-01;Yes'
+        for field, value in [('description', 'hi\n' + row), ('title', 'a;b'),
+                             ('owner', 'tes\rter'), ('due_date', '2030-01-01\n;')]:
+            body = {'owner': 'tester', 'title': 'T3', 'description': 'D',
+                    'due_date': '2023-02-01', field: value}
+            self.assertEqual(self.request('POST', '/tasks', body, token=token)[0], 400)
+        self.assertEqual(self.request('PATCH', '/tasks/1', {'owner': 'tester\n' + row},
+                                      token=token)[0], 400)
+        with open(self.taskfile) as f:
+            self.assertNotIn('Injected', f.read())
+        self.assertEqual(len(local_model.Model(taskfile=self.taskfile).get_all_tasks()[1]), 2)
+
+    def test_stats(self):
+        '''
+           Test statistics are only for admins.
+        '''
+        logging.info('test_stats')
+
+        self.assertEqual(self.request('GET', '/stats',
+                                      token=self.login('tester'))[0], 403)
+        status, body = self.request('GET', '/stats', token=self.login('admin'))
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['users']), 2)
+
+    def test_login_checks_password_unlocked(self):
+        '''
+           Test password checks run without the user lock.
+        '''
+        logging.info('test_login_checks_password_unlocked')
+
+        service = self.server.service
+        check = service.user.check_password
+        def check_password(*args):
+            self.assertFalse(service._user_lock.locked())
+            return check(*args)
+
+        with mock.patch.object(service.user, 'check_password', check_password):
+            body = service.login({'user': 'admin', 'password': 'pwd'})
+        self.assertTrue(body['admin'])
+        self.assertIsNone(service.user.user_logged)
+
+    def test_sessions_expire(self):
+        '''
+           Test expired sessions are dropped.
+        '''
+        logging.info('test_sessions_expire')
+
+        sessions = server.Sessions(ttl=-1)
+        token = sessions.create('admin', True)
+        sessions.create('tester', False)
+        self.assertEqual(len(sessions), 1)
+        self.assertRaises(server.APIError, sessions.get, token)
+        self.assertEqual(len(sessions), 0)
+
+    def test_body_too_large(self):
+        '''
+           Test bodies over config.SERVER_MAX_BODY are not read.
+        '''
+        logging.info('test_body_too_large')
+
+        self.connection.putrequest('POST', '/login')
+        self.connection.putheader('Content-Length', str(config.SERVER_MAX_BODY + 1))
+        self.connection.endheaders()
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 413)
+        self.assertTrue(response.will_close)
+
+    def test_read_cache(self):
+        '''
+           Test entries are only returned for the generation they were built at.
+        '''
+        logging.info('test_read_cache')
+
+        cache = server.ReadCache(size=2)
+        cache.put('a', 0, 1)
+        self.assertEqual(cache.get('a', 0), 1)
+        self.assertIsNone(cache.get('a', 1))
+        cache.put('b', 0, 2)
+        cache.put('c', 0, 3)
+        self.assertIsNone(cache.get('a', 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
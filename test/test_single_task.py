@@ -144,6 +144,23 @@ class TestSingleTask(unittest.TestCase):
         # Task username and due date should not have changed.
         self.assertEqual(mock_call.call_count, 3)
 
+    def test_due_ordinal(self):
+        '''
+           Test due date ordinal and its reset on date change.
+        '''
+        logging.info('test_due_ordinal')
+
+        tomorrow = (self.now+self.delta).date().toordinal()
+        self.assertEqual(self.testing_task.due_ordinal, tomorrow)
+        self.assertTrue(self.testing_task.edit_date('1979-10-12'))
+        self.assertEqual(self.testing_task.due_ordinal,
+                         datetime(1979, 10, 12).toordinal())
+        self.assertTrue(self.testing_task.isOverdue)
+        # Set without edit_date.
+        self.testing_task.due_date = '2999-01-01'
+        self.assertEqual(self.testing_task.due_ordinal,
+                         datetime(2999, 1, 1).toordinal())
+
     def test_data_attribute(self):
          '''
             Test data attribute.
@@ -152,4 +169,75 @@ class TestSingleTask(unittest.TestCase):
 
          # Data attribute must be a dictionary.
          self.assertIsInstance(self.testing_task.data, dict)
-         self.assertEqual(self.testing_task.data, self.data)
\ No newline at end of file
+         self.assertEqual(self.testing_task.data, self.data)
+
+
+##############################################
+#                                            #
+#                 TASK VIEW                  #
+#                                            #
+##############################################
+class TestTaskView(unittest.TestCase):
+    def setUp(self) -> None:
+        self.row = {
+            single_task.TASK_LABELS[0]: 'Tester',
+            single_task.TASK_LABELS[1]: 'Test',
+            single_task.TASK_LABELS[2]: 'Test Task',
+            single_task.TASK_LABELS[3]: '2000-01-01',
+            single_task.TASK_LABELS[4]: '2000-01-01',
+            single_task.TASK_LABELS[5]: 'No',
+            }
+        self.callback = mock.MagicMock()
+        self.view = single_task.TaskView(self.row, self.callback)
+        return super().setUp()
+
+    def test_reads_row(self):
+        '''
+           Test view reads like a task built from the row.
+        '''
+        logging.info('test_reads_row')
+
+        task = single_task.SingleTask(**self.row) # type: ignore
+        self.assertEqual(self.view.summary, task.summary)
+        self.assertEqual(str(self.view), str(task))
+        self.assertEqual(self.view.data, task.data)
+        self.assertTrue(self.view.isOverdue)
+
+    def test_writes_row(self):
+        '''
+           Test edits are written to the row and flagged.
+        '''
+        logging.info('test_writes_row')
+
+        self.view.edit_user('Douglas Adams')
+        self.view.edit_date('2999-01-01')
+        self.assertEqual(self.row[single_task.TASK_LABELS[0]], 'Douglas Adams')
+        self.assertFalse(self.view.isOverdue)
+        self.view.mark_as_completed()
+        self.assertEqual(self.row[single_task.TASK_LABELS[5]], 'Yes')
+        self.assertEqual(self.callback.call_count, 3)
+
+    def test_point_and_detach(self):
+        '''
+           Test moving view to other row and detaching it.
+        '''
+        logging.info('test_point_and_detach')
+
+        other = dict(self.row, due_date='2999-01-01')
+        self.assertTrue(self.view.isOverdue)
+        self.assertFalse(self.view.point(other).isOverdue)
+        self.view.detach()
+        self.view.edit_user('Douglas Adams')
+        self.assertEqual(other[single_task.TASK_LABELS[0]], 'Tester')
+
+    def test_due_follows_row(self):
+        '''
+           Test due date ordinal follows the row however it changes.
+        '''
+        logging.info('test_due_follows_row')
+
+        self.assertTrue(self.view.isOverdue)
+        self.row[single_task.TASK_LABELS[3]] = '2999-01-01'
+        self.assertFalse(self.view.isOverdue)
+        self.view.due_date = '2000-01-01'
+        self.assertTrue(self.view.isOverdue)
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import unittest
+import logging
+from unittest import mock
+from datetime import datetime, timedelta
+from src.file_handler import FileHandler
+from src.task_master import sqlite_model, single_task, tasks
+
+logger = logging.getLogger(__name__)
+
+
+class TestSQLiteModel(unittest.TestCase):
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        now = datetime.now()
+        self.tomorrow = (now+timedelta(days=1)).strftime(
+            single_task.DATETIME_STRING_FORMAT)
+        self.yesterday = (now-timedelta(days=1)).strftime(
+            single_task.DATETIME_STRING_FORMAT)
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        path = lambda name: os.path.join(self.dir.name, name)
+        self.model = sqlite_model.Model(
+            taskfile=path('TASK'),
+            u_report_file=path('USER_REPORT'),
+            t_report_file=path('TASK_REPORT'),
+            database=path('DB'))
+        for owner, due, completed in [('admin', self.tomorrow, 'No'),
+                                      ('tester', self.yesterday, 'No'),
+                                      ('admin', self.yesterday, 'Yes')]:
+            self.model.add_task([owner, 'Title', 'Description',
+                                 due, self.yesterday, completed])
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        for handler in list(FileHandler.handlers.values()):
+            handler.close()
+        self.dir.cleanup()
+        return super().tearDown()
+
+    def test_get_all_tasks(self):
+        '''
+           Test listing tasks of one owner and of all owners.
+        '''
+        logging.info('test_get_all_tasks')
+
+        out, index = self.model.get_all_tasks('admin')
+        self.assertEqual(index, [1, 3])
+        self.assertTrue(out[0].endswith(f'Status: {tasks.STAT_LABELS[2]}'))
+        self.assertTrue(out[1].endswith(f'Status: {tasks.STAT_LABELS[0]}'))
+
+        out, index = self.model.get_all_tasks()
+        self.assertEqual(index, [1, 2, 3])
+        self.assertTrue(out[1].endswith(f'Status: {tasks.STAT_LABELS[1]}'))
+
+    def test_edit_user(self):
+        '''
+           Test changing owner of a task.
+        '''
+        logging.info('test_edit_user')
+
+        self.assertTrue(self.model.edit_user(2, 'admin'))
+        self.assertEqual(self.model.get_all_tasks('admin')[1], [1, 2, 3])
+        self.assertFalse(self.model.edit_user(42, 'admin'))
+        # Completed task cannot be changed.
+        self.assertRaises(single_task.taskError,
+                          lambda: self.model.edit_user(3, 'tester'))
+
+    def test_edit_date(self):
+        '''
+           Test changing due date of a task.
+        '''
+        logging.info('test_edit_date')
+
+        self.assertTrue(self.model.edit_date(2, self.tomorrow))
+        self.assertIn(f'Due Date: \t {self.tomorrow}', self.model.get_task(2))
+        self.assertRaises(single_task.taskError,
+                          lambda: self.model.edit_date(2, 'tomorrow'))
+
+    def test_mark_as_completed(self):
+        '''
+           Test marking a task as completed.
+        '''
+        logging.info('test_mark_as_completed')
+
+        self.assertFalse(self.model.is_task_completed(1))
+        self.model.mark_as_completed(1)
+        self.assertTrue(self.model.is_task_completed(1))
+        self.assertFalse(self.model.is_task_completed(42))
+
+    def test_edit_many(self):
+        '''
+           Test batch edit with per row errors.
+        '''
+        logging.info('test_edit_many')
+
+        result = self.model.reassign_tasks('tester', [1, 3, 42])
+        self.assertEqual(result.applied, [1])
+        self.assertEqual(set(result.errors), {3, 42})
+        self.assertEqual(self.model.get_all_tasks('tester')[1], [1, 2])
+        result = self.model.complete_tasks(
+            where=lambda task: task.owner == 'tester')
+        self.assertEqual(result.applied, [1, 2])
+        self.assertTrue(self.model.is_task_completed(2))
+
+    def test_get_task_stats(self):
+        '''
+           Test statistics grouped in SQL.
+        '''
+        logging.info('test_get_task_stats')
+
+        stats = self.model.get_task_stats(['admin', 'tester'])
+        self.assertEqual(stats._stats, {
+            ('admin', tasks.STAT_LABELS[0]): 1,
+            ('admin', tasks.STAT_LABELS[2]): 1,
+            ('tester', tasks.STAT_LABELS[1]): 1})
+
+    def test_unpadded_due_dates(self):
+        '''
+           Test status of due dates written without zero padding.
+        '''
+        logging.info('test_unpadded_due_dates')
+
+        for due in ['2024-10-9', '2024-9-30', '2024-11-1']:
+            self.model.add_task(['john', 'Title', 'Description',
+                                 due, '2024-1-1', 'No'])
+        today = single_task.to_ordinal('2024-10-17')
+        with mock.patch.object(sqlite_model, 'today_ordinal',
+                               return_value=today):
+            out, _ = self.model.get_all_tasks('john')
+            stats = self.model.get_task_stats(['john'])
+        self.assertEqual([line.rsplit('Status: ', 1)[1] for line in out],
+                         [tasks.STAT_LABELS[1], tasks.STAT_LABELS[1],
+                          tasks.STAT_LABELS[2]])
+        self.assertEqual({key: number for key, number in stats._stats.items()
+                          if key[0] == 'john'}, {
+            ('john', tasks.STAT_LABELS[1]): 2,
+            ('john', tasks.STAT_LABELS[2]): 1})
+
+    def test_import_scsv(self):
+        '''
+           Test one-shot import of a SCSV task file.
+        '''
+        logging.info('test_import_scsv')
+
+        filename = os.path.join(self.dir.name, 'IMPORT')
+        handler = sqlite_model.SQLiteFileHandler(
+            filename, labels=tasks.TASK_LABELS,
+            database=os.path.join(self.dir.name, 'DB'))
+        with open(filename, 'w') as f:
+            f.write('john;T;D;2023-01-01;2023-01-01;No\nmary;T;D')
+
+        self.assertEqual(handler.import_scsv(), 2)
+        # Only into an empty table.
+        self.assertEqual(handler.import_scsv(), 0)
+        handler.load()
+        self.assertEqual(handler.buffer[1][tasks.TASK_LABELS[0]], 'mary')
+        self.assertEqual(handler.buffer[1][tasks.TASK_LABELS[5]], '')
+
+
+if __name__ == '__main__':
+    unittest.main()
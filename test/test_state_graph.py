@@ -0,0 +1,95 @@
+import json
+import unittest
+import logging
+from src import config
+from src.state_graph import StateGraph, StateGraphError
+
+logger = logging.getLogger(__name__)
+
+
+def make_config(*states, start='menu'):
+    return {'start_state': start, 'states': list(states)}
+
+MENU = {'name': 'menu', 'name_of_type': 'selection', 'source': 'not user',
+        'options': ['list', 'exit']}
+LIST = {'name': 'list', 'name_of_type': 'presentation', 'next': 'menu'}
+EXIT = {'name': 'exit', 'name_of_type': 'Null'}
+
+
+class TestStateGraph(unittest.TestCase):
+
+    def test_app_config(self):
+        '''
+           Test the app configuration compiles with every state reachable.
+        '''
+        logging.info('test_app_config')
+
+        with open(config._APP_STATE_CONFIG_) as f:
+            config_data = json.load(f)
+        graph = StateGraph.compile(config_data)
+        self.assertEqual(graph.reachable(), {state['name'] for state in config_data['states']})
+
+    def test_lookup(self):
+        '''
+           Test states resolve to frozen settings and 'Null' ends the app.
+        '''
+        logging.info('test_lookup')
+
+        graph = StateGraph.compile(make_config(MENU, LIST, EXIT))
+        node = graph.get('menu')
+        self.assertEqual(node.controller.__module__, 'src.selection.controller')
+        self.assertEqual(node.view.__module__, 'src.selection.prompt')
+        self.assertEqual(node.targets, ('list', 'exit'))
+        self.assertEqual(node.settings['options'], ('list', 'exit'))
+        with self.assertRaises(TypeError):
+            node.settings['options'] = ()
+        self.assertIsNone(graph.get('exit'))
+        self.assertIsNone(graph.get('Null'))
+        with self.assertLogs('src.state_graph', logging.ERROR):
+            self.assertIsNone(graph.get('nowhere'))
+
+    def test_user_options(self):
+        '''
+           Test options taken from user tasks are not targets.
+        '''
+        logging.info('test_user_options')
+
+        mine = {'name': 'menu', 'name_of_type': 'selection', 'options': ['T1'],
+                'next': 'exit'}
+        graph = StateGraph.compile(make_config(mine, EXIT))
+        self.assertEqual(graph.get('menu').targets, ('exit',))
+
+    def test_problems(self):
+        '''
+           Test dangling targets, missing modules and bad start are reported.
+        '''
+        logging.info('test_problems')
+
+        dangling = dict(LIST, next='nowhere')
+        missing = {'name': 'broken', 'name_of_type': 'no_such_type', 'next': 'menu'}
+        with self.assertRaises(StateGraphError) as error:
+            StateGraph.compile(make_config(MENU, dangling, missing, EXIT, start='begin'))
+        problems = '\n'.join(error.exception.problems)
+        self.assertIn("'nowhere'", problems)
+        self.assertIn('src.no_such_type.controller', problems)
+        self.assertIn("'begin'", problems)
+        self.assertEqual(len(error.exception.problems), 3)
+
+        with self.assertRaises(StateGraphError):
+            StateGraph.compile(make_config(start='menu'))
+
+    def test_unreachable(self):
+        '''
+           Test states not reachable from the start state are logged.
+        '''
+        logging.info('test_unreachable')
+
+        lost = dict(LIST, name='lost')
+        with self.assertLogs('src.state_graph', logging.WARNING) as logs:
+            StateGraph.compile(make_config(MENU, LIST, EXIT, lost))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("'lost'", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+import logging
+from contextlib import redirect_stdout
+from unittest import mock
+from src import fake, task_manager
+from src.state_graph import StateGraph
+
+logger = logging.getLogger(__name__)
+
+# Modules that must wait for first use instead of slowing startup.
+LAZY_MODULES = ['passlib', 'dotenv', 'tkinter', 'sqlite3', 'subprocess',
+                'concurrent.futures.process']
+# Modules the first prompt needs, showing the whole path was run.
+STARTUP_MODULES = ['src.task_manager', 'src.state_graph', 'src.user_manager',
+                   'src.logs']
+
+
+class TestStartup(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Time is checked by '--startup-profile', not here: it varies
+        # too much on shared machines.
+        with tempfile.TemporaryDirectory() as folder:
+            # Data and log files set before the modules using them load.
+            files = {name: os.path.join(folder, name) for name in
+                     ['_USER_FILE_', '_ADMIN_FILE_', '_TASK_FILE_', 'LOG_SINK']}
+            code = f'from src import config\nconfig.__dict__.update({files!r})\n' + \
+                task_manager._FIRST_PROMPT_.format(view=task_manager.DEFAULT_VIEW) + \
+                '\nimport sys\nprint(*sys.modules)'
+            result = subprocess.run([sys.executable, '-c', code],
+                                    capture_output=True, text=True, check=True)
+        cls.imported = set(result.stdout.split())
+        return super().setUpClass()
+
+    def test_first_prompt_path(self):
+        '''
+           Test the profiled statement runs everything up to the first prompt.
+        '''
+        logging.info('test_first_prompt_path')
+
+        for module in STARTUP_MODULES:
+            self.assertIn(module, self.imported)
+
+    def test_lazy_imports(self):
+        '''
+           Test heavy dependencies are not imported before the first prompt.
+        '''
+        logging.info('test_lazy_imports')
+
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, self.imported)
+
+
+class TestBackgroundModel(unittest.TestCase):
+
+    def test_waits_for_load(self):
+        '''
+           Test the model loads meanwhile and is waited for on first use.
+        '''
+        logging.info('test_waits_for_load')
+
+        release = threading.Event()
+        def factory():
+            release.wait()
+            return mock.Mock(**{'get_all_tasks.return_value': (['T1'], [0])})
+
+        model = task_manager.BackgroundModel(factory)
+        self.assertFalse(model.ready())
+        threading.Timer(.05, release.set).start()
+        self.assertEqual(model.get_all_tasks('admin'), (['T1'], [0]))
+        self.assertTrue(model.ready())
+
+    def test_load_failure(self):
+        '''
+           Test a failed load ends the app at the first state using the model.
+        '''
+        logging.info('test_load_failure')
+
+        def factory():
+            raise OSError('no task file')
+
+        model = task_manager.BackgroundModel(factory)
+        with self.assertRaises(task_manager.ModelLoadError):
+            model.result()
+
+        graph = StateGraph.compile({'start_state': 'done', 'states': [
+            {'name': 'done', 'name_of_type': 'action', 'option': 'completed',
+             'next': 'done'}]})
+        app = task_manager.TaskManager(user=fake.FakeUser(), model=model,
+                                       start='done', graph=graph)
+        with redirect_stdout(io.StringIO()) as out:
+            app.run()
+        self.assertIn('no task file', out.getvalue())
+        self.assertFalse(hasattr(task_manager.TaskManager, 'instance'))
+
+
+if __name__ == '__main__':
+    unittest.main()
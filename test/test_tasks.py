@@ -209,4 +209,204 @@ class TestTasksAddRemove(unittest.TestCase):
         # Check stats with two 'Ongoing' and one 'Done'.
         answer = [tasks.STAT_LABELS[2],tasks.STAT_LABELS[2],tasks.STAT_LABELS[0]]
         self.assertEqual(self.testing_tasks.get_stats(), answer)
-        
\ No newline at end of file
+        
+    #########
+    # OWNER #
+    #########
+    def test_list_tasks_by_owner(self):
+        '''
+           Test listing tasks of one owner.
+        '''
+        logging.info('test_list_tasks_by_owner')
+
+        # Add second and third tasks to another owner.
+        other = dict(self.data)
+        other[tasks.TASK_LABELS[0]] = 'Other'
+        self.testing_tasks.extend([other, self.data, other])
+        # Only indices of tasks owned by 'Other'.
+        self.assertEqual(self.testing_tasks.list_tasks('Other')[1], [1, 3])
+        self.assertEqual(self.testing_tasks.list_tasks('Nobody'), ([], []))
+        # Any non string owner lists all tasks.
+        self.assertEqual(self.testing_tasks.list_tasks()[1], [0, 1, 2, 3])
+
+    def test_owner_index_follows_edit_user(self):
+        '''
+           Test owner index after changing a task owner.
+        '''
+        logging.info('test_owner_index_follows_edit_user')
+
+        self.testing_tasks.extend([self.data])
+        self.testing_tasks[1].edit_user('Other')
+        self.assertEqual(self.testing_tasks.list_tasks('Other')[1], [1])
+        self.assertEqual(self.testing_tasks.list_tasks('Tester')[1], [0])
+
+    def test_owner_index_follows_remove(self):
+        '''
+           Test owner index after removing a task.
+        '''
+        logging.info('test_owner_index_follows_remove')
+
+        other = dict(self.data)
+        other[tasks.TASK_LABELS[0]] = 'Other'
+        self.testing_tasks.extend([other])
+        self.testing_tasks.remove(0)
+        self.assertEqual(self.testing_tasks.list_tasks('Other')[1], [0])
+        self.assertEqual(self.testing_tasks.list_tasks('Tester')[1], [])
+
+    def test_owner_index_shifts_on_remove(self):
+        '''
+           Test owner indices after a removed task shift down.
+        '''
+        logging.info('test_owner_index_shifts_on_remove')
+
+        owners = ['A', 'B', 'A', 'C', 'B', 'A']
+        self.testing_tasks.remove(0)
+        self.testing_tasks.extend([dict(self.data, **{tasks.TASK_LABELS[0]: owner})
+                                   for owner in owners])
+        self.testing_tasks.remove(2)
+        self.testing_tasks.remove(2)
+        self.assertEqual(self.testing_tasks.list_tasks('A')[1], [0, 3])
+        self.assertEqual(self.testing_tasks.list_tasks('B')[1], [1, 2])
+        self.assertEqual(self.testing_tasks.list_tasks('C')[1], [])
+
+    def test_classify_with_today(self):
+        '''
+           Test status codes against a given day ordinal.
+        '''
+        logging.info('test_classify_with_today')
+
+        due = single_task.to_ordinal(self.data[single_task.TASK_LABELS[3]])
+        self.assertEqual(self.testing_tasks.classify(today=due),
+                         [tasks.STAT_LABELS[2]])
+        self.assertEqual(self.testing_tasks.classify(today=due+1),
+                         [tasks.STAT_LABELS[1]])
+        # Working task changes are seen without flushing.
+        self.testing_tasks[0].mark_as_completed()
+        self.assertEqual(self.testing_tasks.classify([0], today=due+1),
+                         [tasks.STAT_LABELS[0]])
+
+    def test_status_counts(self):
+        '''
+           Test live status counts follow task changes.
+        '''
+        logging.info('test_status_counts')
+
+        other = dict(self.data)
+        other[tasks.TASK_LABELS[0]] = 'Other'
+        self.testing_tasks.extend([other, self.data])
+        self.testing_tasks[0].mark_as_completed()
+        self.testing_tasks[1].edit_user('Tester')
+        self.testing_tasks.remove(2)
+        self.assertEqual(self.testing_tasks.status_counts(), {
+            ('Tester', tasks.STAT_LABELS[0]): 1,
+            ('Tester', tasks.STAT_LABELS[2]): 1})
+
+    def test_status_counts_roll_over(self):
+        '''
+           Test pending tasks counted as overdue after their due date.
+        '''
+        logging.info('test_status_counts_roll_over')
+
+        due = single_task.to_ordinal(self.data[single_task.TASK_LABELS[3]])
+        key = lambda status: {('Tester', status): 1}
+        self.assertEqual(self.testing_tasks.status_counts(due+1),
+                         key(tasks.STAT_LABELS[1]))
+        # Clock going backwards.
+        self.assertEqual(self.testing_tasks.status_counts(due),
+                         key(tasks.STAT_LABELS[2]))
+
+    def test_view_edits_row_in_place(self):
+        '''
+           Test task access edits the stored row and scans keep the cursor.
+        '''
+        logging.info('test_view_edits_row_in_place')
+
+        self.testing_tasks.extend([self.data])
+        view = self.testing_tasks[1]
+        view.edit_user('Other')
+        self.assertEqual(self.testing_tasks.list_tasks('Other')[1], [1])
+        # Scan did not release the working task.
+        self.assertIs(self.testing_tasks[1], view)
+        self.assertEqual(list(self.testing_tasks)[1][tasks.TASK_LABELS[0]],
+                         'Other')
+
+    def test_released_view_is_detached(self):
+        '''
+           Test edits through a released view do not reach the tasks.
+        '''
+        logging.info('test_released_view_is_detached')
+
+        self.testing_tasks.extend([self.data])
+        view = self.testing_tasks[1]
+        self.testing_tasks.flush()
+        view.edit_user('Other')
+        self.assertEqual(self.testing_tasks.list_tasks('Other'), ([], []))
+        self.assertEqual(list(self.testing_tasks)[1][tasks.TASK_LABELS[0]],
+                         'Tester')
+
+    def test_edit_many(self):
+        '''
+           Test batch edit applies valid edits and reports the others.
+        '''
+        logging.info('test_edit_many')
+
+        self.testing_tasks.extend([self.data, self.data])
+        self.testing_tasks[2].mark_as_completed()
+        self.testing_tasks.clear_dirty()
+        result = self.testing_tasks.edit_many(
+            lambda task: task.edit_user('Other'), [0, 2, 42, 0])
+        self.assertEqual(result.applied, [0])
+        self.assertEqual(set(result.errors), {2, 42})
+        self.assertFalse(result.ok)
+        self.assertEqual(self.testing_tasks.list_tasks('Other')[1], [0])
+        self.assertEqual(self.testing_tasks.dirty, [0, 2])
+
+    def test_edit_many_where(self):
+        '''
+           Test batch edit of tasks passing a filter.
+        '''
+        logging.info('test_edit_many_where')
+
+        other = dict(self.data)
+        other[tasks.TASK_LABELS[0]] = 'Other'
+        self.testing_tasks.extend([other, self.data])
+        result = self.testing_tasks.edit_many(
+            lambda task: task.mark_as_completed(),
+            where=lambda task: task.owner == 'Tester')
+        self.assertTrue(result.ok)
+        self.assertEqual(result.applied, [0, 2])
+        self.assertEqual(self.testing_tasks.status_counts(), {
+            ('Tester', tasks.STAT_LABELS[0]): 2,
+            ('Other', tasks.STAT_LABELS[2]): 1})
+
+    def test_dirty_follows_remove(self):
+        '''
+           Test dirty indices shift after a removal.
+        '''
+        logging.info('test_dirty_follows_remove')
+
+        self.testing_tasks.extend([self.data, self.data])
+        self.testing_tasks.clear_dirty()
+        self.testing_tasks[0].mark_as_completed()
+        self.testing_tasks[2].mark_as_completed()
+        self.testing_tasks.remove(1)
+        self.assertEqual(self.testing_tasks.dirty, [0, 1])
+
+    def test_generation(self):
+        '''
+           Test generation and dirty rows follow additions and edits only.
+        '''
+        logging.info('test_generation')
+
+        generation = self.testing_tasks.generation
+        self.assertEqual(self.testing_tasks.dirty, [0])
+        self.testing_tasks.clear_dirty()
+        self.testing_tasks.list_tasks()
+        self.testing_tasks.get_stats()
+        self.assertEqual(self.testing_tasks.generation, generation)
+        self.testing_tasks[0].mark_as_completed()
+        self.assertEqual(self.testing_tasks.generation, generation + 1)
+        self.assertFalse(self.testing_tasks.removed)
+        self.testing_tasks.remove(0)
+        self.assertTrue(self.testing_tasks.removed)
+        self.assertEqual(self.testing_tasks.dirty, [])
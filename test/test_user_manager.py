@@ -1,8 +1,12 @@
 from typing import Type
+import os
+import tempfile
+import threading
 import unittest
 import logging
 from unittest import mock
 from src import user_manager
+from src.file_handler import FileHandler
 
 logger = logging.getLogger(__name__)
 
@@ -185,4 +189,195 @@ class TestOptionsMenu(unittest.TestCase):
         user = next(users_iter)
         self.assertEqual(user, 'user')
         # And no more than one element.
-        self.assertRaises(StopIteration, lambda:next(users_iter))
\ No newline at end of file
+        self.assertRaises(StopIteration, lambda:next(users_iter))
+
+
+##############################################
+#                                            #
+#           CACHES                           #
+#                                            #
+##############################################
+
+class TestUserManagerCaches(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.handler = mock.Mock(buffer=[DATA_EXAMPLE], generation=0)
+        self.manager = user_manager.UserManager(
+            filename=_MOCK_FILE_NAME_,
+            file_handler=lambda *args, **kwargs: self.handler, #type: ignore
+            verify_cache=user_manager.VerifyCache(size=2, ttl=60))
+        return super().setUp()
+
+    def test_users_pwd_follows_generation(self):
+        '''
+           Test passwords by username rebuilt only on handler generation change.
+        '''
+
+        logging.info('test_users_pwd_follows_generation')
+
+        self.assertTrue(self.manager.user_exists('user'))
+        self.handler.buffer = []
+        # Same generation: buffer not read again.
+        self.assertTrue(self.manager.user_exists('user'))
+        self.handler.generation = 1
+        self.assertFalse(self.manager.user_exists('user'))
+
+    def test_add_user_keeps_index(self):
+        '''
+           Test added user is indexed without rebuilding.
+        '''
+
+        logging.info('test_add_user_keeps_index')
+
+        self.assertTrue(self.manager.add_user('newUser', 'newPassword'))
+        self.handler.dump.assert_called_once()
+        self.assertEqual(list(self.manager.users), ['user', 'newUser'])
+
+    @mock.patch('src.user_manager.default_hasher')
+    def test_verify_cache(self, hasher):
+        '''
+           Test repeated successful log in skips the hasher.
+        '''
+
+        logging.info('test_verify_cache')
+
+        hasher.verify.side_effect = lambda pwd, stored: pwd == 'passw'
+        for _ in range(3): self.assertTrue(self.manager.log_in('user', 'passw'))
+        self.assertEqual(hasher.verify.call_count, 1)
+        # Failures are never cached.
+        for _ in range(2): self.assertFalse(self.manager.log_in('user', 'nope'))
+        self.assertEqual(hasher.verify.call_count, 3)
+
+    def test_admins_follow_generation(self):
+        '''
+           Test admin set parsed from both separators and cached.
+        '''
+
+        logging.info('test_admins_follow_generation')
+
+        admin_file = mock.Mock(generation=0, buffer=[
+            {'0':'admin', '1':'root'}, {'0':' tester'}, {'0':''}])
+        with mock.patch('src.user_manager.data_file', lambda x: admin_file):
+            self.assertEqual(self.manager.admins,
+                             frozenset(['admin', 'root', 'tester']))
+            admin_file.buffer = []
+            self.assertIn('root', self.manager.admins)
+            admin_file.generation = 1
+            self.assertEqual(self.manager.admins, frozenset())
+
+    @mock.patch('src.user_manager.time')
+    @mock.patch('src.user_manager.default_hasher')
+    def test_verify_cache_expires(self, hasher, clock):
+        '''
+           Test cached verification expires after ttl.
+        '''
+
+        logging.info('test_verify_cache_expires')
+
+        hasher.verify.return_value = True
+        clock.monotonic.return_value = 0.
+        self.manager.log_in('user', 'passw')
+        clock.monotonic.return_value = 61.
+        self.manager.log_in('user', 'passw')
+        self.assertEqual(hasher.verify.call_count, 2)
+
+    @mock.patch('src.user_manager.default_hasher')
+    def test_verify_cache_threads(self, hasher):
+        '''
+           Test threads share the cache and a slow hash does not block hits.
+        '''
+
+        logging.info('test_verify_cache_threads')
+
+        release = threading.Event()
+        hasher.verify.side_effect = lambda pwd, stored: \
+            pwd != 'slow' or release.wait(5)
+        self.assertTrue(self.manager.verify('user', 'passw'))
+        slow = threading.Thread(target=self.manager.verify, args=('user', 'slow'))
+        slow.start()
+        # Cached while the other thread is hashing.
+        self.assertTrue(self.manager.verify('user', 'passw'))
+        self.assertFalse(release.is_set())
+        release.set()
+        slow.join()
+
+        results = []
+        def login(i: int) -> None:
+            for j in range(200):
+                results.append(self.manager.verify('user', f'pwd{(i + j) % 5}'))
+        threads = [threading.Thread(target=login, args=(i,)) for i in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(results), 800)
+        self.assertTrue(all(results))
+
+    @mock.patch('src.user_manager.default_hasher')
+    def test_verify_rejects_bad_hash(self, hasher):
+        '''
+           Test a hash the hasher cannot read fails verification.
+        '''
+
+        logging.info('test_verify_rejects_bad_hash')
+
+        hasher.verify.side_effect = ValueError('not a valid hash')
+        self.assertFalse(self.manager.verify('nobody', 'passw'))
+
+
+##############################################
+#                                            #
+#           BULK IMPORT                      #
+#                                            #
+##############################################
+
+class TestUserManagerBulk(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'USER')
+        with open(self.filename, 'w') as f:
+            f.write(f'user;{DATA_EXAMPLE[user_manager.USER_LABELS[1]]}')
+        self.manager = user_manager.UserManager(filename=self.filename)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        for handler in list(FileHandler.handlers.values()):
+            handler.close()
+        self.dir.cleanup()
+        return super().tearDown()
+
+    def test_add_users(self):
+        '''
+           Test new users hashed over processes and written once.
+        '''
+
+        logging.info('test_add_users')
+
+        progress = mock.Mock()
+        with mock.patch.object(self.manager._file, 'dump',
+                               wraps=self.manager._file.dump) as dump:
+            result = self.manager.add_users(
+                [('a', 'pa'), ('user', 'x'), ('b', 'pb'), ('a', 'x'),
+                 ('', 'x'), ('c;d', 'x')], workers=2, progress=progress)
+        dump.assert_called_once()
+        self.assertEqual(result.added, ['a', 'b'])
+        self.assertEqual(result.skipped, {'user': 'exists', 'a': 'duplicate',
+                                          '': 'empty', 'c;d': 'invalid'})
+        self.assertEqual(result.hashed, 2)
+        progress.assert_called_with(2, 2)
+        self.assertTrue(self.manager.log_in('b', 'pb'))
+        with open(self.filename) as f:
+            self.assertEqual(len(f.read().split('\n')), 3)
+
+    def test_import_csv(self):
+        '''
+           Test users read from CSV with header.
+        '''
+
+        logging.info('test_import_csv')
+
+        path = os.path.join(self.dir.name, 'users.csv')
+        with open(path, 'w') as f:
+            f.write('username,password\nnew,secret\n\nother,pass,extra\n')
+        result = self.manager.import_csv(path, workers=1)
+        self.assertEqual(result.added, ['new', 'other'])
+        self.assertTrue(self.manager.log_in('other', 'pass'))